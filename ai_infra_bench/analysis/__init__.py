@@ -0,0 +1,16 @@
+from ai_infra_bench.analysis.capacity import (
+    CapacityModel,
+    capacity_report,
+    fit_capacity_model,
+)
+from ai_infra_bench.analysis.drift import detect_drift, mann_whitney_u
+from ai_infra_bench.analysis.knee import find_knee
+
+__all__ = [
+    "CapacityModel",
+    "capacity_report",
+    "detect_drift",
+    "find_knee",
+    "fit_capacity_model",
+    "mann_whitney_u",
+]
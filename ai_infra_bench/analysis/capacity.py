@@ -0,0 +1,344 @@
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from ai_infra_bench.utils import colors, graph_per_row, load_label_results
+
+# the number of parameters of each curve, used to decide if a fit is trustworthy
+NUM_PARAMS = {"linear": 2, "saturating": 2, "queueing": 3}
+
+
+def metric_kind(metric: str) -> str:
+    """
+    Which service-time model describes how ``metric`` evolves with the load:
+
+    - throughputs saturate: X(x) = X_max * x / (x + k), the smooth version of the
+      operational bound min(x / D, X_max).
+    - per-token decode latencies grow with the batch size: T(x) = t0 + t1 * x.
+    - the other latencies (TTFT, E2E) contain a queueing delay which explodes when
+      the load gets close to the service rate mu: T(x) = t0 + c * x / (mu - x).
+    """
+    if "throughput" in metric:
+        return "saturating"
+    if "tpot" in metric or "itl" in metric:
+        return "linear"
+    return "queueing"
+
+
+def _curve(kind: str, params: Sequence[float], x) -> np.ndarray:
+    x = np.asarray(x, dtype=float)
+    if kind == "linear":
+        t0, t1 = params
+        return t0 + t1 * x
+    if kind == "saturating":
+        x_max, k = params
+        return x_max * x / (x + k)
+    t0, c, mu = params
+    with np.errstate(divide="ignore"):
+        return np.where(x < mu, t0 + c * x / np.maximum(mu - x, 1e-12), np.inf)
+
+
+def _fit(kind: str, x: np.ndarray, y: np.ndarray) -> Tuple[float, ...]:
+    """Least squares fit, grid search over the only non-linear parameter"""
+    if kind == "linear":
+        t1, t0 = np.polyfit(x, y, 1)
+        return float(t0), float(t1)
+
+    best, best_sse = None, math.inf
+    if kind == "saturating":
+        for k in np.geomspace(x.min() * 1e-2, x.max() * 1e2, 200):
+            basis = x / (x + k)
+            x_max = float(basis @ y / (basis @ basis))
+            sse = float(np.sum((x_max * basis - y) ** 2))
+            if sse < best_sse:
+                best, best_sse = (x_max, float(k)), sse
+        return best
+
+    for mu in x.max() * np.geomspace(1 + 1e-3, 20, 200):
+        basis = x / (mu - x)
+        design = np.stack([np.ones_like(x), basis], axis=1)
+        (t0, c), *_ = np.linalg.lstsq(design, y, rcond=None)
+        # neither the service time nor the queueing delay can be negative
+        if c < 0:
+            t0, c = float(np.mean(y)), 0.0
+        elif t0 < 0:
+            t0, c = 0.0, float(basis @ y / (basis @ basis))
+        sse = float(np.sum((t0 + c * basis - y) ** 2))
+        if sse < best_sse:
+            best, best_sse = (float(t0), float(c), float(mu)), sse
+    return best
+
+
+@dataclass
+class Prediction:
+    load: float
+    mean: float
+    low: float
+    high: float
+    reliable: bool
+    reason: str = ""
+
+
+@dataclass
+class FittedCurve:
+    metric: str
+    kind: str
+    params: Tuple[float, ...]
+    loads: np.ndarray
+    values: np.ndarray
+    bootstrap_params: List[Tuple[float, ...]] = field(default_factory=list)
+    confidence: float = 0.9
+
+    def predict(self, load: float) -> Prediction:
+        mean = float(_curve(self.kind, self.params, load))
+        if self.bootstrap_params:
+            # every column is one parameter, _curve broadcasts over the samples
+            samples = _curve(self.kind, np.array(self.bootstrap_params).T, load)
+            tail = (1 - self.confidence) / 2 * 100
+            # "nearest" keeps the infinite samples (past saturation) out of arithmetic
+            low, high = np.percentile(samples, [tail, 100 - tail], method="nearest")
+        else:
+            low = high = mean
+        reliable, reason = self._reliability(load, mean, float(low), float(high))
+        return Prediction(load, mean, float(low), float(high), reliable, reason)
+
+    def _reliability(self, load, mean, low, high) -> Tuple[bool, str]:
+        lo_load, hi_load = self.loads.min(), self.loads.max()
+        if len(self.loads) <= NUM_PARAMS[self.kind]:
+            return False, "too few measured points"
+        if not math.isfinite(mean) or not math.isfinite(high):
+            return False, "beyond the estimated saturation point"
+        if self.kind == "queueing" and load >= 0.95 * self.params[2]:
+            return False, "close to the estimated saturation point"
+        # up to 25% outside of the measured loads is still considered interpolation
+        margin = 0.25 * (hi_load - lo_load)
+        if load < lo_load - margin or load > hi_load + margin:
+            return False, "extrapolated far from the measured loads"
+        if abs(mean) > 0 and (high - low) / abs(mean) > 0.5:
+            return False, "wide confidence interval"
+        return True, ""
+
+
+def fit_curve(
+    metric: str,
+    loads: Sequence[float],
+    values: Sequence[float],
+    *,
+    kind: Optional[str] = None,
+    num_bootstrap: int = 200,
+    confidence: float = 0.9,
+    seed: int = 0,
+) -> FittedCurve:
+    """Fit a service-time model, uncertainty is estimated by residual bootstrap"""
+    kind = kind or metric_kind(metric)
+    loads = np.asarray(loads, dtype=float)
+    values = np.asarray(values, dtype=float)
+    assert len(loads) >= 2, f"At least 2 points are needed to fit {metric}"
+
+    params = _fit(kind, loads, values)
+    residuals = values - _curve(kind, params, loads)
+    fitted = values - residuals
+
+    rng = np.random.default_rng(seed)
+    bootstrap_params = [
+        _fit(kind, loads, fitted + rng.choice(residuals, size=len(residuals)))
+        for _ in range(num_bootstrap)
+    ]
+    return FittedCurve(
+        metric, kind, params, loads, values, bootstrap_params, confidence
+    )
+
+
+@dataclass
+class CapacityModel:
+    label: str
+    load_key: str
+    curves: Dict[str, FittedCurve]
+
+    def predict(self, metric: str, load: float) -> Prediction:
+        return self.curves[metric].predict(load)
+
+    def max_load(
+        self,
+        slo: Dict[str, float],
+        *,
+        upper: Optional[float] = None,
+        conservative: bool = False,
+        num_steps: int = 2000,
+    ) -> Tuple[float, bool, bool]:
+        """
+        The largest load at which every metric of ``slo`` stays below its threshold.
+        With ``conservative`` the upper bound of the confidence interval is used
+        instead of the point estimate. Returns the load, whether the answer can be
+        trusted and whether it is bounded: when the SLO is still met at ``upper``
+        (twice the largest measured load by default), the load is only a lower
+        bound of the capacity.
+        """
+        loads = next(iter(self.curves.values())).loads
+        upper = upper or 2 * loads.max()
+        best, reliable = 0.0, False
+        for load in np.linspace(upper / num_steps, upper, num_steps):
+            predictions = [self.predict(metric, load) for metric in slo]
+            values = [p.high if conservative else p.mean for p in predictions]
+            if not all(v <= slo[metric] for v, metric in zip(values, slo)):
+                return best, reliable, True
+            best, reliable = float(load), all(p.reliable for p in predictions)
+        return best, reliable, False
+
+
+def fit_capacity_model(
+    points: List[Dict], load_key: str, metrics: List[str], label: str = "", **kwargs
+) -> CapacityModel:
+    points = sorted(points, key=lambda item: item[load_key])
+    loads = [item[load_key] for item in points]
+    curves = {
+        metric: fit_curve(metric, loads, [item[metric] for item in points], **kwargs)
+        for metric in metrics
+    }
+    return CapacityModel(label, load_key, curves)
+
+
+def load_bound_strf(load: float, bounded: bool) -> str:
+    """A max_load, >= when the SLO is met up to the largest load searched"""
+    return f"{load:.2f}" if bounded else f">= {load:.2f}"
+
+
+def capacity_export_table(
+    models: List[CapacityModel],
+    loads: Dict[str, List[float]],
+    slo: Optional[Dict[str, float]],
+    output_dir: str,
+):
+    print(f"Writing table to {os.path.join(output_dir, 'capacity.md')}")
+    md_tables_str = ""
+    for model in models:
+        metrics = list(model.curves)
+        md_tables_str += (
+            f"Title: **{model.label}** (mean [low, high], * = unreliable)\n"
+        )
+        md_tables_str += (
+            f"| {model.load_key} |     | "
+            + " | ".join(str(metric) for metric in metrics)
+            + " |\n"
+        )
+        md_tables_str += "| --- " * (len(metrics) + 2) + "|\n"
+        for load in loads[model.label]:
+            md_tables_str += f"| {load:.2f} |     "
+            for metric in metrics:
+                p = model.predict(metric, load)
+                mark = "" if p.reliable else "*"
+                md_tables_str += f"| {p.mean:.2f} [{p.low:.2f}, {p.high:.2f}]{mark} "
+            md_tables_str += "|\n"
+
+        md_tables_str += "\nFitted models:\n"
+        for metric, curve in model.curves.items():
+            params = ", ".join(f"{param:.4g}" for param in curve.params)
+            md_tables_str += f"- {metric}: {curve.kind}({params})\n"
+
+        if slo:
+            slo_str = ", ".join(f"{metric} <= {value}" for metric, value in slo.items())
+            best, reliable, bounded = model.max_load(slo)
+            safe, safe_reliable, safe_bounded = model.max_load(slo, conservative=True)
+            md_tables_str += (
+                f"\nMax {model.load_key} meeting {slo_str}: "
+                f"**{load_bound_strf(best, bounded)}**{'' if reliable else '*'} "
+                f"(conservative: {load_bound_strf(safe, safe_bounded)}"
+                f"{'' if safe_reliable else '*'})\n"
+            )
+        md_tables_str += "\n" * 5
+
+    with open(os.path.join(output_dir, "capacity.md"), "w", encoding="utf-8") as f:
+        f.write(md_tables_str)
+    print("Writing table DONE")
+
+
+def capacity_plot(models: List[CapacityModel], output_dir: str):
+    print("Ploting graphs in html")
+    for model in models:
+        metrics = list(model.curves)
+        rows = (len(metrics) - 1) // graph_per_row + 1
+        fig = make_subplots(rows=rows, cols=graph_per_row)
+        for i, metric in enumerate(metrics):
+            curve = model.curves[metric]
+            row, col = i // graph_per_row + 1, i % graph_per_row + 1
+            color = colors[i % len(colors)]
+            grid = np.linspace(curve.loads.min() / 2, curve.loads.max() * 1.5, 100)
+            predictions = [curve.predict(load) for load in grid]
+            fig.add_trace(
+                go.Scatter(
+                    x=np.concatenate([grid, grid[::-1]]),
+                    y=[p.high for p in predictions]
+                    + [p.low for p in predictions][::-1],
+                    fill="toself",
+                    line=dict(width=0, color=color),
+                    opacity=0.2,
+                    name=f"{metric} (band)",
+                    hoverinfo="skip",
+                ),
+                row=row,
+                col=col,
+            )
+            fig.add_trace(
+                go.Scatter(
+                    x=grid,
+                    y=[p.mean for p in predictions],
+                    name=f"{metric} (model)",
+                    mode="lines",
+                    line=dict(color=color, width=3),
+                ),
+                row=row,
+                col=col,
+            )
+            fig.add_trace(
+                go.Scatter(
+                    x=curve.loads,
+                    y=curve.values,
+                    name=f"{metric} (measured)",
+                    mode="markers",
+                    marker=dict(size=8, color=color),
+                    hovertemplate=f"<br>{model.load_key}: %{{x}}<br>{metric}: %{{y}}<br><extra></extra>",
+                ),
+                row=row,
+                col=col,
+            )
+            fig.update_xaxes(title_text=model.load_key, row=row, col=col)
+            fig.update_yaxes(title_text=metric, row=row, col=col)
+        fig.update_layout(title_text=f"{model.label} capacity model")
+        fig.write_html(os.path.join(output_dir, f"{model.label}_capacity.html"))
+    print("Ploting graphs DONE")
+
+
+def capacity_report(
+    output_dir: str,
+    labels: List[str],
+    *,
+    load_key: str,
+    metrics: List[str],
+    slo: Optional[Dict[str, float]] = None,
+    loads: Optional[List[float]] = None,
+) -> List[CapacityModel]:
+    """
+    Fit a capacity model per label from the results stored in ``output_dir`` and
+    predict ``metrics`` at ``loads`` (by default the measured range and 50% beyond).
+    """
+    models = [
+        fit_capacity_model(
+            load_label_results(output_dir, label), load_key, metrics, label
+        )
+        for label in labels
+    ]
+    label_loads = {}
+    for model in models:
+        measured = next(iter(model.curves.values())).loads
+        label_loads[model.label] = loads or list(
+            np.linspace(measured.min(), measured.max() * 1.5, 11)
+        )
+
+    capacity_export_table(models, label_loads, slo, output_dir)
+    capacity_plot(models, output_dir)
+    return models
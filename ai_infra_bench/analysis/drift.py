@@ -0,0 +1,60 @@
+import math
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+
+def mann_whitney_u(a: Sequence[float], b: Sequence[float]) -> Tuple[float, float]:
+    """
+    Two-sided Mann-Whitney U test with the normal approximation and tie correction.
+    Latencies are heavy-tailed, so a rank test is preferred over a t-test.
+    Returns the U statistic of ``a`` and the p-value.
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return 0.0, 1.0
+
+    values = np.concatenate([a, b])
+    order = np.argsort(values, kind="mergesort")
+    ranks = np.empty(len(values))
+    ranks[order] = np.arange(1, len(values) + 1)
+    # average the ranks of the ties
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    ranks = (np.bincount(inverse, weights=ranks) / counts)[inverse]
+
+    u = float(ranks[:n1].sum() - n1 * (n1 + 1) / 2)
+    n = n1 + n2
+    tie_term = float(np.sum(counts**3 - counts)) / (n * (n - 1))
+    sigma = math.sqrt(n1 * n2 / 12 * (n + 1 - tie_term))
+    if sigma == 0:
+        return u, 1.0
+    # continuity correction
+    z = (abs(u - n1 * n2 / 2) - 0.5) / sigma
+    return u, float(min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2))))
+
+
+def detect_drift(
+    first: Sequence[float],
+    last: Sequence[float],
+    *,
+    alpha: float = 0.01,
+    min_change: float = 0.05,
+) -> Dict:
+    """
+    Compare the samples of the first and the last window. The drift is flagged only
+    when it is both significant (p-value < alpha) and large enough (relative change
+    of the median >= min_change), long runs make tiny shifts significant.
+    """
+    first_median = float(np.median(first)) if len(first) else 0.0
+    last_median = float(np.median(last)) if len(last) else 0.0
+    _, p_value = mann_whitney_u(first, last)
+    change = (last_median - first_median) / first_median if first_median else 0.0
+    return {
+        "first_median": first_median,
+        "last_median": last_median,
+        "change": change,
+        "p_value": p_value,
+        "drifted": p_value < alpha and abs(change) >= min_change,
+    }
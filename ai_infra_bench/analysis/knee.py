@@ -0,0 +1,44 @@
+import math
+from typing import Dict, List, Optional
+
+
+def find_knee(
+    points: List[Dict],
+    load_key: str,
+    *,
+    throughput_key: str = "output_throughput",
+    latency_key: str = "mean_e2e_latency_ms",
+    plateau: float = 0.5,
+    latency_growth: float = 0.5,
+) -> Optional[Dict]:
+    """
+    The saturation knee of a load sweep.
+
+    Between two consecutive loads the elasticities d ln(X) / d ln(load) of the
+    throughput and d ln(L) / d ln(load) of the latency are computed. Below the knee
+    the throughput scales with the load (elasticity ~1) while the latency stays flat
+    (~0), past it the roles swap. The knee is the last load before the first step
+    where the throughput elasticity drops below ``plateau`` and the latency
+    elasticity rises above ``latency_growth``. Returns None if it is not reached.
+    """
+    points = sorted(points, key=lambda item: item[load_key])
+    for prev, cur in zip(points, points[1:]):
+        load_ratio = cur[load_key] / prev[load_key]
+        if load_ratio <= 1 or min(prev[throughput_key], prev[latency_key]) <= 0:
+            continue
+        throughput_elasticity = math.log(
+            max(cur[throughput_key], 1e-12) / prev[throughput_key]
+        ) / math.log(load_ratio)
+        latency_elasticity = math.log(
+            max(cur[latency_key], 1e-12) / prev[latency_key]
+        ) / math.log(load_ratio)
+        if throughput_elasticity < plateau and latency_elasticity > latency_growth:
+            return {
+                "load": prev[load_key],
+                "throughput": prev[throughput_key],
+                "latency": prev[latency_key],
+                "next_load": cur[load_key],
+                "throughput_elasticity": throughput_elasticity,
+                "latency_elasticity": latency_elasticity,
+            }
+    return None
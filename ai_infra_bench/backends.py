@@ -0,0 +1,277 @@
+import subprocess
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+import requests
+
+
+@dataclass
+class Backend:
+    """
+    How to drive one serving engine.
+
+    - server_prefixes / client_prefixes: the only commands allowed to be launched
+      for this engine, a server_cmd or a client_cmd must start with one of them.
+    - launch_template: used by ``launch_cmd`` to build a server command. Empty for
+      the servers which are already running, their server_cmd is not launched.
+    - ready_path: polled by ``wait_for_server`` until it returns 200.
+    - metrics_path: the Prometheus endpoint of the server.
+    - output_arg / extra_output_args: how the client is told where to write its result.
+    - key_map: renames the keys of the client's result record onto ``SGLANG_KEYS``.
+    - startup_phases: {phase: (begin regex, end regex)} matched against the server
+      log to time its startup, an empty begin regex means the end regex captures
+      the duration logged by the engine in a ``seconds`` group.
+    - scheduler_stats: {stat: regex} read from the periodic scheduler log lines,
+      the value is captured by a ``value`` group, or a ``pct`` group for
+      percentages, so that every engine reports the same stats on the same scale.
+    - parallel_args: {"tp" | "dp" | "pp": flags} giving the parallel sizes of a
+      server command, the number of GPUs it uses is their product.
+    - dtype_args: the flags giving the weight dtype of a server command, the
+      first one set wins.
+    - metric_names: {stat: name} of the Prometheus metrics of the server, the
+      running_req and queue_req gauges and the generation_tokens counter.
+    """
+
+    name: str
+    server_prefixes: List[str]
+    client_prefixes: List[str]
+    launch_template: str
+    ready_path: str = "/v1/models"
+    metrics_path: str = "/metrics"
+    output_arg: str = "--output-file"
+    extra_output_args: str = ""
+    key_map: Dict[str, str] = field(default_factory=dict)
+    startup_phases: Dict[str, Tuple[str, str]] = field(default_factory=dict)
+    scheduler_stats: Dict[str, str] = field(default_factory=dict)
+    parallel_args: Dict[str, List[str]] = field(default_factory=dict)
+    dtype_args: List[str] = field(default_factory=list)
+    metric_names: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def external(self) -> bool:
+        """The server is already running, it is neither launched nor torn down"""
+        return not self.launch_template
+
+    def launch_cmd(self, model_path: str, host: str, port, extra_args: str = ""):
+        assert not self.external, f"The {self.name} backend launches no server"
+        cmd = self.launch_template.format(model_path=model_path, host=host, port=port)
+        return f"{cmd} {extra_args}".strip()
+
+    def client_output_args(self, output_file: str) -> str:
+        return f"{self.extra_output_args} {self.output_arg} {output_file}".strip()
+
+    def normalize(self, record: Dict) -> Dict:
+        record = {self.key_map.get(key, key): value for key, value in record.items()}
+        if "input_throughput" not in record and record.get("duration"):
+            record["input_throughput"] = (
+                record["total_input_tokens"] / record["duration"]
+            )
+        return record
+
+    def teardown(self, process: subprocess.Popen, timeout: float = 30):
+        """Terminate the server gracefully, then kill whatever is left of its tree"""
+        try:
+            children = psutil.Process(process.pid).children(recursive=True)
+        except psutil.NoSuchProcess:
+            children = []
+        process.terminate()
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        for child in children:
+            try:
+                child.kill()
+            except psutil.NoSuchProcess:
+                pass
+
+
+# vllm's benchmark_serving (and its trtllm port) name the e2e latency "e2el"
+E2EL_KEY_MAP = {
+    f"{stat}_e2el_ms": f"{stat}_e2e_latency_ms"
+    for stat in ("mean", "median", "std", "p99")
+}
+
+BACKENDS: Dict[str, Backend] = {}
+
+
+def register_backend(backend: Backend):
+    BACKENDS[backend.name] = backend
+
+
+register_backend(
+    Backend(
+        name="sglang",
+        server_prefixes=["python -m sglang.launch_server"],
+        client_prefixes=["python -m sglang.bench_serving"],
+        launch_template="python -m sglang.launch_server --model-path {model_path} --host {host} --port {port}",
+        startup_phases={
+            "load_weights": (r"Load weight begin", r"Load weight end"),
+            "kv_cache_alloc": (r"Load weight end", r"KV Cache is allocated"),
+            "cuda_graph_capture": (
+                r"Capture cuda graph begin",
+                r"Capture cuda graph end",
+            ),
+        },
+        scheduler_stats={
+            "running_req": r"#running-req: (?P<value>\d+)",
+            "queue_req": r"#queue-req: (?P<value>\d+)",
+            "token_usage": r"token usage: (?P<value>[\d.]+)",
+            "gen_throughput": r"gen throughput \(token/s\): (?P<value>[\d.]+)",
+            # only logged with speculative decoding
+            "accept_length": r"accept len: (?P<value>[\d.]+)",
+        },
+        parallel_args={
+            "tp": ["--tp-size", "--tp"],
+            "dp": ["--dp-size", "--dp"],
+            "pp": ["--pp-size"],
+        },
+        dtype_args=["--quantization", "--dtype"],
+        metric_names={
+            "running_req": "sglang:num_running_reqs",
+            "queue_req": "sglang:num_queue_reqs",
+            "generation_tokens": "sglang:generation_tokens_total",
+        },
+    )
+)
+register_backend(
+    Backend(
+        name="vllm",
+        server_prefixes=["vllm serve", "python -m vllm.entrypoints.openai.api_server"],
+        client_prefixes=["vllm bench serve"],
+        launch_template="vllm serve {model_path} --host {host} --port {port}",
+        output_arg="--result-filename",
+        extra_output_args="--save-result",
+        key_map=E2EL_KEY_MAP,
+        startup_phases={
+            "load_weights": ("", r"Loading weights took (?P<seconds>[\d.]+) seconds"),
+            "model_loading": (
+                "",
+                r"Model loading took [\d.]+ \w+ and (?P<seconds>[\d.]+) seconds",
+            ),
+            "torch_compile": (
+                "",
+                r"torch.compile takes (?P<seconds>[\d.]+) s in total",
+            ),
+            "cuda_graph_capture": (
+                "",
+                r"Graph capturing finished in (?P<seconds>[\d.]+) secs",
+            ),
+            "engine_init": ("", r"init engine .* took (?P<seconds>[\d.]+) seconds"),
+        },
+        scheduler_stats={
+            "running_req": r"Running: (?P<value>\d+) reqs",
+            "queue_req": r"(?:Pending|Waiting): (?P<value>\d+) reqs",
+            "token_usage": r"GPU KV cache usage: (?P<pct>[\d.]+)%",
+            "gen_throughput": r"Avg generation throughput: (?P<value>[\d.]+) tokens/s",
+            "accept_length": r"Mean acceptance length: (?P<value>[\d.]+)",
+        },
+        parallel_args={
+            "tp": ["--tensor-parallel-size"],
+            "dp": ["--data-parallel-size"],
+            "pp": ["--pipeline-parallel-size"],
+        },
+        dtype_args=["--quantization", "--dtype"],
+        metric_names={
+            "running_req": "vllm:num_requests_running",
+            "queue_req": "vllm:num_requests_waiting",
+            "generation_tokens": "vllm:generation_tokens_total",
+        },
+    )
+)
+register_backend(
+    Backend(
+        name="trtllm",
+        server_prefixes=["trtllm-serve"],
+        client_prefixes=["python -m tensorrt_llm.serve.scripts.benchmark_serving"],
+        launch_template="trtllm-serve {model_path} --host {host} --port {port}",
+        output_arg="--result-filename",
+        extra_output_args="--save-result",
+        key_map=E2EL_KEY_MAP,
+        parallel_args={"tp": ["--tp_size"], "pp": ["--pp_size"]},
+    )
+)
+# the local stand-in server of ai_infra_bench.mock_server, it logs like SGLang
+register_backend(
+    Backend(
+        name="mock",
+        server_prefixes=["python -m ai_infra_bench.mock_server"],
+        client_prefixes=[],
+        launch_template="python -m ai_infra_bench.mock_server --model-path {model_path} --host {host} --port {port}",
+        startup_phases=BACKENDS["sglang"].startup_phases,
+        scheduler_stats=BACKENDS["sglang"].scheduler_stats,
+        parallel_args=BACKENDS["sglang"].parallel_args,
+        dtype_args=BACKENDS["sglang"].dtype_args,
+        metric_names=BACKENDS["sglang"].metric_names,
+    )
+)
+
+# any OpenAI-compatible endpoint already serving at host:port, e.g. a remote
+# deployment, its server_cmd is just "openai" followed by a free description
+register_backend(
+    Backend(
+        name="openai",
+        server_prefixes=["openai"],
+        client_prefixes=[],
+        launch_template="",
+        ready_path="/v1/models",
+    )
+)
+
+
+def _normalize_cmd(cmd: str) -> str:
+    return " ".join(cmd.replace("\\\n", " ").replace("\\", " ").split())
+
+
+def get_backend(name: str) -> Backend:
+    assert name in BACKENDS, f"Unknown backend {name=}, registered: {list(BACKENDS)}"
+    return BACKENDS[name]
+
+
+def get_server_backend(server_cmd: str) -> Optional[Backend]:
+    server_cmd = _normalize_cmd(server_cmd)
+    for backend in BACKENDS.values():
+        if any(server_cmd.startswith(prefix) for prefix in backend.server_prefixes):
+            return backend
+    return None
+
+
+def get_client_backend(client_cmd: str) -> Optional[Backend]:
+    client_cmd = _normalize_cmd(client_cmd)
+    for backend in BACKENDS.values():
+        if any(client_cmd.startswith(prefix) for prefix in backend.client_prefixes):
+            return backend
+    return None
+
+
+def fetch_metrics(base_url: str, backend: Backend, timeout: float = 5) -> Dict:
+    """Scrape the Prometheus endpoint, returns {'name{labels}': value}"""
+    response = requests.get(f"{base_url}{backend.metrics_path}", timeout=timeout)
+    response.raise_for_status()
+    metrics = {}
+    for line in response.text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        # name{label="a b"} value [timestamp]
+        if "}" in line:
+            name, _, rest = line.rpartition("}")
+            name += "}"
+        else:
+            name, _, rest = line.partition(" ")
+        try:
+            metrics[name] = float(rest.split()[0])
+        except (IndexError, ValueError):
+            continue
+    return metrics
+
+
+def read_metric(metrics: Dict, name: str) -> Optional[float]:
+    """The sum of the series of a metric of fetch_metrics over their labels"""
+    values = [
+        value
+        for key, value in metrics.items()
+        if key == name or key.startswith(name + "{")
+    ]
+    return sum(values) if values else None
@@ -3,6 +3,8 @@ import shutil
 from datetime import datetime
 from typing import List, Union
 
+from ai_infra_bench.backends import BACKENDS, get_client_backend, get_server_backend
+
 SGLANG_KEYS = [
     "backend",
     "dataset_name",
@@ -11,21 +13,21 @@ SGLANG_KEYS = [
     "sharegpt_output_len",
     "random_input_len",
     "random_output_len",
-    "random_range _ratio",
+    "random_range_ratio",
     "duration",
     "completed",
     "total_input_tokens",
     "total_output_tokens",
     "total_output_tokens_retokenized",
     "request_throughput",
-    "input_through put",
+    "input_throughput",
     "output_throughput",
     "mean_e2e_latency_ms",
     "median_e2e_latency_ms",
     "std_e2e_latency_ms",
     "p99_e2e_latency_ms",
     "mean_ttft_ms",
-    "median_ttft_ms ",
+    "median_ttft_ms",
     "std_ttft_ms",
     "p99_ttft_ms",
     "mean_tpot_ms",
@@ -35,12 +37,21 @@ SGLANG_KEYS = [
     "mean_itl_ms",
     "median_itl_ms",
     "std_itl_ms",
-    "p95_it l_ms",
+    "p95_itl_ms",
     "p99_itl_ms",
     "concurrency",
     "accept_length",
 ]
 
+# extra keys reported by the native session workload
+SESSION_KEYS = [
+    "max_sessions",
+    "num_sessions",
+    "num_turns",
+    "mean_think_time_s",
+    "errored",
+]
+
 
 def check_dir(output_dir: str, full_data_json_path):
     """
@@ -88,37 +99,46 @@ def check_output_file(cmds: Union[List[str], str]):
         cmds = [cmds]
 
     for cmd in cmds:
+        backend = get_client_backend(cmd)
+        output_arg = "--output-file" if backend is None else backend.output_arg
         assert (
-            "--output-file" not in cmd
-        ), f"{cmd=} should not use --output-file, it will be generated automatically"
+            output_arg not in cmd
+        ), f"{cmd=} should not use {output_arg}, it will be generated automatically"
+
+
+def client_cmd_strs(client_cmds) -> List[str]:
+    """Flatten client_cmds, skipping native workloads which are not shell commands"""
+    if isinstance(client_cmds, str):
+        return [client_cmds]
+    cmds = []
+    for client_cmd in client_cmds:
+        if isinstance(client_cmd, list):
+            cmds.extend(client_cmd_strs(client_cmd))
+        elif isinstance(client_cmd, str):
+            cmds.append(client_cmd)
+    return cmds
 
 
 def check_server_client_cmds(server_cmds, client_cmds, *, labels):
-    assert all(
-        [
-            cmd.strip().startswith("python -m sglang.launch_server")
-            for cmd in server_cmds
-        ]
-    ), "Each server_cmd must startswith 'python -m sglang.launch_server'"
-
-    if isinstance(client_cmds[0], list):
-        for client_cmd in client_cmds:
-            assert all(
-                [
-                    cmd.strip().startswith("python -m sglang.bench_serving")
-                    for cmd in client_cmd
-                ]
-            ), "Each client_cmd must start with 'python -m sglang.bench_serving'"
-    elif isinstance(client_cmds[0], str):
-        assert all(
-            [
-                cmd.strip().startswith("python -m sglang.bench_serving")
-                for cmd in client_cmds
-            ]
-        ), "Each client_cmd must start with 'python -m sglang.bench_serving'"
+    # only the commands of the registered backends can be launched
+    server_prefixes = [
+        prefix for backend in BACKENDS.values() for prefix in backend.server_prefixes
+    ]
+    for cmd in server_cmds:
+        assert (
+            get_server_backend(cmd) is not None
+        ), f"Each server_cmd must start with one of {server_prefixes}, but found {cmd=}"
+
+    client_prefixes = [
+        prefix for backend in BACKENDS.values() for prefix in backend.client_prefixes
+    ]
+    for cmd in client_cmd_strs(client_cmds):
+        assert (
+            get_client_backend(cmd) is not None
+        ), f"Each client_cmd must start with one of {client_prefixes}, but found {cmd=}"
 
     # FIXME(muqi1029): don't let the user set output_file
-    check_output_file(client_cmds)
+    check_output_file(client_cmd_strs(client_cmds))
 
     assert len(server_cmds) == len(
         labels
@@ -127,13 +147,16 @@ def check_server_client_cmds(server_cmds, client_cmds, *, labels):
 
 
 def check_input_features_metrics(input_features, metrics):
+    supported_keys = SGLANG_KEYS + SESSION_KEYS
     for input_feature in input_features:
         assert (
-            input_feature in SGLANG_KEYS
-        ), f"{input_feature=} should be in the {SGLANG_KEYS=}"
+            input_feature in supported_keys
+        ), f"{input_feature=} should be in the {supported_keys=}"
 
     for metric in metrics:
-        assert metric in SGLANG_KEYS, f"{metric=} should be all in the {SGLANG_KEYS=}"
+        assert (
+            metric in supported_keys
+        ), f"{metric=} should be all in the {supported_keys=}"
 
 
 def check_param_in_cmd(param: str, cmds: List[str]):
@@ -148,8 +171,8 @@ def slo_check_params(server_cmds, client_cmds, labels):
     ), f"The length os server_cmds and client_cmds should be equal, but found {len(server_cmds)=}, {len(client_cmds)=}"
 
     assert all(
-        "request-rate" not in cmd for cmd in client_cmds
+        "request-rate" not in cmd for cmd in client_cmd_strs(client_cmds)
     ), "request-rate should not be set in the client_cmds"
     assert all(
-        "max-concurrency" not in cmd for cmd in client_cmds
+        "max-concurrency" not in cmd for cmd in client_cmd_strs(client_cmds)
     ), "max-concurrency should not be set in the client_cmds"
@@ -182,7 +182,7 @@ def client_slo(
                     right = mid - 1
                 data.append(inner_data)
         # sort data in request_rate
-        sorted_data = sort_data_by_key("max-concurrency", data)
+        sorted_data = sort_data_by_key("max_concurrency", data)
 
         export_table(
             data=sorted_data,
@@ -0,0 +1,385 @@
+"""
+A live view of a sweep in the terminal: the current points, the ETA of the
+sweep, and the rolling latencies, throughput, errors and SLO status of the
+requests sent by the workloads.
+"""
+
+import contextlib
+import math
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import requests
+
+from ai_infra_bench.backends import Backend, fetch_metrics, read_metric
+from ai_infra_bench.utils import parse_cmd_args
+from ai_infra_bench.workload.base import (
+    RequestOutput,
+    add_request_listener,
+    remove_request_listener,
+)
+from ai_infra_bench.workload.multi_tenant import SLO_LATENCIES
+
+PERCENTILES = (50, 90, 99)
+# no first token for the embeddings, no tpot for a single token
+MIN_OUTPUT_LEN = {"ttft_ms": 1, "tpot_ms": 2, "e2e_latency_ms": 0}
+
+
+@dataclass
+class DashboardConfig:
+    """
+    - refresh_s: seconds between two frames, the rolling stats are only computed
+      when a frame is drawn, the requests just append their latencies.
+    - window_s: the rolling stats are over the requests finished within it.
+    - slo: bounds on the latencies of the requests, e.g. {"ttft_ms": 300,
+      "tpot_ms": 50}, met while the rolling p99 of each is within its bound.
+    - output_file: the latest frame is written there instead of the terminal,
+      e.g. to follow it with `watch cat` from another shell.
+    """
+
+    refresh_s: float = 1.0
+    window_s: float = 30.0
+    slo: Dict[str, float] = field(default_factory=dict)
+    output_file: Optional[str] = None
+
+    def __post_init__(self):
+        for key in self.slo:
+            assert (
+                key in SLO_LATENCIES
+            ), f"{key=} of the slo should be one of {list(SLO_LATENCIES)}"
+
+
+def point_desc(client_cmd) -> str:
+    """The load of a client command or a workload, e.g. request_rate=16"""
+    if isinstance(client_cmd, str):
+        args = parse_cmd_args(client_cmd)
+        return ", ".join(
+            f"{key[2:].replace('-', '_')}={args[key]}"
+            for key in ("--request-rate", "--max-concurrency")
+            if key in args
+        )
+    return f"{client_cmd.load_key}={getattr(client_cmd, client_cmd.load_key, None)}"
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class Dashboard:
+    """
+    Listens to the requests of the workloads and draws a frame every
+    ``refresh_s`` seconds from a background thread. The benches tell it which
+    points are running with ``begin_point`` and ``end_point``, the ETA is the
+    mean time per finished point so far (server startups and warmups included)
+    times the points left. The requests finished while no point runs are not
+    counted.
+
+    The ``bench_serving`` clients run in their own process, their requests are
+    not seen. For them the ``/metrics`` of the server are polled at every frame
+    instead, giving the requests it runs or queues and its rolling output
+    throughput, but no latency.
+
+    Without a config nothing is listened to nor drawn, so that the benches use
+    it the same way whether it is enabled or not.
+    """
+
+    def __init__(self, total_points: int, config: Optional[DashboardConfig] = None):
+        self.total_points = total_points
+        self.enabled = config is not None
+        self.config = config or DashboardConfig()
+        self.lock = threading.Lock()
+        # (finish time, output) of the requests finished within the window
+        self.finished: deque = deque()
+        self.in_flight = 0
+        self.completed = 0
+        self.errored = 0
+        self.last_error = ""
+        self.running: Dict[str, Tuple[str, float]] = {}
+        # the servers polled for the points of the bench_serving clients, with
+        # their (time, generated tokens) samples within the window
+        self.servers: Dict[str, Tuple[str, Backend]] = {}
+        self.server_samples: Dict[str, deque] = {}
+        self.server_in_flight: Dict[str, float] = {}
+        self.done_points = 0
+        self.start_time = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def request_started(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def request_finished(self, output: RequestOutput):
+        with self.lock:
+            self.in_flight -= 1
+            # e.g. the warmup requests, the cancelled ones did not fail
+            if not self.running or output.cancelled:
+                return
+            if output.success:
+                self.completed += 1
+            else:
+                self.errored += 1
+                self.last_error = output.error
+            self.finished.append((time.perf_counter(), output))
+
+    def begin_point(
+        self,
+        name: str,
+        desc: str = "",
+        base_url: Optional[str] = None,
+        backend: Optional[Backend] = None,
+    ):
+        """With base_url and backend, the server of the point is polled"""
+        with self.lock:
+            self.running[name] = (desc, time.perf_counter())
+            if base_url is not None and backend is not None:
+                self.servers[name] = (base_url, backend)
+                self.server_samples[name] = deque()
+
+    def end_point(self, name: str):
+        with self.lock:
+            self.running.pop(name, None)
+            self.servers.pop(name, None)
+            self.server_samples.pop(name, None)
+            self.server_in_flight.pop(name, None)
+            self.done_points += 1
+
+    @contextlib.contextmanager
+    def point(
+        self,
+        name: str,
+        client_cmd,
+        base_url: Optional[str] = None,
+        backend: Optional[Backend] = None,
+    ) -> Iterator[None]:
+        """
+        The point of name (e.g. the label of its server) runs client_cmd against
+        the server at base_url, which is polled for the bench_serving clients.
+        """
+        if not isinstance(client_cmd, str):
+            base_url = backend = None
+        self.begin_point(name, point_desc(client_cmd), base_url, backend)
+        try:
+            yield
+        finally:
+            self.end_point(name)
+
+    def start(self) -> "Dashboard":
+        self.start_time = time.perf_counter()
+        if not self.enabled:
+            return self
+        add_request_listener(self)
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if not self.enabled:
+            return
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        remove_request_listener(self)
+        self.draw()
+
+    def _loop(self):
+        while not self._stop.wait(self.config.refresh_s):
+            self.poll_servers()
+            self.draw()
+
+    def poll_servers(self):
+        """Sample the running and queued requests and the generated tokens"""
+        with self.lock:
+            servers = dict(self.servers)
+        for name, (base_url, backend) in servers.items():
+            names = backend.metric_names
+            try:
+                metrics = fetch_metrics(base_url, backend, timeout=2)
+            except requests.RequestException:
+                continue
+            in_flight = [
+                read_metric(metrics, names[stat])
+                for stat in ("running_req", "queue_req")
+                if stat in names
+            ]
+            generated = (
+                read_metric(metrics, names["generation_tokens"])
+                if "generation_tokens" in names
+                else None
+            )
+            now = time.perf_counter()
+            with self.lock:
+                if name not in self.servers:
+                    continue
+                if any(value is not None for value in in_flight):
+                    self.server_in_flight[name] = sum(
+                        value for value in in_flight if value is not None
+                    )
+                if generated is None:
+                    continue
+                samples = self.server_samples[name]
+                # the counter starts over with a restarted server
+                if samples and generated < samples[-1][1]:
+                    samples.clear()
+                samples.append((now, generated))
+                while samples and samples[0][0] < now - self.config.window_s:
+                    samples.popleft()
+
+    def server_rolling(self) -> Optional[Dict]:
+        """The in-flight requests and output throughput of the polled servers"""
+        with self.lock:
+            if not self.servers:
+                return None
+            in_flight = sum(self.server_in_flight.values())
+            throughput = 0.0
+            for samples in self.server_samples.values():
+                if len(samples) >= 2:
+                    (start, first), (end, last) = samples[0], samples[-1]
+                    throughput += (last - first) / max(end - start, 1e-9)
+        return {"in_flight": in_flight, "output_throughput": throughput}
+
+    def rolling(self) -> Dict:
+        """The stats of the requests finished within the window"""
+        now = time.perf_counter()
+        with self.lock:
+            while self.finished and self.finished[0][0] < now - self.config.window_s:
+                self.finished.popleft()
+            outputs = [output for _, output in self.finished]
+        succeeded = [output for output in outputs if output.success]
+        # the window is shorter at the start of the sweep
+        span = max(min(self.config.window_s, now - self.start_time), 1e-9)
+        latencies = {
+            name: np.array(
+                [
+                    SLO_LATENCIES[name](output)
+                    for output in succeeded
+                    if output.output_len >= MIN_OUTPUT_LEN[name]
+                ]
+            )
+            for name in SLO_LATENCIES
+        }
+        return {
+            "requests": len(outputs),
+            "errored": len(outputs) - len(succeeded),
+            "request_throughput": len(succeeded) / span,
+            "output_throughput": sum(output.output_len for output in succeeded) / span,
+            "percentiles": {
+                name: [
+                    float(np.percentile(values, p)) if values.size else math.nan
+                    for p in PERCENTILES
+                ]
+                for name, values in latencies.items()
+            },
+        }
+
+    def frame(self) -> str:
+        now = time.perf_counter()
+        elapsed = now - self.start_time
+        with self.lock:
+            running = dict(self.running)
+            in_flight, completed, errored = self.in_flight, self.completed, self.errored
+            last_error, done_points = self.last_error, self.done_points
+        stats = self.rolling()
+        server_stats = self.server_rolling()
+
+        eta = (
+            format_duration(
+                elapsed / done_points * max(0, self.total_points - done_points)
+            )
+            if done_points
+            else "-"
+        )
+        lines = [
+            f"ai_infra_bench  points {done_points}/{self.total_points}  "
+            f"elapsed {format_duration(elapsed)}  ETA {eta}",
+        ]
+        for name, (desc, start) in running.items():
+            lines.append(
+                f"  running {name} ({desc}) for {format_duration(now - start)}"
+            )
+        # only bench_serving clients, whose requests are not seen
+        server_only = server_stats is not None and not (
+            stats["requests"] or in_flight or completed or errored
+        )
+        if server_only:
+            lines.append(
+                f"server requests  in flight {server_stats['in_flight']:.0f} "
+                "(running + queued)"
+            )
+            lines.append(
+                f"last {self.config.window_s:g}s  "
+                f"{server_stats['output_throughput']:.1f} tok/s"
+            )
+            lines.append(
+                "latency percentiles and SLO: unavailable, the bench_serving "
+                "clients run in their own process"
+            )
+            return "\n".join(lines)
+
+        lines.append(
+            f"requests  in flight {in_flight}  completed {completed}  "
+            f"errored {errored} ({stats['errored']} in the window)"
+        )
+        if last_error:
+            lines.append(f"  last error: {last_error[:120]}")
+        lines.append(
+            f"last {self.config.window_s:g}s  "
+            f"{stats['output_throughput']:.1f} tok/s  "
+            f"{stats['request_throughput']:.2f} req/s"
+        )
+        if server_stats is not None:
+            lines.append(
+                f"server requests  in flight {server_stats['in_flight']:.0f}  "
+                f"{server_stats['output_throughput']:.1f} tok/s"
+            )
+        if all(
+            math.isnan(value)
+            for values in stats["percentiles"].values()
+            for value in values
+        ):
+            lines.append(
+                f"latency percentiles: no request finished in the last "
+                f"{self.config.window_s:g}s"
+            )
+        else:
+            lines.append(f"{'':<16}" + "".join(f"{f'p{p}':>10}" for p in PERCENTILES))
+            for name, values in stats["percentiles"].items():
+                lines.append(
+                    f"{name:<16}"
+                    + "".join(
+                        f"{'-' if math.isnan(value) else f'{value:.1f}':>10}"
+                        for value in values
+                    )
+                )
+        if self.config.slo:
+            status = []
+            for name, bound in self.config.slo.items():
+                p99 = stats["percentiles"][name][PERCENTILES.index(99)]
+                if math.isnan(p99):
+                    status.append(f"{name} <= {bound:g}: -")
+                elif p99 <= bound:
+                    status.append(f"{name} <= {bound:g}: \033[92mOK\033[0m")
+                else:
+                    status.append(f"{name} <= {bound:g}: \033[91mVIOLATED\033[0m")
+            lines.append("SLO (p99)  " + "  ".join(status))
+        return "\n".join(lines)
+
+    def draw(self):
+        frame = self.frame()
+        if self.config.output_file is not None:
+            with open(self.config.output_file, mode="w", encoding="utf-8") as f:
+                f.write(frame + "\n")
+        elif sys.stdout.isatty():
+            # redrawn in place, as top does
+            sys.stdout.write("\033[2J\033[H" + frame + "\n")
+            sys.stdout.flush()
+        else:
+            sys.stdout.write(frame + "\n\n")
+            sys.stdout.flush()
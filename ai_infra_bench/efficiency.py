@@ -0,0 +1,178 @@
+"""
+Normalize the throughput of a point by the GPUs its server uses, and compare
+its decode speed with the memory-bandwidth roofline of the hardware, so that a
+TP1 and a TP4 deployment can be compared, and a config left far below the
+roofline is spotted.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+from ai_infra_bench.backends import Backend
+from ai_infra_bench.prefetch import model_path
+from ai_infra_bench.utils import parse_cmd_args
+
+# bytes per weight, the keys are matched against the dtype or quantization flags,
+# "auto" is not one of them so that the model name decides
+BYTES_PER_PARAM = {
+    "fp32": 4,
+    "float32": 4,
+    "float": 4,
+    "bf16": 2,
+    "bfloat16": 2,
+    "fp16": 2,
+    "float16": 2,
+    "half": 2,
+    "fp8": 1,
+    "int8": 1,
+    "w8a8": 1,
+    "fp4": 0.5,
+    "nvfp4": 0.5,
+    "mxfp4": 0.5,
+    "int4": 0.5,
+    "awq": 0.5,
+    "gptq": 0.5,
+}
+
+
+@dataclass
+class HardwareSpec:
+    """One accelerator, bandwidth in GB/s and memory in GB"""
+
+    name: str
+    mem_bandwidth_gb_s: float
+    mem_gb: float
+
+
+HARDWARE_SPECS: Dict[str, HardwareSpec] = {
+    spec.name: spec
+    for spec in [
+        HardwareSpec("A100-40GB", 1555, 40),
+        HardwareSpec("A100-80GB", 2039, 80),
+        HardwareSpec("H100-PCIe", 2000, 80),
+        HardwareSpec("H100-SXM", 3350, 80),
+        HardwareSpec("H20", 4000, 96),
+        HardwareSpec("H200", 4800, 141),
+        HardwareSpec("B200", 8000, 180),
+        HardwareSpec("L40S", 864, 48),
+        HardwareSpec("MI300X", 5300, 192),
+    ]
+}
+
+
+@dataclass
+class Roofline:
+    """
+    What the decode roofline needs besides the server command.
+
+    - hardware: a HardwareSpec, or the name of one of HARDWARE_SPECS.
+    - params_b: the parameters of the model, in billions.
+    - active_params_b: the parameters active per token of a MoE model, the
+      weights read by a decode step are between them and params_b.
+    - kv_bytes_per_token: the KV cache of one token over all the layers, e.g.
+      2 * layers * kv_heads * head_dim * 2 bytes in bf16, 0 to ignore the
+      KV cache reads.
+    """
+
+    hardware: Union[str, HardwareSpec]
+    params_b: float
+    active_params_b: Optional[float] = None
+    kv_bytes_per_token: float = 0
+
+    def __post_init__(self):
+        if isinstance(self.hardware, str):
+            assert (
+                self.hardware in HARDWARE_SPECS
+            ), f"Unknown hardware {self.hardware}, known: {list(HARDWARE_SPECS)}"
+            self.hardware = HARDWARE_SPECS[self.hardware]
+
+
+def weight_dtype(server_cmd: str, backend: Optional[Backend]) -> str:
+    """The dtype flags of the command, else a dtype in the model name, else bf16"""
+    args = parse_cmd_args(server_cmd)
+    candidates = [args.get(flag) for flag in backend.dtype_args] if backend else []
+    # e.g. Qwen3-32B-FP8, Llama-3-70B-AWQ
+    candidates.append(model_path(server_cmd))
+    for candidate in candidates:
+        if not candidate:
+            continue
+        for dtype in BYTES_PER_PARAM:
+            if re.search(rf"(?<![a-z0-9]){dtype}(?![a-z0-9])", candidate.lower()):
+                return dtype
+    return "bf16"
+
+
+def parse_parallelism(server_cmd: str, backend: Optional[Backend]) -> Dict:
+    """The parallel sizes, GPUs and weight dtype of a server command"""
+    args = parse_cmd_args(server_cmd)
+    sizes = {}
+    for dim in ("tp", "dp", "pp"):
+        flags = backend.parallel_args.get(dim, []) if backend else []
+        value = next((args[flag] for flag in flags if args.get(flag)), 1)
+        sizes[f"{dim}_size"] = int(value)
+    dtype = weight_dtype(server_cmd, backend)
+    return {
+        **sizes,
+        "num_gpus": sizes["tp_size"] * sizes["dp_size"] * sizes["pp_size"],
+        "weight_dtype": dtype,
+        "bytes_per_param": BYTES_PER_PARAM[dtype],
+    }
+
+
+def decode_roofline(item: Dict, parallelism: Dict, roofline: Roofline) -> Dict:
+    """
+    The fastest decode step of the point when it is bound by memory bandwidth:
+    every replica reads its weights, split over its tp GPUs (the pp stages run
+    one after the other), plus the KV cache of its running requests. The batch is
+    the mean number of requests in flight of the point (Little's law), the
+    context the mean input length plus half the mean output length.
+    """
+    completed = item.get("completed") or 0
+    if not completed or not item.get("mean_tpot_ms"):
+        return {}
+    batch = (item.get("concurrency") or item.get("max_concurrency") or 1) / (
+        parallelism["dp_size"]
+    )
+    context = (item["total_input_tokens"] + item["total_output_tokens"] / 2) / completed
+    weight_bytes = (
+        (roofline.active_params_b or roofline.params_b)
+        * 1e9
+        * parallelism["bytes_per_param"]
+    )
+    kv_bytes = batch * context * roofline.kv_bytes_per_token
+    step_s = (weight_bytes + kv_bytes) / (
+        roofline.hardware.mem_bandwidth_gb_s * 1e9 * parallelism["tp_size"]
+    )
+    return {
+        "roofline_tpot_ms": step_s * 1000,
+        "decode_ceiling_tok_s": parallelism["dp_size"] * batch / step_s,
+        # = the decode throughput reached / the ceiling at the same batch
+        "roofline_fraction": step_s * 1000 / item["mean_tpot_ms"],
+    }
+
+
+def efficiency_metrics(
+    item: Dict,
+    server_cmd: str,
+    backend: Optional[Backend],
+    roofline: Optional[Roofline] = None,
+    num_replicas: int = 1,
+) -> Dict:
+    """
+    The per-GPU metrics of a record, and its roofline when given. With
+    num_replicas, the point was served by as many copies of the server.
+    """
+    parallelism = parse_parallelism(server_cmd, backend)
+    parallelism["dp_size"] *= num_replicas
+    parallelism["num_gpus"] *= num_replicas
+    num_gpus = parallelism["num_gpus"]
+    metrics = {
+        key: value for key, value in parallelism.items() if key != "bytes_per_param"
+    }
+    for key in ("output_throughput", "input_throughput", "request_throughput"):
+        if item.get(key) is not None:
+            metrics[f"{key}_per_gpu"] = item[key] / num_gpus
+    if roofline is not None:
+        metrics.update(decode_roofline(item, parallelism, roofline))
+    return metrics
@@ -0,0 +1,635 @@
+"""
+A stand-in for an SGLang server, to run the benches end to end without a GPU.
+
+    python -m ai_infra_bench.mock_server --model-path mock --port 30000 --max-running-requests 32
+
+The requests are scheduled like a continuous batching engine running on a
+simulated device: the admitted prompts are prefilled in chunks of at most
+--chunked-prefill-size tokens, every step decodes one token of all the running
+requests and lasts longer the larger the batch and its KV cache (and larger again
+past --cuda-graph-max-bs), the KV cache holds --mem-fraction-static * KV_TOKENS
+tokens, and a --mem-fraction-static above MAX_MEM_FRACTION runs out of memory at
+startup. With --enable-priority-scheduling, the waiting requests with the
+highest ``priority`` field are admitted first. The prompts are cached by blocks
+of PREFIX_BLOCK words in the free part of the KV cache, a request skips the
+prefill of its longest cached prefix unless --disable-radix-cache. With
+--speculative-algorithm, every step drafts --speculative-num-steps tokens per
+request, each accepted with probability --speculative-accept-rate (a mock-only
+flag) until the first rejection, and verifies --speculative-num-draft-tokens
+tokens per request, which pays off at small batches only. The adapters of
+--lora-paths are requested by their name in ``lora_path`` or ``model``, at most
+--max-loras-per-batch of them are loaded at once, a request waits until its
+adapter can be, and every load costs LORA_LOAD_S. The requests with a JSON
+schema (``response_format``) or a regex (``regex`` or ``guided_regex``) are
+answered with an output that follows it, every distinct grammar is compiled once
+in GRAMMAR_COMPILE_S of --grammar-backend per 1000 characters, and every step
+computes the token mask of every constrained request in GRAMMAR_MASK_PER_REQ_S.
+The requests whose client went away are noticed at the next token streamed to
+them, and released every --abort-check-interval decode steps (a mock-only flag),
+decoding until then.
+So the flags trade throughput against latency the way the real ones do.
+
+It serves /v1/models, /v1/chat/completions (streaming or not), /health and
+/metrics, and logs its startup and its scheduler like SGLang. /v1/embeddings and
+/v1/rerank requests are only prefilled, as by an embedding or a rerank model.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+import zlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+KV_TOKENS = 100_000
+MAX_MEM_FRACTION = 0.92
+STEP_BASE_S = 0.004
+STEP_PER_REQ_S = 0.0002
+STEP_PER_KV_TOKEN_S = 2e-8
+PREFILL_PER_TOKEN_S = 2e-5
+NO_CUDA_GRAPH_SLOWDOWN = 1.3
+LOG_INTERVAL = 40
+PREFIX_BLOCK = 64
+DRAFT_STEP_BASE_S = 0.001
+DRAFT_STEP_PER_REQ_S = 0.00005
+LORA_LOAD_S = 0.02
+LORA_STEP_PER_ADAPTER_S = 0.0003
+SCHEDULE_POLICIES = ["fcfs", "lpm", "random"]
+GRAMMAR_BACKENDS = ["xgrammar", "llguidance", "outlines", "none"]
+GRAMMAR_COMPILE_S = {"xgrammar": 0.02, "llguidance": 0.005, "outlines": 0.2}
+GRAMMAR_MASK_PER_REQ_S = {
+    "xgrammar": 0.00003,
+    "llguidance": 0.00005,
+    "outlines": 0.0003,
+}
+
+
+@dataclass
+class MockRequest:
+    prompt_len: int
+    max_tokens: int
+    priority: int = 0
+    # cumulative hashes of the full blocks of the prompt
+    block_hashes: List[int] = field(default_factory=list)
+    adapter: Optional[str] = None
+    # the constrained requests generate output_chunks under their grammar
+    grammar: Optional[str] = None
+    output_chunks: Optional[List[str]] = None
+    arrival: float = field(default_factory=time.perf_counter)
+    tokens: asyncio.Queue = field(default_factory=asyncio.Queue)
+    prefilled: int = 0
+    cached: int = 0
+    generated: int = 0
+    cancelled: bool = False
+
+    @property
+    def kv_tokens(self) -> int:
+        return self.prompt_len + self.max_tokens
+
+
+class MockScheduler:
+    def __init__(self, args):
+        self.max_running_requests = args.max_running_requests
+        self.chunked_prefill_size = args.chunked_prefill_size
+        self.cuda_graph_max_bs = args.cuda_graph_max_bs
+        self.schedule_policy = args.schedule_policy
+        self.enable_priority_scheduling = args.enable_priority_scheduling
+        self.max_total_tokens = int(args.mem_fraction_static * KV_TOKENS)
+        self.prefix_cache: OrderedDict = OrderedDict()
+        self.disable_radix_cache = args.disable_radix_cache
+        self.speculative = bool(args.speculative_algorithm)
+        self.num_steps = args.speculative_num_steps
+        self.num_draft_tokens = args.speculative_num_draft_tokens or self.num_steps + 1
+        self.accept_rate = args.speculative_accept_rate
+        self.accept_length = 0.0
+        self.max_loras_per_batch = args.max_loras_per_batch
+        # the adapters in GPU memory, the least recently used first
+        self.loaded_loras: OrderedDict = OrderedDict()
+        self.pending_lora_loads = 0
+        self.grammar_backend = args.grammar_backend
+        self.compiled_grammars = set()
+        self.pending_grammar_compile_s = 0.0
+        self.abort_check_interval = args.abort_check_interval
+        self.cached_tokens = 0
+        self.waiting: deque = deque()
+        self.running: List[MockRequest] = []
+        self.kv_used = 0
+        self.wakeup = asyncio.Event()
+        self.num_requests = 0
+        self.prompt_tokens = 0
+        self.generation_tokens = 0
+        self.gen_throughput = 0.0
+
+    def submit(self, request: MockRequest):
+        self.num_requests += 1
+        self.waiting.append(request)
+        self.wakeup.set()
+
+    def _admit(self):
+        waiting = [request for request in self.waiting if not request.cancelled]
+        if self.schedule_policy == "lpm":
+            # stands for the longest prefix match, the longest prompts first
+            waiting.sort(key=lambda request: -request.prompt_len)
+        elif self.schedule_policy == "random":
+            random.shuffle(waiting)
+        if self.enable_priority_scheduling:
+            # stable, the policy still orders the requests of a priority
+            waiting.sort(key=lambda request: -request.priority)
+        admitted = []
+        for request in waiting:
+            if len(self.running) >= self.max_running_requests:
+                break
+            if request.kv_tokens > self.max_total_tokens:
+                request.tokens.put_nowait(ValueError("prompt too long"))
+                admitted.append(request)
+                continue
+            if self.kv_used + request.kv_tokens > self.max_total_tokens:
+                # fcfs blocks the queue, the others look further
+                if self.schedule_policy == "fcfs":
+                    break
+                continue
+            if request.adapter is not None and not self._load_lora(request.adapter):
+                if self.schedule_policy == "fcfs":
+                    break
+                continue
+            if request.grammar is not None:
+                self._compile_grammar(request.grammar)
+            self.kv_used += request.kv_tokens
+            self._match_prefix(request)
+            self.running.append(request)
+            admitted.append(request)
+        admitted_ids = {id(request) for request in admitted}
+        self.waiting = deque(
+            request for request in waiting if id(request) not in admitted_ids
+        )
+
+    def _match_prefix(self, request: MockRequest):
+        if self.disable_radix_cache:
+            return
+        num_blocks = 0
+        for block_hash in request.block_hashes:
+            if block_hash not in self.prefix_cache:
+                break
+            self.prefix_cache.move_to_end(block_hash)
+            num_blocks += 1
+        # the last token is always computed
+        request.cached = min(num_blocks * PREFIX_BLOCK, request.prompt_len - 1)
+        request.prefilled = request.cached
+        self.cached_tokens += request.cached
+        for block_hash in request.block_hashes:
+            self.prefix_cache[block_hash] = None
+            self.prefix_cache.move_to_end(block_hash)
+        # the cache lives in the KV cache left free by the running requests
+        while (
+            len(self.prefix_cache) * PREFIX_BLOCK > self.max_total_tokens - self.kv_used
+        ):
+            self.prefix_cache.popitem(last=False)
+
+    def _load_lora(self, adapter: str) -> bool:
+        """Make room for the adapter, False while every slot serves a running request"""
+        if adapter in self.loaded_loras:
+            self.loaded_loras.move_to_end(adapter)
+            return True
+        if len(self.loaded_loras) >= self.max_loras_per_batch:
+            in_use = {request.adapter for request in self.running}
+            unused = next(
+                (loaded for loaded in self.loaded_loras if loaded not in in_use), None
+            )
+            if unused is None:
+                return False
+            del self.loaded_loras[unused]
+        self.loaded_loras[adapter] = None
+        self.pending_lora_loads += 1
+        return True
+
+    def _compile_grammar(self, grammar: str):
+        if grammar in self.compiled_grammars:
+            return
+        self.compiled_grammars.add(grammar)
+        self.pending_grammar_compile_s += GRAMMAR_COMPILE_S[self.grammar_backend] * max(
+            1, len(grammar) / 1000
+        )
+
+    def _release(self, request: MockRequest):
+        self.running.remove(request)
+        self.kv_used -= request.kv_tokens
+
+    async def loop(self):
+        decode_steps = 0
+        log_start, log_tokens, log_verified = time.perf_counter(), 0, 0
+        while True:
+            # until then the aborted requests keep decoding
+            if decode_steps % self.abort_check_interval == 0:
+                for request in [r for r in self.running if r.cancelled]:
+                    self._release(request)
+            if not self.waiting and not self.running:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+            self._admit()
+
+            # chunked prefill
+            budget, new_seqs, new_tokens, cached = self.chunked_prefill_size, 0, 0, 0
+            for request in self.running:
+                if budget == 0:
+                    break
+                if request.prefilled < request.prompt_len:
+                    if request.prefilled == request.cached:
+                        cached += request.cached
+                    num_tokens = min(budget, request.prompt_len - request.prefilled)
+                    request.prefilled += num_tokens
+                    budget -= num_tokens
+                    new_tokens += num_tokens
+                    new_seqs += 1
+            if new_tokens:
+                print(
+                    f"Prefill batch. #new-seq: {new_seqs}, #new-token: {new_tokens}, "
+                    f"#cached-token: {cached}, token usage: {self.token_usage:.2f}, "
+                    f"#running-req: {len(self.running)}, #queue-req: {len(self.waiting)}"
+                )
+
+            # one token for every prefilled request, the first one ends its prefill
+            batch = [
+                r
+                for r in self.running
+                if r.prefilled == r.prompt_len and r.max_tokens > 0
+            ]
+            # the verify pass scores every draft token of every request
+            tokens_per_req = self.num_draft_tokens if self.speculative else 1
+            step_time = (
+                STEP_BASE_S
+                + len(batch) * tokens_per_req * STEP_PER_REQ_S
+                + self.kv_used * STEP_PER_KV_TOKEN_S
+            )
+            if len(batch) > self.cuda_graph_max_bs:
+                step_time *= NO_CUDA_GRAPH_SLOWDOWN
+            if self.speculative and batch:
+                step_time += self.num_steps * (
+                    DRAFT_STEP_BASE_S + len(batch) * DRAFT_STEP_PER_REQ_S
+                )
+            step_time += new_tokens * PREFILL_PER_TOKEN_S
+            # the adapters loaded by this step, and one lora kernel per adapter of the batch
+            step_time += self.pending_lora_loads * LORA_LOAD_S
+            step_time += (
+                len({r.adapter for r in batch if r.adapter is not None})
+                * LORA_STEP_PER_ADAPTER_S
+            )
+            self.pending_lora_loads = 0
+            # the grammars compiled for this step, and the masks of the batch
+            step_time += self.pending_grammar_compile_s
+            step_time += len([r for r in batch if r.grammar is not None]) * (
+                GRAMMAR_MASK_PER_REQ_S.get(self.grammar_backend, 0.0)
+            )
+            self.pending_grammar_compile_s = 0.0
+            await asyncio.sleep(step_time)
+            # the embedding and rerank requests are done once prefilled
+            for request in [
+                r
+                for r in self.running
+                if r.prefilled == r.prompt_len and r.max_tokens == 0
+            ]:
+                request.tokens.put_nowait(None)
+                self._release(request)
+                self.prompt_tokens += request.prompt_len
+            if not batch:
+                continue
+
+            num_tokens = 0
+            for request in batch:
+                accepted = 1
+                if self.speculative:
+                    while (
+                        accepted <= self.num_steps
+                        and random.random() < self.accept_rate
+                    ):
+                        accepted += 1
+                log_verified += 1
+                accepted = min(accepted, request.max_tokens - request.generated)
+                for pos in range(request.generated, request.generated + accepted):
+                    request.tokens.put_nowait(
+                        request.output_chunks[pos] if request.output_chunks else " w"
+                    )
+                request.generated += accepted
+                num_tokens += accepted
+                if request.generated >= request.max_tokens:
+                    request.tokens.put_nowait(None)
+                    self._release(request)
+                    self.prompt_tokens += request.prompt_len
+            self.generation_tokens += num_tokens
+            log_tokens += num_tokens
+
+            decode_steps += 1
+            if decode_steps % LOG_INTERVAL == 0:
+                now = time.perf_counter()
+                self.gen_throughput = log_tokens / (now - log_start)
+                self.accept_length = log_tokens / max(log_verified, 1)
+                log_start, log_tokens, log_verified = now, 0, 0
+                accept_str = (
+                    f"accept len: {self.accept_length:.2f}, "
+                    if self.speculative
+                    else ""
+                )
+                print(
+                    f"Decode batch. #running-req: {len(self.running)}, "
+                    f"#token: {self.kv_used}, token usage: {self.token_usage:.2f}, "
+                    f"{accept_str}cuda graph: {len(batch) <= self.cuda_graph_max_bs}, "
+                    f"gen throughput (token/s): {self.gen_throughput:.2f}, "
+                    f"#queue-req: {len(self.waiting)}"
+                )
+
+    @property
+    def token_usage(self) -> float:
+        return self.kv_used / self.max_total_tokens
+
+
+def schema_instance(schema: Dict):
+    """The smallest instance of a JSON schema, for the usual keywords"""
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            key: schema_instance(value)
+            for key, value in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [schema_instance(schema.get("items", {}))] * min(
+            1, schema.get("maxItems", 1)
+        )
+    if kind == "string":
+        return "w" * min(8, schema.get("maxLength", 8))
+    if kind in ("integer", "number"):
+        return schema.get("minimum", 0)
+    if kind == "boolean":
+        return True
+    return None
+
+
+def regex_instance(pattern: str) -> Optional[str]:
+    """
+    The first alternative of every group of a regex made of literal text and
+    groups of literal alternatives, None for any other regex
+    """
+    text = re.sub(r"\(([^()]*)\)", lambda match: match.group(1).split("|")[0], pattern)
+    if re.search(r"[\\\[\]{}()*+?.^$|]", text):
+        return None
+    return text
+
+
+def grammar_output(body: Dict) -> Tuple[Optional[str], Optional[str]]:
+    """The grammar of a request and the output following it, if any"""
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        schema = response_format.get("json_schema", {}).get("schema", {})
+        return json.dumps(schema, sort_keys=True), json.dumps(schema_instance(schema))
+    pattern = body.get("regex") or body.get("guided_regex")
+    if pattern:
+        return pattern, regex_instance(pattern)
+    return None, None
+
+
+def build_app(args) -> web.Application:
+    scheduler = MockScheduler(args)
+
+    async def start_scheduler(app):
+        app["scheduler_task"] = asyncio.create_task(scheduler.loop())
+
+    # name=path, or a path which is also the name
+    lora_names = [path.split("=", 1)[0] for path in args.lora_paths or []]
+
+    async def models(request):
+        return web.json_response(
+            {"data": [{"id": name} for name in [args.model_path, *lora_names]]}
+        )
+
+    async def health(request):
+        return web.Response(text="ok")
+
+    async def metrics(request):
+        labels = f'{{model_name="{args.model_path}"}}'
+        lines = [
+            f"sglang:num_running_reqs{labels} {len(scheduler.running)}",
+            f"sglang:num_queue_reqs{labels} {len(scheduler.waiting)}",
+            f"sglang:token_usage{labels} {scheduler.token_usage}",
+            f"sglang:gen_throughput{labels} {scheduler.gen_throughput}",
+            f"sglang:num_requests_total{labels} {scheduler.num_requests}",
+            f"sglang:prompt_tokens_total{labels} {scheduler.prompt_tokens}",
+            f"sglang:generation_tokens_total{labels} {scheduler.generation_tokens}",
+            f"sglang:cached_tokens_total{labels} {scheduler.cached_tokens}",
+            f"sglang:spec_accept_length{labels} {scheduler.accept_length}",
+        ]
+        return web.Response(text="\n".join(lines) + "\n")
+
+    async def chat_completions(request):
+        body = await request.json()
+        words = [
+            word
+            for message in body.get("messages", [])
+            for word in str(message.get("content", "")).split()
+        ]
+        prompt_len = len(words)
+        block_hashes, block_hash = [], 0
+        for end in range(PREFIX_BLOCK, prompt_len + 1, PREFIX_BLOCK):
+            block = " ".join(words[end - PREFIX_BLOCK : end]).encode()
+            block_hash = zlib.crc32(block, block_hash)
+            block_hashes.append(block_hash)
+        max_tokens = int(
+            body.get("max_tokens") or body.get("max_completion_tokens") or 16
+        )
+        # lora_path for SGLang, the model for vLLM, or the model:adapter of SGLang
+        adapter = body.get("lora_path")
+        model = str(body.get("model") or "")
+        if adapter is None and model in lora_names:
+            adapter = model
+        elif adapter is None and model.startswith(f"{args.model_path}:"):
+            adapter = model[len(args.model_path) + 1 :]
+        if adapter is not None and adapter not in lora_names:
+            return web.json_response(
+                {"error": f"LoRA adapter {adapter} is not loaded"}, status=400
+            )
+        grammar, output = grammar_output(body)
+        if grammar is not None and args.grammar_backend == "none":
+            return web.json_response(
+                {"error": "constrained decoding is disabled, --grammar-backend none"},
+                status=400,
+            )
+        # the grammar ends the output, about 4 characters per token
+        output_chunks = None
+        if output is not None:
+            output_chunks = [output[i : i + 4] for i in range(0, len(output), 4)]
+            output_chunks = output_chunks[:max_tokens]
+        mock_request = MockRequest(
+            max(1, prompt_len),
+            len(output_chunks) if output_chunks else max(1, max_tokens),
+            int(body.get("priority") or 0),
+            block_hashes,
+            adapter,
+            grammar,
+            output_chunks,
+        )
+        scheduler.submit(mock_request)
+        usage = {
+            "prompt_tokens": mock_request.prompt_len,
+            "completion_tokens": mock_request.max_tokens,
+            "total_tokens": mock_request.kv_tokens,
+        }
+
+        try:
+            if not body.get("stream"):
+                text = []
+                while (token := await mock_request.tokens.get()) is not None:
+                    if isinstance(token, Exception):
+                        return web.json_response({"error": str(token)}, status=400)
+                    text.append(token)
+                return web.json_response(
+                    {
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {
+                                    "role": "assistant",
+                                    "content": "".join(text),
+                                },
+                                "finish_reason": "length",
+                            }
+                        ],
+                        "usage": usage,
+                    }
+                )
+
+            response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await response.prepare(request)
+            while (token := await mock_request.tokens.get()) is not None:
+                if isinstance(token, Exception):
+                    break
+                chunk = {"choices": [{"index": 0, "delta": {"content": token}}]}
+                await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            if body.get("stream_options", {}).get("include_usage"):
+                chunk = {"choices": [], "usage": usage}
+                await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            await response.write(b"data: [DONE]\n\n")
+            return response
+        finally:
+            # the client went away, its KV cache is released at the next step
+            mock_request.cancelled = mock_request.generated < mock_request.max_tokens
+
+    async def prefill_only(prompt_len: int):
+        """Schedule a request with no output token, returns its error if any"""
+        mock_request = MockRequest(max(1, prompt_len), 0)
+        scheduler.submit(mock_request)
+        while (token := await mock_request.tokens.get()) is not None:
+            if isinstance(token, Exception):
+                return token
+        return None
+
+    async def embeddings(request):
+        body = await request.json()
+        inputs = body.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        prompt_len = sum(len(str(text).split()) for text in inputs)
+        error = await prefill_only(prompt_len)
+        if error is not None:
+            return web.json_response({"error": str(error)}, status=400)
+        return web.json_response(
+            {
+                "object": "list",
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": [0.0] * 8}
+                    for i in range(len(inputs))
+                ],
+                "usage": {"prompt_tokens": prompt_len, "total_tokens": prompt_len},
+            }
+        )
+
+    async def rerank(request):
+        body = await request.json()
+        query_len = len(str(body.get("query", "")).split())
+        documents = body.get("documents") or []
+        # every document is scored together with the query
+        prompt_len = sum(query_len + len(str(doc).split()) for doc in documents)
+        error = await prefill_only(prompt_len)
+        if error is not None:
+            return web.json_response({"error": str(error)}, status=400)
+        return web.json_response(
+            {
+                "results": [
+                    {"index": i, "relevance_score": random.random()}
+                    for i in range(len(documents))
+                ],
+                "usage": {"prompt_tokens": prompt_len, "total_tokens": prompt_len},
+            }
+        )
+
+    app = web.Application()
+    app.on_startup.append(start_scheduler)
+    app.add_routes(
+        [
+            web.get("/v1/models", models),
+            web.get("/health", health),
+            web.get("/metrics", metrics),
+            web.post("/v1/chat/completions", chat_completions),
+            web.post("/v1/embeddings", embeddings),
+            web.post("/v1/rerank", rerank),
+        ]
+    )
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model-path", default="mock")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=30000)
+    parser.add_argument("--max-running-requests", type=int, default=64)
+    parser.add_argument("--chunked-prefill-size", type=int, default=2048)
+    parser.add_argument("--mem-fraction-static", type=float, default=0.8)
+    parser.add_argument("--cuda-graph-max-bs", type=int, default=160)
+    parser.add_argument("--schedule-policy", default="fcfs", choices=SCHEDULE_POLICIES)
+    parser.add_argument("--enable-priority-scheduling", action="store_true")
+    parser.add_argument("--disable-radix-cache", action="store_true")
+    parser.add_argument("--speculative-algorithm", default=None)
+    parser.add_argument("--speculative-num-steps", type=int, default=3)
+    parser.add_argument("--speculative-num-draft-tokens", type=int, default=None)
+    parser.add_argument("--speculative-accept-rate", type=float, default=0.7)
+    parser.add_argument("--lora-paths", nargs="*", default=None)
+    parser.add_argument("--max-loras-per-batch", type=int, default=8)
+    parser.add_argument(
+        "--grammar-backend", default="xgrammar", choices=GRAMMAR_BACKENDS
+    )
+    parser.add_argument(
+        "--abort-check-interval",
+        type=int,
+        default=1,
+        help="mock-only, decode steps between two checks of the aborted requests",
+    )
+    parser.add_argument(
+        "--startup-time", type=float, default=1.0, help="simulated seconds to start"
+    )
+    # the other flags of a real launch command are accepted and ignored
+    args, _ = parser.parse_known_args()
+
+    print("Load weight begin")
+    time.sleep(args.startup_time * 0.6)
+    print("Load weight end")
+    if args.mem_fraction_static > MAX_MEM_FRACTION:
+        print("torch.OutOfMemoryError: CUDA out of memory", file=sys.stderr)
+        sys.exit(1)
+    print(
+        f"KV Cache is allocated. #tokens: {int(args.mem_fraction_static * KV_TOKENS)}"
+    )
+    print("Capture cuda graph begin")
+    time.sleep(args.startup_time * 0.4)
+    print("Capture cuda graph end")
+    print("The server is fired up and ready to roll!")
+    web.run_app(build_app(args), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
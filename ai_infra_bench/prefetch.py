@@ -0,0 +1,149 @@
+"""
+Read the weights of the next server of a sweep into the OS page cache while the
+current one is measured, so that the next launch loads them from memory instead
+of a cold (possibly network-mounted) disk.
+"""
+
+import glob
+import os
+import threading
+import time
+from typing import List, Optional
+
+from ai_infra_bench.utils import parse_cmd_args
+
+WEIGHT_SUFFIXES = (".safetensors", ".bin", ".pt", ".pth", ".gguf")
+CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def model_path(server_cmd: str) -> Optional[str]:
+    """--model-path / --model of the command, or the positional model of `serve`"""
+    args = parse_cmd_args(server_cmd)
+    path = args.get("--model-path") or args.get("--model")
+    if path:
+        return path
+    tokens = server_cmd.replace("\\\n", " ").replace("\\", " ").split()
+    for i, token in enumerate(tokens[:-1]):
+        # vllm serve <model>, trtllm-serve <model>
+        if token.endswith("serve") and not tokens[i + 1].startswith("--"):
+            return tokens[i + 1]
+    return None
+
+
+def _hf_snapshot(repo_id: str) -> Optional[str]:
+    """The latest snapshot of a huggingface repo id in the local hub cache"""
+    hub_cache = os.environ.get("HF_HUB_CACHE") or os.path.join(
+        os.environ.get(
+            "HF_HOME", os.path.join(os.path.expanduser("~"), ".cache", "huggingface")
+        ),
+        "hub",
+    )
+    snapshots = glob.glob(
+        os.path.join(
+            hub_cache, f"models--{repo_id.replace('/', '--')}", "snapshots", "*"
+        )
+    )
+    return max(snapshots, key=os.path.getmtime) if snapshots else None
+
+
+def weight_files(path: Optional[str]) -> List[str]:
+    if path and not os.path.exists(path):
+        path = _hf_snapshot(path)
+    if not path:
+        return []
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for root, _, filenames in os.walk(path):
+        files.extend(
+            os.path.join(root, filename)
+            for filename in filenames
+            if filename.endswith(WEIGHT_SUFFIXES)
+        )
+    return sorted(files)
+
+
+def _mem_available() -> Optional[int]:
+    try:
+        with open("/proc/meminfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class WeightPrefetcher:
+    """
+    Reads the weight files of ``server_cmd`` once, from a daemon thread with the
+    lowest CPU priority (the best-effort I/O priority follows it on Linux). The
+    weights are skipped when they do not fit in the available memory, they would
+    only evict each other.
+    """
+
+    def __init__(self, server_cmd: str):
+        self.path = model_path(server_cmd)
+        self.files = weight_files(self.path)
+        self.bytes_read = 0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._read, daemon=True)
+
+    def start(self):
+        if not self.files:
+            print(f"No weights to prefetch for {self.path}")
+            return
+        total = sum(os.path.getsize(file) for file in self.files)
+        available = _mem_available()
+        if available is not None and total > available:
+            print(
+                f"\033[93m Weights of {self.path} ({total / 2**30:.1f} GiB) do not fit "
+                f"in the page cache ({available / 2**30:.1f} GiB), not prefetched \033[0m"
+            )
+            return
+        print(f"Prefetching {total / 2**30:.1f} GiB of weights from {self.path}")
+        self._thread.start()
+
+    def _read(self):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+        start_time = time.perf_counter()
+        for file in self.files:
+            with open(file, "rb", buffering=0) as f:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                while not self._stop.is_set():
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    self.bytes_read += len(chunk)
+            if self._stop.is_set():
+                break
+        self.duration = time.perf_counter() - start_time
+
+    def stop(self):
+        """Stop reading, the weights read so far stay cached"""
+        self._stop.set()
+        if self._thread.ident is not None:
+            self._thread.join()
+            print(
+                f"Prefetch of {self.path} DONE: {self.bytes_read / 2**30:.1f} GiB "
+                f"in {self.duration:.1f}s"
+            )
+
+
+def prefetch_next(
+    server_cmds: List[str], server_idx: int
+) -> Optional[WeightPrefetcher]:
+    """Start prefetching the weights of the server after server_idx, if it has other weights"""
+    if server_idx + 1 >= len(server_cmds):
+        return None
+    next_cmd = server_cmds[server_idx + 1]
+    if model_path(next_cmd) == model_path(server_cmds[server_idx]):
+        return None
+    prefetcher = WeightPrefetcher(next_cmd)
+    prefetcher.start()
+    return prefetcher
@@ -0,0 +1,328 @@
+"""
+Rebuild table.md, full_data.csv and the plots from the result files of an output
+directory, without rerunning the benchmark.
+
+    python -m ai_infra_bench.report general_bench_output --metrics p99_ttft_ms
+
+The benchmarks save their mode, labels, input_features and metrics to report.json
+when they start and call ``build_report`` after every completed point, so partial
+results are always viewable. Only the sections whose result files changed since the
+last build are rebuilt.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from ai_infra_bench.utils import find_labels, label_result_files, load_label_results
+
+REPORT_CONFIG = "report.json"
+REPORT_MANIFEST = ".report_manifest.json"
+REPORT_MODES = [
+    "general",
+    "cmp",
+    "slo",
+    "soak",
+    "ramp",
+    "tenant",
+    "routing",
+    "spec",
+]
+# the modes whose tables and plots mix all the labels
+CMP_MODES = ["cmp", "routing", "spec"]
+# the modes whose labels are alternative configs for the same points
+PARETO_MODES = ["cmp", "routing"]
+
+
+def save_report_config(
+    output_dir: str,
+    *,
+    mode: str,
+    labels: List[str],
+    input_features: List[str],
+    metrics: List[str],
+):
+    assert mode in REPORT_MODES, f"{mode=} should be one of {REPORT_MODES}"
+    config = dict(
+        mode=mode, labels=labels, input_features=input_features, metrics=metrics
+    )
+    with open(os.path.join(output_dir, REPORT_CONFIG), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+
+def _load_json(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _hash_label(output_dir: str, label: str) -> str:
+    sha = hashlib.sha1()
+    for filepath in label_result_files(output_dir, label):
+        sha.update(os.path.basename(filepath).encode())
+        with open(filepath, "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def export_full_csv(data: List[List[Dict]], labels: List[str], output_dir: str):
+    """One row per point, list-valued fields are dumped as json"""
+    csv_path = os.path.join(output_dir, "full_data.csv")
+    print(f"Writing full csv file to {csv_path}")
+    columns = ["label"]
+    for server_data in data:
+        for item in server_data:
+            columns.extend(key for key in item if key not in columns)
+
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for server_data, label in zip(data, labels):
+            for item in server_data:
+                row = {
+                    key: json.dumps(value) if isinstance(value, (list, dict)) else value
+                    for key, value in item.items()
+                }
+                writer.writerow({"label": label, **row})
+    print(f"Writing full csv file to {csv_path} DONE")
+
+
+def failed_points_md(data: List[List[Dict]], labels: List[str]) -> str:
+    md_str = ""
+    for server_data, label in zip(data, labels):
+        for client_idx, item in enumerate(server_data):
+            if item.get("failed"):
+                md_str += f"| {label} | {client_idx} | {item['attempts']} | {item['error']} |\n"
+    if not md_str:
+        return ""
+    return (
+        "Failed points:\n"
+        "| label | client | attempts | error |\n"
+        + "| --- " * 4
+        + "|\n"
+        + md_str
+        + "\n" * 5
+    )
+
+
+def _exporters(mode: str):
+    # imported here since the benchmarks import this module to update their report
+    if mode == "general":
+        from ai_infra_bench.sgl.general_bench import general_plot, general_table_md
+
+        return general_table_md, general_plot
+    if mode == "slo":
+        from ai_infra_bench.sgl.slo_bench import slo_plot, slo_table_md
+
+        return slo_table_md, slo_plot
+    if mode == "soak":
+        from ai_infra_bench.sgl.soak_bench import soak_plot, soak_table_md
+
+        return soak_table_md, soak_plot
+    if mode == "ramp":
+        from ai_infra_bench.sgl.ramp_bench import ramp_plot, ramp_table_md
+
+        return ramp_table_md, ramp_plot
+    if mode == "tenant":
+        from ai_infra_bench.sgl.tenant_bench import tenant_plot, tenant_table_md
+
+        return tenant_table_md, tenant_plot
+    if mode == "routing":
+        from ai_infra_bench.sgl.routing_bench import routing_plot, routing_table_md
+
+        return routing_table_md, routing_plot
+    if mode == "spec":
+        from ai_infra_bench.sgl.spec_bench import spec_plot, spec_table_md
+
+        return spec_table_md, spec_plot
+    from ai_infra_bench.sgl.cmp_bench import cmp_plot, cmp_table_md
+
+    return cmp_table_md, cmp_plot
+
+
+def build_report(
+    output_dir: str,
+    *,
+    mode: Optional[str] = None,
+    labels: Optional[List[str]] = None,
+    input_features: Optional[List[str]] = None,
+    metrics: Optional[List[str]] = None,
+    force: bool = False,
+) -> List[str]:
+    """
+    Rebuild the report of output_dir, the arguments default to the ones saved in
+    report.json. Returns the labels whose sections have been rebuilt.
+    """
+    config = _load_json(os.path.join(output_dir, REPORT_CONFIG))
+    mode = mode or config.get("mode", "general")
+    labels = labels or config.get("labels") or find_labels(output_dir)
+    input_features = input_features or config.get("input_features")
+    metrics = metrics or config.get("metrics")
+    assert mode in REPORT_MODES, f"{mode=} should be one of {REPORT_MODES}"
+    assert (
+        input_features and metrics
+    ), f"input_features and metrics should be given since {REPORT_CONFIG} is not found"
+    if not config:
+        # remember them, so that the next rebuilds need no argument
+        save_report_config(
+            output_dir,
+            mode=mode,
+            labels=labels,
+            input_features=input_features,
+            metrics=metrics,
+        )
+
+    manifest_path = os.path.join(output_dir, REPORT_MANIFEST)
+    manifest = _load_json(manifest_path)
+    config_hash = hashlib.sha1(
+        json.dumps([mode, labels, input_features, metrics]).encode()
+    ).hexdigest()
+    if force or manifest.get("config") != config_hash:
+        manifest = {"config": config_hash, "labels": {}, "tables": {}}
+
+    label_hashes = {label: _hash_label(output_dir, label) for label in labels}
+    changed = [
+        label
+        for label in labels
+        if manifest["labels"].get(label) != label_hashes[label]
+    ]
+    if not changed:
+        print(f"Report of {output_dir} is up to date")
+        return []
+
+    data = [
+        load_label_results(output_dir, label, include_failed=True) for label in labels
+    ]
+    # the cmp tables keep the failed points to stay aligned across the labels
+    label_data = {
+        label: [
+            item for item in server_data if mode in CMP_MODES or not item.get("failed")
+        ]
+        for label, server_data in zip(labels, data)
+    }
+    table_md, plot = _exporters(mode)
+
+    table_path = os.path.join(output_dir, "table.md")
+    print(f"Writing table to {table_path}")
+    if mode in CMP_MODES:
+        # every table and plot mixes all the labels
+        present = [label for label in labels if label_data[label]]
+        md_tables_str = ""
+        if present:
+            present_data = [label_data[label] for label in present]
+            md_tables_str = table_md(present_data, input_features, metrics, present)
+            plot(present_data, input_features, metrics, present, output_dir)
+    else:
+        # one table section and one set of plots per label
+        for label in changed:
+            manifest["tables"][label] = ""
+            if label_data[label]:
+                manifest["tables"][label] = table_md(
+                    [label_data[label]], input_features, metrics, [label]
+                )
+                plot([label_data[label]], input_features, metrics, [label], output_dir)
+        md_tables_str = "".join(manifest["tables"].get(label, "") for label in labels)
+    md_tables_str += failed_points_md(data, labels)
+    with open(table_path, "w", encoding="utf-8") as f:
+        f.write(md_tables_str)
+    print("Writing table DONE")
+
+    if mode == "slo":
+        from ai_infra_bench.sgl.slo_bench import slo_export_turn_tables
+
+        slo_export_turn_tables(
+            [label_data[label] for label in labels], input_features, labels, output_dir
+        )
+
+    if mode in PARETO_MODES:
+        from ai_infra_bench.sgl.pareto_report import export_pareto_report
+
+        export_pareto_report(
+            [label_data[label] for label in labels],
+            input_features,
+            metrics,
+            labels,
+            output_dir,
+        )
+
+    from ai_infra_bench.sgl.bucket_report import export_bucket_report
+
+    export_bucket_report(
+        [label_data[label] for label in labels], input_features, labels, output_dir
+    )
+
+    from ai_infra_bench.sgl.adapter_report import export_adapter_report
+
+    export_adapter_report(
+        [label_data[label] for label in labels], input_features, labels, output_dir
+    )
+
+    export_full_csv(data, labels, output_dir)
+
+    manifest["labels"].update({label: label_hashes[label] for label in changed})
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return changed
+
+
+class BackgroundReport:
+    """
+    Runs build_report in a background thread, e.g. while the next server starts.
+    wait() before measuring again, the build must not compete with the clients.
+    An error of the build is raised by wait(), as the build would have raised.
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def _build(self):
+        try:
+            build_report(self.output_dir)
+        except Exception as e:
+            self._error = e
+
+    def start(self):
+        self.wait()
+        self._thread = threading.Thread(target=self._build, daemon=True)
+        self._thread.start()
+
+    def wait(self):
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output_dir")
+    parser.add_argument("--mode", choices=REPORT_MODES, default=None)
+    parser.add_argument("--labels", nargs="+", default=None)
+    parser.add_argument("--input-features", nargs="+", default=None)
+    parser.add_argument("--metrics", nargs="+", default=None)
+    parser.add_argument(
+        "--force", action="store_true", help="rebuild every section of the report"
+    )
+    args = parser.parse_args()
+
+    build_report(
+        args.output_dir,
+        mode=args.mode,
+        labels=args.labels,
+        input_features=args.input_features,
+        metrics=args.metrics,
+        force=args.force,
+    )
+
+
+if __name__ == "__main__":
+    main()
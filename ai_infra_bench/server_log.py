@@ -0,0 +1,135 @@
+import csv
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from ai_infra_bench.backends import Backend
+
+# only the most recent lines are kept in memory, the log file has all of them
+MAX_LINES = 100_000
+
+
+class ServerLog:
+    """
+    Reads the output of a server process from a background thread, so the server
+    never blocks on a full pipe. Every line is written to ``log_file`` and kept in
+    memory with the time.perf_counter() at which it was read.
+    """
+
+    def __init__(self, process: subprocess.Popen, log_file: str):
+        self.process = process
+        self.log_file = log_file
+        self.lines: deque = deque(maxlen=MAX_LINES)
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def _read(self):
+        with open(self.log_file, mode="a", encoding="utf-8") as f:
+            for line in self.process.stdout:
+                self.lines.append((time.perf_counter(), line.rstrip("\n")))
+                f.write(line)
+                f.flush()
+
+    def between(
+        self, start_time: float, end_time: Optional[float] = None
+    ) -> List[Tuple[float, str]]:
+        end_time = end_time or float("inf")
+        return [(t, line) for t, line in list(self.lines) if start_time <= t < end_time]
+
+    def close(self, timeout: float = 5):
+        self._thread.join(timeout=timeout)
+
+
+def launch_server(
+    server_cmd: str, log_file: str, env: Optional[Dict[str, str]] = None
+) -> Tuple[subprocess.Popen, ServerLog]:
+    """run_cmd(server_cmd, is_block=False, env=env), with its output captured in log_file"""
+    cmd = server_cmd.replace("\\\n", " ").replace("\\", " ")
+    process = subprocess.Popen(
+        cmd.split(),
+        text=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=1,
+        # python servers block-buffer a pipe, the lines would arrive late
+        env={**os.environ, "PYTHONUNBUFFERED": "1", **(env or {})},
+    )
+    return process, ServerLog(process, log_file)
+
+
+def parse_startup_phases(
+    lines: List[Tuple[float, str]], backend: Backend
+) -> Dict[str, float]:
+    """
+    The duration of the startup phases of ``backend`` found in the log lines, as
+    ``{phase}_s``. A phase is measured between the arrival of its begin and end
+    lines, or read from the ``seconds`` group of its end line when the engine
+    logs the duration itself.
+    """
+    phases = {}
+    for phase, (begin_pattern, end_pattern) in backend.startup_phases.items():
+        begin_time = None
+        for t, line in lines:
+            if begin_pattern and begin_time is None and re.search(begin_pattern, line):
+                begin_time = t
+                continue
+            match = re.search(end_pattern, line)
+            if match is None:
+                continue
+            if "seconds" in match.groupdict():
+                phases[f"{phase}_s"] = float(match.group("seconds"))
+                break
+            if begin_time is not None:
+                phases[f"{phase}_s"] = t - begin_time
+                break
+    return phases
+
+
+def parse_scheduler_stats(
+    lines: List[Tuple[float, str]], backend: Backend, start_time: float = 0.0
+) -> List[Dict[str, float]]:
+    """
+    One sample per scheduler log line, ``t`` is the arrival time of the line in
+    seconds since start_time, only the stats found in the line are set.
+    """
+    patterns = {
+        stat: re.compile(pattern) for stat, pattern in backend.scheduler_stats.items()
+    }
+    samples = []
+    for t, line in lines:
+        sample = {}
+        for stat, pattern in patterns.items():
+            match = pattern.search(line)
+            if match is None:
+                continue
+            groups = match.groupdict()
+            if groups.get("pct") is not None:
+                sample[stat] = float(groups["pct"]) / 100
+            else:
+                sample[stat] = float(groups["value"])
+        if sample:
+            samples.append({"t": t - start_time, **sample})
+    return samples
+
+
+def digest_scheduler_stats(samples: List[Dict[str, float]]) -> Dict[str, float]:
+    """server_mean_{stat} and server_max_{stat}, merged into the record of a point"""
+    digest = {"server_log_samples": len(samples)}
+    stats = sorted({stat for sample in samples for stat in sample if stat != "t"})
+    for stat in stats:
+        values = [sample[stat] for sample in samples if stat in sample]
+        digest[f"server_mean_{stat}"] = sum(values) / len(values)
+        digest[f"server_max_{stat}"] = max(values)
+    return digest
+
+
+def export_scheduler_stats(samples: List[Dict[str, float]], csv_path: str):
+    columns = ["t"] + sorted({stat for sample in samples for stat in sample} - {"t"})
+    with open(csv_path, mode="w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(samples)
@@ -1,5 +1,23 @@
 from ai_infra_bench.sgl.cmp_bench import cmp_bench
 from ai_infra_bench.sgl.general_bench import general_bench
+from ai_infra_bench.sgl.ramp_bench import ramp_bench
+from ai_infra_bench.sgl.routing_bench import routing_bench
 from ai_infra_bench.sgl.slo_bench import slo_bench
+from ai_infra_bench.sgl.soak_bench import soak_bench
+from ai_infra_bench.sgl.spec_bench import spec_bench
+from ai_infra_bench.sgl.startup_bench import startup_bench
+from ai_infra_bench.sgl.tenant_bench import tenant_bench
+from ai_infra_bench.sgl.tune_bench import tune_bench
 
-__all__ = ["slo_bench", "general_bench", "cmp_bench"]
+__all__ = [
+    "slo_bench",
+    "general_bench",
+    "cmp_bench",
+    "soak_bench",
+    "ramp_bench",
+    "startup_bench",
+    "tenant_bench",
+    "tune_bench",
+    "routing_bench",
+    "spec_bench",
+]
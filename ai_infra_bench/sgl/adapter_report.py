@@ -0,0 +1,109 @@
+import os
+from typing import Dict, List
+
+from ai_infra_bench.sgl.group_report import (
+    export_group_table,
+    group_plot,
+    group_table_md,
+)
+
+ADAPTER_METRICS = ["ttft", "tpot"]
+HOT_COLD = ["hot", "cold"]
+
+
+def _hot_cold(item: Dict) -> Dict[str, Dict]:
+    """
+    The hot and cold adapters of a point, when they completed any request: the
+    cold group of a single adapter is empty and its metrics are None
+    """
+    groups = {}
+    for group in HOT_COLD:
+        prefix = f"{group}_"
+        if item.get(f"{prefix}p99_ttft_ms") is not None:
+            groups[group] = {
+                key[len(prefix) :]: value
+                for key, value in item.items()
+                if key.startswith(prefix)
+            }
+    return groups
+
+
+def _adapters(item: Dict) -> Dict[str, Dict]:
+    return {
+        adapter["adapter"]: adapter
+        for adapter in item["adapters"]
+        if adapter["p99_ttft_ms"] is not None
+    }
+
+
+def adapter_table_md(
+    data: List[List[Dict]], input_features: List[str], labels: List[str]
+) -> str:
+    """
+    p99 TTFT and TPOT of the hot and cold adapters, then of every adapter, one
+    row per point
+    """
+    md_tables_str = ""
+    for server_data, label in zip(data, labels):
+        server_data = [item for item in server_data if item.get("adapters")]
+        if not server_data:
+            continue
+        md_tables_str += group_table_md(
+            server_data,
+            input_features,
+            _hot_cold,
+            lambda group: (
+                f"{group['p99_ttft_ms']:.2f} / "
+                f"{group['p99_tpot_ms']:.2f} ({group['requests']})"
+            ),
+            f"**{label}** (p99 TTFT / TPOT in ms, hot vs cold adapters)",
+        )
+        for metric in ADAPTER_METRICS:
+            md_tables_str += group_table_md(
+                server_data,
+                input_features,
+                _adapters,
+                lambda adapter: (
+                    f"{adapter[f'mean_{metric}_ms']:.2f} / "
+                    f"{adapter[f'p99_{metric}_ms']:.2f} ({adapter['requests']})"
+                    + "*" * adapter["hot"]
+                ),
+                f"**{label}** (mean / p99 {metric.upper()} in ms per adapter, * when hot)",
+            )
+    return md_tables_str
+
+
+def adapter_plot(
+    data: List[List[Dict]],
+    input_features: List[str],
+    labels: List[str],
+    output_dir: str,
+):
+    """p99 TTFT and TPOT of the hot and cold adapters against the input features"""
+    for server_data, label in zip(data, labels):
+        server_data = [item for item in server_data if item.get("adapters")]
+        if not server_data:
+            continue
+        group_plot(
+            server_data,
+            input_features,
+            _hot_cold,
+            ADAPTER_METRICS,
+            f"{label} hot vs cold adapters",
+            lambda input_feature: os.path.join(
+                output_dir, f"{label}_{input_feature}_adapters.html"
+            ),
+        )
+
+
+def export_adapter_report(
+    data: List[List[Dict]],
+    input_features: List[str],
+    labels: List[str],
+    output_dir: str,
+):
+    md_tables_str = adapter_table_md(data, input_features, labels)
+    if not md_tables_str:
+        return
+    export_group_table(md_tables_str, output_dir, "adapter_table.md", "adapter")
+    adapter_plot(data, input_features, labels, output_dir)
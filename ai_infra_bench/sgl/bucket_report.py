@@ -0,0 +1,73 @@
+import os
+from typing import Dict, List
+
+from ai_infra_bench.sgl.group_report import (
+    export_group_table,
+    group_plot,
+    group_table_md,
+)
+
+BUCKET_METRICS = ["ttft", "tpot"]
+
+
+def _buckets(item: Dict) -> Dict[str, Dict]:
+    return {bucket["bucket"]: bucket for bucket in item["buckets"]}
+
+
+def bucket_table_md(
+    data: List[List[Dict]], input_features: List[str], labels: List[str]
+) -> str:
+    """p50 / p99 TTFT and TPOT per length bucket, one row per point"""
+    md_tables_str = ""
+    for server_data, label in zip(data, labels):
+        server_data = [item for item in server_data if item.get("buckets")]
+        if not server_data:
+            continue
+        for metric in BUCKET_METRICS:
+            md_tables_str += group_table_md(
+                server_data,
+                input_features,
+                _buckets,
+                lambda bucket: (
+                    f"{bucket[f'p50_{metric}_ms']:.2f} / "
+                    f"{bucket[f'p99_{metric}_ms']:.2f} ({bucket['count']})"
+                ),
+                f"**{label}** (p50 / p99 {metric.upper()} in ms per length bucket)",
+            )
+    return md_tables_str
+
+
+def bucket_plot(
+    data: List[List[Dict]],
+    input_features: List[str],
+    labels: List[str],
+    output_dir: str,
+):
+    """p99 TTFT and TPOT of every length bucket against the input features"""
+    for server_data, label in zip(data, labels):
+        server_data = [item for item in server_data if item.get("buckets")]
+        if not server_data:
+            continue
+        group_plot(
+            server_data,
+            input_features,
+            _buckets,
+            BUCKET_METRICS,
+            f"{label} per length bucket",
+            lambda input_feature: os.path.join(
+                output_dir, f"{label}_{input_feature}_buckets.html"
+            ),
+        )
+
+
+def export_bucket_report(
+    data: List[List[Dict]],
+    input_features: List[str],
+    labels: List[str],
+    output_dir: str,
+):
+    md_tables_str = bucket_table_md(data, input_features, labels)
+    if not md_tables_str:
+        return
+    export_group_table(md_tables_str, output_dir, "bucket_table.md", "bucket")
+    bucket_plot(data, input_features, labels, output_dir)
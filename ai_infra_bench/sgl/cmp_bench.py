@@ -1,33 +1,35 @@
 import os
 import time
-from typing import Dict, List
+from typing import List, Optional
 
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from tqdm import tqdm
 
+from ai_infra_bench.backends import get_backend, get_server_backend
+from ai_infra_bench.check import check_server_client_cmds
+from ai_infra_bench.dashboard import Dashboard, DashboardConfig
+from ai_infra_bench.prefetch import prefetch_next
+from ai_infra_bench.report import BackgroundReport, build_report, save_report_config
+from ai_infra_bench.slots import ResourceSlot, bench_on_slots
+from ai_infra_bench.supervisor import Supervisor, SupervisorConfig
 from ai_infra_bench.utils import (
-    check_server_client_cmds,
     colors,
     dummy_get_filename,
     graph_per_row,
     kill_process_tree,
-    read_jsonl,
-    run_cmd,
-    wait_for_server,
-    warmup,
 )
+from ai_infra_bench.warmup import WarmupConfig, converge_warmup
 
 
 def cmp_plot(data, input_features, metrics, labels, output_dir):
     print("Ploting graphs in html")
 
-    cur_row, cur_col = 0, 0
-    num_client_settings = len(data[0])
     num_server_settings = len(data)
 
     # there are totally len(input_features) html files
     for input_feature in input_features:
+        cur_row, cur_col = 0, 0
         rows = (len(metrics) - 1) // graph_per_row + 1
         cols = graph_per_row
         fig = make_subplots(rows=rows, cols=cols)
@@ -38,16 +40,17 @@ def cmp_plot(data, input_features, metrics, labels, output_dir):
             # each server is a line
             for server_idx in range(num_server_settings):
 
+                # a server may have fewer points if the run is still in progress
+                # and a metric of an empty group is None, its point is skipped
+                points = [
+                    item
+                    for item in data[server_idx]
+                    if not item.get("failed") and item.get(metric) is not None
+                ]
                 fig.add_trace(
                     go.Scatter(
-                        x=[
-                            data[server_idx][i][input_feature]
-                            for i in range(num_client_settings)
-                        ],
-                        y=[
-                            data[server_idx][i][metric]
-                            for i in range(num_client_settings)
-                        ],
+                        x=[item[input_feature] for item in points],
+                        y=[item[metric] for item in points],
                         name=labels[server_idx],
                         mode="lines+markers",
                         marker=dict(size=8),
@@ -76,8 +79,7 @@ def cmp_plot(data, input_features, metrics, labels, output_dir):
     print("Ploting graphs DONE")
 
 
-def cmp_export_table(data, input_features, metrics, labels, output_dir):
-    print(f'Writing table to {os.path.join(output_dir, "table.md")}')
+def cmp_table_md(data, input_features, metrics, labels) -> str:
     md_tables_str = ""
     common_title = (
         "| "
@@ -88,25 +90,51 @@ def cmp_export_table(data, input_features, metrics, labels, output_dir):
         + "| --- " * (len(input_features) + len(labels) + 1)
         + "|\n"
     )
+    num_client_settings = max(len(server_data) for server_data in data)
 
     for metric in metrics:
         md_tables_str += f"Metric: **{metric}**\n" + common_title
 
         # each client setting is a line
-        for client_idx in range(len(data[0])):
-            # each label setting is a column
+        for client_idx in range(num_client_settings):
+            # only read the first label having measured this client setting since they are the same
+            item = next(
+                (
+                    server_data[client_idx]
+                    for server_data in data
+                    if client_idx < len(server_data)
+                    and not server_data[client_idx].get("failed")
+                ),
+                None,
+            )
+            for input_feature in input_features:
+                if item is None:
+                    md_tables_str += "| - "
+                else:
+                    md_tables_str += "| " + f"{item[input_feature]:.2f}" + " "
+            md_tables_str += "|     "
+
+            # each label setting is a column, "-" if it has not been run yet
             for label_idx in range(len(labels)):
-
-                item = data[label_idx][client_idx]
-                if label_idx == 0:
-                    # only read the first label's client setting since they are the same
-                    for input_feature in input_features:
-                        md_tables_str += "| " + f"{item[input_feature]:.2f}" + " "
-                    md_tables_str += "|     "
-                md_tables_str += "| " + f"{item[metric]:.2f}" + " "
+                if client_idx >= len(data[label_idx]):
+                    md_tables_str += "| - "
+                elif data[label_idx][client_idx].get("failed"):
+                    md_tables_str += "| failed "
+                elif data[label_idx][client_idx].get(metric) is None:
+                    # e.g. a startup phase the engine of this label does not log,
+                    # or a metric of an empty group
+                    md_tables_str += "| - "
+                else:
+                    item = data[label_idx][client_idx]
+                    md_tables_str += "| " + f"{item[metric]:.2f}" + " "
             md_tables_str += "|\n"
         md_tables_str += "\n" * 5
+    return md_tables_str
 
+
+def cmp_export_table(data, input_features, metrics, labels, output_dir):
+    print(f'Writing table to {os.path.join(output_dir, "table.md")}')
+    md_tables_str = cmp_table_md(data, input_features, metrics, labels)
     with open(os.path.join(output_dir, "table.md"), "w", encoding="utf-8") as f:
         f.write(md_tables_str)
     print("Writing table DONE")
@@ -122,40 +150,99 @@ def cmp_bench(
     host,
     port,
     output_dir="output",
+    backends: Optional[List[str]] = None,
+    warmup_config: Optional[WarmupConfig] = None,
+    supervisor_config: Optional[SupervisorConfig] = None,
+    dashboard_config: Optional[DashboardConfig] = None,
+    slots: Optional[List[ResourceSlot]] = None,
+    serialize: bool = False,
 ):
+    dashboard = Dashboard(len(server_cmds) * len(client_cmds), dashboard_config)
     try:
         check_server_client_cmds(server_cmds, client_cmds, labels=labels)
         os.makedirs(output_dir, exist_ok=False)
+        save_report_config(
+            output_dir,
+            mode="cmp",
+            labels=labels,
+            input_features=input_features,
+            metrics=metrics,
+        )
+
+        # the engine of each server is detected from its command unless given
+        if backends is None:
+            server_backends = [get_server_backend(cmd) for cmd in server_cmds]
+        else:
+            server_backends = [get_backend(name) for name in backends]
+        dashboard.start()
+
+        if slots:
+            # the servers side by side, each on the devices and port of a free slot
+            bench_on_slots(
+                server_cmds,
+                [client_cmds] * len(server_cmds),
+                backends=server_backends,
+                labels=labels,
+                host=host,
+                slots=slots,
+                serialize=serialize,
+                output_dir=output_dir,
+                warmup_config=warmup_config,
+                supervisor_config=supervisor_config,
+                dashboard=dashboard,
+            )
+            return
+
+        base_url = f"http://{host}:{port}"
 
-        data: List[List[Dict]] = []
         pbar = tqdm(enumerate(server_cmds))
+        report = BackgroundReport(output_dir)
+        prefetcher = None
         for server_idx, server_cmd in pbar:
             pbar.set_description(f"======= Running {server_idx + 1}-th server =======")
+            backend = server_backends[server_idx]
 
             # launch server
-            server_process = run_cmd(server_cmd, is_block=False)
-
-            wait_for_server(base_url=f"http://{host}:{port}", timeout=120)
-
-            # warmup
-            print("Begin Warmup")
-            warmup(client_cmds[0], output_dir)
-            print("Warmup over")
+            supervisor = Supervisor(
+                server_cmd,
+                backend,
+                base_url,
+                supervisor_config,
+                log_file=os.path.join(output_dir, f"{labels[server_idx]}_server.log"),
+            )
+
+            started = supervisor.start()
+            # the report and the prefetch must not overlap the measurements of this server
+            report.wait()
+            if prefetcher is not None:
+                prefetcher.stop()
+            if started:
+                converge_warmup(
+                    client_cmds,
+                    base_url,
+                    label=labels[server_idx],
+                    output_dir=output_dir,
+                    config=warmup_config,
+                )
+            prefetcher = prefetch_next(server_cmds, server_idx)
 
             # launch_client
-            inner_data: List[Dict] = []
             for client_idx, client_cmd in enumerate(client_cmds):
                 output_file = dummy_get_filename(client_idx, label=labels[server_idx])
                 output_file = os.path.join(output_dir, output_file)
-                client_cmd += f" --output-file {output_file}"
-                run_cmd(client_cmd, is_block=True)
-                inner_data.append(read_jsonl(output_file)[-1])
+                report.wait()
+                with dashboard.point(
+                    labels[server_idx], client_cmd, base_url, supervisor.backend
+                ):
+                    supervisor.run_point(client_cmd, output_file)
 
-                time.sleep(5)
+                # keep the report viewable during the sweep, the last build of
+                # a server overlaps the startup of the next one
+                report.start()
 
-            data.append(inner_data)
+                time.sleep(5)
 
-            server_process.terminate()
+            supervisor.stop()
 
             time.sleep(5)  # wait it to exit gracefully and completely
 
@@ -163,19 +250,8 @@ def cmp_bench(
 
         pbar.close()
 
-        cmp_export_table(
-            data=data,
-            input_features=input_features,
-            metrics=metrics,
-            labels=labels,
-            output_dir=output_dir,
-        )
-        cmp_plot(
-            data=data,
-            input_features=input_features,
-            metrics=metrics,
-            labels=labels,
-            output_dir=output_dir,
-        )
+        report.wait()
+        build_report(output_dir)
     finally:
+        dashboard.stop()
         kill_process_tree(os.getpid(), include_parent=False)
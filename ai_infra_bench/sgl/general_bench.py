@@ -1,26 +1,29 @@
 import os
 import time
-from typing import Dict, List
+from typing import List, Optional
 
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from tqdm import tqdm
 
+from ai_infra_bench.backends import get_server_backend
+from ai_infra_bench.check import check_server_client_cmds
+from ai_infra_bench.dashboard import Dashboard, DashboardConfig
+from ai_infra_bench.prefetch import prefetch_next
+from ai_infra_bench.report import BackgroundReport, build_report, save_report_config
+from ai_infra_bench.slots import ResourceSlot, bench_on_slots
+from ai_infra_bench.supervisor import Supervisor, SupervisorConfig
 from ai_infra_bench.utils import (
-    check_server_client_cmds,
     colors,
     dummy_get_filename,
     graph_per_row,
     kill_process_tree,
-    read_jsonl,
-    run_cmd,
-    wait_for_server,
-    warmup,
+    metric_strf,
 )
+from ai_infra_bench.warmup import WarmupConfig, converge_warmup
 
 
-def general_export_table(data, input_features, metrics, labels, output_dir):
-    print(f"Writing table to {os.path.join(output_dir, 'table.md')}")
+def general_table_md(data, input_features, metrics, labels) -> str:
     md_tables_str = ""
     for label_idx, label in enumerate(labels):
 
@@ -45,10 +48,16 @@ def general_export_table(data, input_features, metrics, labels, output_dir):
                 md_tables_str += "| " + f"{item[input_feature]:.2f}" + " "
             md_tables_str += "|     "
             for metric in metrics:
-                md_tables_str += "| " + f"{item[metric]:.2f}" + " "
+                md_tables_str += "| " + metric_strf(item.get(metric)) + " "
             md_tables_str += "|\n"
 
         md_tables_str += "\n" * 5
+    return md_tables_str
+
+
+def general_export_table(data, input_features, metrics, labels, output_dir):
+    print(f"Writing table to {os.path.join(output_dir, 'table.md')}")
+    md_tables_str = general_table_md(data, input_features, metrics, labels)
     with open(os.path.join(output_dir, "table.md"), mode="w", encoding="utf-8") as f:
         f.write(md_tables_str)
     print("Writing table DONE")
@@ -63,14 +72,15 @@ def general_plot(data, input_features, metrics, labels, output_dir):
             # fig = make_subplots(rows=rows, cols=graph_per_row, subplot_titles=metrics)
             fig = make_subplots(rows=rows, cols=graph_per_row)
 
-            x = [item[input_feature] for item in data[i]]
             cur_row, cur_col = 0, 0
 
             for metric in metrics:
+                # a metric of an empty group is None, its point is skipped
+                points = [item for item in data[i] if item.get(metric) is not None]
                 fig.add_trace(
                     go.Scatter(
-                        x=x,
-                        y=[item[metric] for item in data[i]],
+                        x=[item[input_feature] for item in points],
+                        y=[item[metric] for item in points],
                         name=f"{label}/{metric}",
                         mode="lines+markers",
                         marker=dict(size=8),
@@ -109,14 +119,51 @@ def general_bench(
     host,
     port,
     output_dir="output",
+    warmup_config: Optional[WarmupConfig] = None,
+    supervisor_config: Optional[SupervisorConfig] = None,
+    dashboard_config: Optional[DashboardConfig] = None,
+    slots: Optional[List[ResourceSlot]] = None,
+    serialize: bool = False,
 ):
     check_server_client_cmds(server_cmds, client_cmds, labels=labels)
 
     os.makedirs(output_dir, exist_ok=False)
+    save_report_config(
+        output_dir,
+        mode="general",
+        labels=labels,
+        input_features=input_features,
+        metrics=metrics,
+    )
+
+    dashboard = Dashboard(
+        sum(len(cmds) for cmds in client_cmds), dashboard_config
+    ).start()
+
+    if slots:
+        # the servers side by side, each on the devices and port of a free slot
+        try:
+            bench_on_slots(
+                server_cmds,
+                client_cmds,
+                backends=[get_server_backend(cmd) for cmd in server_cmds],
+                labels=labels,
+                host=host,
+                slots=slots,
+                serialize=serialize,
+                output_dir=output_dir,
+                warmup_config=warmup_config,
+                supervisor_config=supervisor_config,
+                dashboard=dashboard,
+            )
+        finally:
+            dashboard.stop()
+            kill_process_tree(os.getpid(), include_parent=False)
+        return
 
     pbar = tqdm(enumerate(zip(server_cmds, client_cmds)))
-
-    data: List[List[Dict]] = []
+    report = BackgroundReport(output_dir)
+    prefetcher = None
 
     try:
         for server_idx, (server_cmd, client_cmd) in pbar:
@@ -124,31 +171,48 @@ def general_bench(
             pbar.set_description(f"======= Running {server_idx + 1}-th server =======")
 
             # launch server
-            server_process = run_cmd(server_cmd, is_block=False)
-
-            wait_for_server(base_url=f"http://{host}:{port}", timeout=120)
-
-            # warmup
-            print("Begin Warmup")
-            warmup(client_cmd[0], output_dir)
-            print("Warmup DONE")
-
-            inner_data: List[Dict] = []
+            backend = get_server_backend(server_cmd)
+            base_url = f"http://{host}:{port}"
+            supervisor = Supervisor(
+                server_cmd,
+                backend,
+                base_url,
+                supervisor_config,
+                log_file=os.path.join(output_dir, f"{labels[server_idx]}_server.log"),
+            )
+
+            started = supervisor.start()
+            # the report and the prefetch must not overlap the measurements of this server
+            report.wait()
+            if prefetcher is not None:
+                prefetcher.stop()
+            if started:
+                converge_warmup(
+                    client_cmd,
+                    base_url,
+                    label=labels[server_idx],
+                    output_dir=output_dir,
+                    config=warmup_config,
+                )
+            prefetcher = prefetch_next(server_cmds, server_idx)
 
             # launch client
             for client_idx, cmd in enumerate(client_cmd):
                 output_file = dummy_get_filename(client_idx, label=labels[server_idx])
                 output_file = os.path.join(output_dir, output_file)
-                cmd += f" --output-file {output_file}"
-                run_cmd(cmd, is_block=True)
+                report.wait()
+                with dashboard.point(
+                    labels[server_idx], cmd, base_url, supervisor.backend
+                ):
+                    supervisor.run_point(cmd, output_file)
 
-                inner_data.append(read_jsonl(output_file)[-1])
+                # keep the report viewable during the sweep, the last build of
+                # a server overlaps the startup of the next one
+                report.start()
 
                 time.sleep(5)
 
-            data.append(inner_data)
-
-            server_process.terminate()
+            supervisor.stop()
 
             time.sleep(5)  # wait it to exit gracefully and completely
 
@@ -156,19 +220,8 @@ def general_bench(
 
         pbar.close()
 
-        general_export_table(
-            data=data,
-            input_features=input_features,
-            metrics=metrics,
-            labels=labels,
-            output_dir=output_dir,
-        )
-        general_plot(
-            data=data,
-            input_features=input_features,
-            metrics=metrics,
-            labels=labels,
-            output_dir=output_dir,
-        )
+        report.wait()
+        build_report(output_dir)
     finally:
+        dashboard.stop()
         kill_process_tree(os.getpid(), include_parent=False)
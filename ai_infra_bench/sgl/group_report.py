@@ -0,0 +1,107 @@
+import os
+from typing import Callable, Dict, List
+
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from ai_infra_bench.utils import colors
+
+# the groups of a point by name, e.g. its length buckets or its adapters
+GroupsOf = Callable[[Dict], Dict[str, Dict]]
+
+
+def group_columns(server_data: List[Dict], groups_of: GroupsOf) -> List[str]:
+    """The groups seen at any point, in the order of the records"""
+    columns = []
+    for item in server_data:
+        columns.extend(name for name in groups_of(item) if name not in columns)
+    return columns
+
+
+def group_table_md(
+    server_data: List[Dict],
+    input_features: List[str],
+    groups_of: GroupsOf,
+    cell: Callable[[Dict], str],
+    title: str,
+) -> str:
+    """One row per point and one column per group, - when a point has no such group"""
+    columns = group_columns(server_data, groups_of)
+    md_tables_str = f"Title: {title}\n"
+    md_tables_str += (
+        "| "
+        + " | ".join(str(input_feature) for input_feature in input_features)
+        + " |     | "
+        + " | ".join(columns)
+        + " |\n"
+    )
+    md_tables_str += "| --- " * (len(input_features) + len(columns) + 1) + "|\n"
+    for item in server_data:
+        for input_feature in input_features:
+            md_tables_str += "| " + f"{item[input_feature]:.2f}" + " "
+        md_tables_str += "|     "
+        groups = groups_of(item)
+        for column in columns:
+            if column not in groups:
+                md_tables_str += "| - "
+                continue
+            md_tables_str += f"| {cell(groups[column])} "
+        md_tables_str += "|\n"
+    md_tables_str += "\n" * 5
+    return md_tables_str
+
+
+def group_plot(
+    server_data: List[Dict],
+    input_features: List[str],
+    groups_of: GroupsOf,
+    metrics: List[str],
+    title: str,
+    path_of: Callable[[str], str],
+):
+    """
+    The p99 of the metrics of every group against each input feature, one
+    subplot per metric, written to path_of(input_feature)
+    """
+    columns = group_columns(server_data, groups_of)
+    for input_feature in input_features:
+        server_data = sorted(server_data, key=lambda item: item[input_feature])
+        fig = make_subplots(
+            rows=1,
+            cols=len(metrics),
+            subplot_titles=[f"p99_{metric}_ms" for metric in metrics],
+        )
+        for col, metric in enumerate(metrics, start=1):
+            for i, column in enumerate(columns):
+                points = [
+                    (item[input_feature], groups_of(item)[column][f"p99_{metric}_ms"])
+                    for item in server_data
+                    if column in groups_of(item)
+                ]
+                fig.add_trace(
+                    go.Scatter(
+                        x=[x for x, _ in points],
+                        y=[y for _, y in points],
+                        name=column,
+                        legendgroup=column,
+                        showlegend=col == 1,
+                        mode="lines+markers",
+                        marker=dict(size=8),
+                        line=dict(color=colors[i % len(colors)], width=3),
+                        hovertemplate=f"<br>{input_feature}: %{{x}}<br>p99_{metric}_ms: %{{y}}<br><extra>{column}</extra>",
+                    ),
+                    row=1,
+                    col=col,
+                )
+            fig.update_xaxes(title_text=input_feature, row=1, col=col)
+            fig.update_yaxes(title_text=f"p99_{metric}_ms", row=1, col=col)
+        fig.update_layout(title_text=title)
+        fig.write_html(path_of(input_feature))
+
+
+def export_group_table(md_tables_str: str, output_dir: str, name: str, kind: str):
+    table_path = os.path.join(output_dir, name)
+    print(f"Writing per-{kind} table to {table_path}")
+    with open(table_path, mode="w", encoding="utf-8") as f:
+        f.write(md_tables_str)
+    print(f"Writing per-{kind} table DONE")
@@ -0,0 +1,233 @@
+import os
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import plotly.graph_objects as go
+
+from ai_infra_bench.utils import colors
+
+PARETO_THROUGHPUT = "output_throughput"
+DEFAULT_PARETO_LATENCIES = ["p99_ttft_ms", "p99_tpot_ms"]
+
+
+def pareto_latencies(metrics: List[str]) -> List[str]:
+    """The latency percentiles among the metrics, e.g. p90_ttft_ms or p99_itl_ms"""
+    latencies = [metric for metric in metrics if re.fullmatch(r"p\d+_\w+_ms", metric)]
+    return latencies or DEFAULT_PARETO_LATENCIES
+
+
+def dominates(a: Dict, b: Dict, throughput: str, latencies: List[str]) -> bool:
+    """a is at least as good as b everywhere and strictly better somewhere"""
+    if a[throughput] < b[throughput] or any(a[lat] > b[lat] for lat in latencies):
+        return False
+    return a[throughput] > b[throughput] or any(a[lat] < b[lat] for lat in latencies)
+
+
+def pareto_points(
+    data: List[List[Dict]],
+    input_features: List[str],
+    labels: List[str],
+    throughput: str = PARETO_THROUGHPUT,
+    latencies: Optional[List[str]] = None,
+) -> List[Dict]:
+    """
+    Every measured point of every label, with ``dominated_by`` set to the point
+    of another config beating it on throughput and on every latency, or None
+    when it is on the Pareto frontier.
+    """
+    latencies = latencies or DEFAULT_PARETO_LATENCIES
+    points = []
+    for server_data, label in zip(data, labels):
+        for client_idx, item in enumerate(server_data):
+            if item.get("failed") or any(
+                item.get(key) is None for key in [throughput, *latencies]
+            ):
+                continue
+            point = {"label": label, "client_idx": client_idx}
+            for key in [*input_features, throughput, *latencies]:
+                point[key] = item[key]
+            points.append(point)
+
+    # a point can only be dominated by the points before it in this order, and
+    # then by one on the frontier, so only the frontier found so far is compared
+    ordered = sorted(
+        points,
+        key=lambda point: (-point[throughput], *(point[lat] for lat in latencies)),
+    )
+    # all to minimize, a row dominates another when <= everywhere and < somewhere
+    values = np.array(
+        [[-point[throughput], *(point[lat] for lat in latencies)] for point in ordered]
+    ).reshape(len(ordered), len(latencies) + 1)
+    frontier: List[int] = []
+    for idx, point in enumerate(ordered):
+        point["dominated_by"] = None
+        if frontier:
+            front = values[frontier]
+            dominating = np.flatnonzero(
+                np.all(front <= values[idx], axis=1)
+                & np.any(front < values[idx], axis=1)
+            )
+            if dominating.size:
+                other = ordered[frontier[dominating[0]]]
+                point["dominated_by"] = f"{other['label']} #{other['client_idx']}"
+        if point["dominated_by"] is None:
+            frontier.append(idx)
+    return points
+
+
+def pareto_table_md(
+    points: List[Dict],
+    input_features: List[str],
+    labels: List[str],
+    throughput: str = PARETO_THROUGHPUT,
+    latencies: Optional[List[str]] = None,
+) -> str:
+    """The frontier over all the points, then per load level, then the configs never on it"""
+    latencies = latencies or DEFAULT_PARETO_LATENCIES
+    columns = [*input_features, throughput, *latencies]
+    md_tables_str = (
+        f"Title: **Pareto frontier** ({throughput} vs {', '.join(latencies)}, "
+        "over all the labels and points)\n"
+    )
+    md_tables_str += "| label | # | " + " | ".join(columns) + " | status |\n"
+    md_tables_str += "| --- " * (len(columns) + 3) + "|\n"
+    ranked = sorted(
+        points,
+        key=lambda point: (point["dominated_by"] is not None, -point[throughput]),
+    )
+    for point in ranked:
+        status = (
+            "**frontier**"
+            if point["dominated_by"] is None
+            else f"dominated by {point['dominated_by']}"
+        )
+        md_tables_str += (
+            f"| {point['label']} | {point['client_idx']} | "
+            + " | ".join(f"{point[key]:.2f}" for key in columns)
+            + f" | {status} |\n"
+        )
+    md_tables_str += "\n" * 5
+
+    # the same client setting is the same load for every label
+    md_tables_str += "Title: **Pareto frontier per load level**\n"
+    md_tables_str += (
+        "| # | "
+        + " | ".join(input_features)
+        + " | frontier | dominated |\n"
+        + "| --- " * (len(input_features) + 3)
+        + "|\n"
+    )
+    levels: Dict[int, List[Dict]] = {}
+    for point in points:
+        levels.setdefault(point["client_idx"], []).append(point)
+    for client_idx, level in sorted(levels.items()):
+        frontier = [
+            point["label"]
+            for point in level
+            if not any(
+                dominates(other, point, throughput, latencies) for other in level
+            )
+        ]
+        dominated = [
+            point["label"] for point in level if point["label"] not in frontier
+        ]
+        md_tables_str += (
+            f"| {client_idx} | "
+            + " | ".join(f"{level[0][key]:.2f}" for key in input_features)
+            + f" | {', '.join(frontier)} | {', '.join(dominated) or '-'} |\n"
+        )
+    md_tables_str += "\n" * 5
+
+    on_frontier = {point["label"] for point in points if point["dominated_by"] is None}
+    never = [label for label in labels if label not in on_frontier]
+    md_tables_str += (
+        f"Configs never on the frontier: {', '.join(never) if never else '-'}\n"
+    )
+    return md_tables_str
+
+
+def pareto_plot(
+    points: List[Dict],
+    input_features: List[str],
+    labels: List[str],
+    output_dir: str,
+    throughput: str = PARETO_THROUGHPUT,
+    latencies: Optional[List[str]] = None,
+):
+    """
+    throughput against each latency, one color per label, the dominated points
+    hollow and the frontier of this latency alone as a step line
+    """
+    latencies = latencies or DEFAULT_PARETO_LATENCIES
+    for latency in latencies:
+        fig = go.Figure()
+        for label_idx, label in enumerate(labels):
+            label_points = [point for point in points if point["label"] == label]
+            if not label_points:
+                continue
+            fig.add_trace(
+                go.Scatter(
+                    x=[point[latency] for point in label_points],
+                    y=[point[throughput] for point in label_points],
+                    name=label,
+                    mode="markers",
+                    marker=dict(
+                        size=10,
+                        color=colors[label_idx % len(colors)],
+                        symbol=[
+                            "circle" if point["dominated_by"] is None else "circle-open"
+                            for point in label_points
+                        ],
+                    ),
+                    customdata=[
+                        [point[key] for key in input_features] for point in label_points
+                    ],
+                    hovertemplate=f"<br>{latency}: %{{x}}<br>{throughput}: %{{y}}"
+                    + "".join(
+                        f"<br>{key}: %{{customdata[{i}]}}"
+                        for i, key in enumerate(input_features)
+                    )
+                    + f"<br><extra>{label}</extra>",
+                )
+            )
+
+        frontier, best = [], float("-inf")
+        for point in sorted(points, key=lambda point: point[latency]):
+            if point[throughput] > best:
+                best = point[throughput]
+                frontier.append(point)
+        fig.add_trace(
+            go.Scatter(
+                x=[point[latency] for point in frontier],
+                y=[point[throughput] for point in frontier],
+                name=f"frontier ({latency})",
+                mode="lines",
+                line=dict(color="black", width=2, dash="dash", shape="hv"),
+                hoverinfo="skip",
+            )
+        )
+        fig.update_xaxes(title_text=latency)
+        fig.update_yaxes(title_text=throughput)
+        fig.update_layout(title_text=f"Pareto frontier of {throughput} vs {latency}")
+        fig.write_html(os.path.join(output_dir, f"pareto_{latency}.html"))
+
+
+def export_pareto_report(
+    data: List[List[Dict]],
+    input_features: List[str],
+    metrics: List[str],
+    labels: List[str],
+    output_dir: str,
+):
+    """pareto.md and pareto_{latency}.html for the latency percentiles of metrics"""
+    latencies = pareto_latencies(metrics)
+    points = pareto_points(data, input_features, labels, latencies=latencies)
+    if not points:
+        return
+    table_path = os.path.join(output_dir, "pareto.md")
+    print(f"Writing Pareto frontier to {table_path}")
+    with open(table_path, mode="w", encoding="utf-8") as f:
+        f.write(pareto_table_md(points, input_features, labels, latencies=latencies))
+    print("Writing Pareto frontier DONE")
+    pareto_plot(points, input_features, labels, output_dir, latencies=latencies)
@@ -0,0 +1,172 @@
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from tqdm import tqdm
+
+from ai_infra_bench.analysis.knee import find_knee
+from ai_infra_bench.backends import get_server_backend
+from ai_infra_bench.check import check_server_client_cmds
+from ai_infra_bench.report import build_report, save_report_config
+from ai_infra_bench.sgl.general_bench import general_table_md
+from ai_infra_bench.supervisor import Supervisor, SupervisorConfig
+from ai_infra_bench.utils import (
+    colors,
+    dummy_get_filename,
+    graph_per_row,
+    kill_process_tree,
+)
+from ai_infra_bench.warmup import WarmupConfig, converge_warmup
+from ai_infra_bench.workload.ramp import RampWorkload
+
+
+def knee_str(knee: Dict, load_key: str) -> str:
+    if knee is None:
+        return "Knee: not reached\n"
+    return (
+        f"Knee: **{load_key} = {knee['load']:g}** "
+        f"(throughput {knee['throughput']:.2f}, latency {knee['latency']:.2f} ms; "
+        f"from {knee['load']:g} to {knee['next_load']:g} the throughput elasticity is "
+        f"{knee['throughput_elasticity']:.2f} and the latency elasticity is "
+        f"{knee['latency_elasticity']:.2f})\n"
+    )
+
+
+def ramp_table_md(
+    data: List[List[Dict]],
+    input_features: List[str],
+    metrics: List[str],
+    labels: List[str],
+) -> str:
+    md_tables_str = ""
+    for server_data, label in zip(data, labels):
+        table = general_table_md([server_data], input_features, metrics, [label])
+        # the knee goes right below the table, before its trailing blank lines
+        knee = find_knee(server_data, input_features[0])
+        md_tables_str += table.rstrip("\n") + "\n\n" + knee_str(knee, input_features[0])
+        md_tables_str += "\n" * 5
+    return md_tables_str
+
+
+def ramp_plot(
+    data: List[List[Dict]],
+    input_features: List[str],
+    metrics: List[str],
+    labels: List[str],
+    output_dir: str,
+):
+    print("Ploting graphs in html")
+    for server_data, label in zip(data, labels):
+        server_data = sorted(server_data, key=lambda item: item[input_features[0]])
+        knee = find_knee(server_data, input_features[0])
+        for input_feature in input_features:
+            rows = (len(metrics) - 1) // graph_per_row + 1
+            fig = make_subplots(rows=rows, cols=graph_per_row)
+            x = [item[input_feature] for item in server_data]
+            for i, metric in enumerate(metrics):
+                row, col = i // graph_per_row + 1, i % graph_per_row + 1
+                fig.add_trace(
+                    go.Scatter(
+                        x=x,
+                        y=[item[metric] for item in server_data],
+                        name=f"{label}/{metric}",
+                        mode="lines+markers",
+                        marker=dict(size=8),
+                        line=dict(color=colors[i % len(colors)], width=3),
+                        hovertemplate=f"<br>{input_feature}: %{{x}}<br>{metric}: %{{y}}<br><extra></extra>",
+                    ),
+                    row=row,
+                    col=col,
+                )
+                if knee is not None and input_feature == input_features[0]:
+                    fig.add_vline(x=knee["load"], line_dash="dash", row=row, col=col)
+                fig.update_xaxes(title_text=input_feature, row=row, col=col)
+                fig.update_yaxes(title_text=metric, row=row, col=col)
+            fig.update_layout(title_text=f"{label} ramp")
+            fig.write_html(os.path.join(output_dir, f"{label}_{input_feature}.html"))
+    print("Ploting graphs DONE")
+
+
+def ramp_bench(
+    server_cmds: List[str],
+    workloads: List[RampWorkload],
+    *,
+    metrics: List[str],
+    labels: List[str],
+    host,
+    port,
+    warmup_config: Optional[WarmupConfig] = None,
+    supervisor_config: Optional[SupervisorConfig] = None,
+    output_dir: str = "output",
+):
+    """
+    Step the load of every server through ``workload.steps`` within one client
+    session and report the saturation knee of each label.
+    """
+    check_server_client_cmds(server_cmds, workloads, labels=labels)
+    assert len(server_cmds) == len(
+        workloads
+    ), f"The length of server_cmds and workloads should be equal, but found {len(server_cmds)=}, {len(workloads)=}"
+    assert (
+        len({workload.load_key for workload in workloads}) == 1
+    ), "All the workloads should ramp the same load (concurrency or rate)"
+
+    os.makedirs(output_dir, exist_ok=False)
+    save_report_config(
+        output_dir,
+        mode="ramp",
+        labels=labels,
+        input_features=[workloads[0].load_key],
+        metrics=metrics,
+    )
+
+    try:
+        for idx, server_cmd in tqdm(enumerate(server_cmds)):
+            backend = get_server_backend(server_cmd)
+            base_url = f"http://{host}:{port}"
+            supervisor = Supervisor(
+                server_cmd,
+                backend,
+                base_url,
+                supervisor_config,
+                log_file=os.path.join(output_dir, f"{labels[idx]}_server.log"),
+            )
+
+            workload = workloads[idx]
+
+            if supervisor.start():
+                converge_warmup(
+                    [workload],
+                    base_url,
+                    label=labels[idx],
+                    output_dir=output_dir,
+                    config=warmup_config,
+                )
+
+            print(f"==== Ramping {labels[idx]} through {workload.steps} ====")
+            item = supervisor.run_point(workload, None)
+            # one result file per step, like one client_cmd of general_bench
+            steps = [item] if item.get("failed") else item["steps"]
+            for step_idx, step in enumerate(steps):
+                output_file = os.path.join(
+                    output_dir, dummy_get_filename(step_idx, label=labels[idx])
+                )
+                with open(output_file, mode="w", encoding="utf-8") as f:
+                    f.write(json.dumps(step) + "\n")
+                if supervisor.server_log is not None and not step.get("failed"):
+                    supervisor.add_scheduler_stats(
+                        step, output_file, step["start_time"], step["end_time"]
+                    )
+
+            if not item.get("failed"):
+                knee = find_knee(item["steps"], workload.load_key)
+                print(knee_str(knee, workload.load_key))
+            build_report(output_dir)
+
+            supervisor.stop()
+            time.sleep(5)  # wait it to exit gracefully and completely
+    finally:
+        kill_process_tree(os.getpid(), include_parent=False)
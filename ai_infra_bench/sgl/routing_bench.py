@@ -0,0 +1,224 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Dict, List, Optional
+
+from ai_infra_bench.backends import get_server_backend
+from ai_infra_bench.efficiency import efficiency_metrics
+from ai_infra_bench.report import build_report, save_report_config
+from ai_infra_bench.sgl.cmp_bench import cmp_plot, cmp_table_md
+from ai_infra_bench.supervisor import (
+    Supervisor,
+    SupervisorConfig,
+    failed_record,
+    save_record,
+)
+from ai_infra_bench.utils import dummy_get_filename, kill_process_tree, run_client_cmd
+from ai_infra_bench.warmup import WarmupConfig, converge_warmup
+from ai_infra_bench.workload.routing import ROUTING_POLICIES, RoutedWorkload
+
+ROUTING_METRICS = [
+    "p99_ttft_ms",
+    "p99_tpot_ms",
+    "output_throughput",
+    "request_imbalance",
+    "token_imbalance",
+    "prefix_reuse_rate",
+]
+
+
+def routing_table_md(
+    data: List[List[Dict]],
+    input_features: List[str],
+    metrics: List[str],
+    labels: List[str],
+) -> str:
+    """The cmp tables across the policies, followed by the load of every replica"""
+    md_tables_str = cmp_table_md(data, input_features, metrics, labels)
+    for server_data, label in zip(data, labels):
+        points = [item for item in server_data if not item.get("failed")]
+        if not points:
+            continue
+        num_replicas = points[0]["num_replicas"]
+        md_tables_str += f"Title: **{label}** (requests / p99 TTFT ms per replica)\n"
+        md_tables_str += (
+            "| "
+            + " | ".join(str(input_feature) for input_feature in input_features)
+            + " |     | "
+            + " | ".join(f"replica {idx}" for idx in range(num_replicas))
+            + " | request imbalance | token imbalance |\n"
+        )
+        md_tables_str += "| --- " * (len(input_features) + num_replicas + 3) + "|\n"
+        for item in points:
+            for input_feature in input_features:
+                md_tables_str += "| " + f"{item[input_feature]:.2f}" + " "
+            md_tables_str += "|     "
+            for requests, ttft in zip(
+                item["replica_requests"], item["replica_p99_ttft_ms"]
+            ):
+                md_tables_str += f"| {requests} / {ttft:.2f} "
+            md_tables_str += (
+                f"| {item['request_imbalance']:.2f} | {item['token_imbalance']:.2f} |\n"
+            )
+        md_tables_str += "\n" * 5
+    return md_tables_str
+
+
+routing_plot = cmp_plot
+
+
+def start_replicas(supervisors: List[Supervisor]) -> List[bool]:
+    """Launch the replicas concurrently, they load their weights at the same time"""
+    with ThreadPoolExecutor(max_workers=len(supervisors)) as executor:
+        return list(executor.map(lambda supervisor: supervisor.start(), supervisors))
+
+
+def run_routed_point(
+    workload: RoutedWorkload,
+    output_file: str,
+    supervisors: List[Supervisor],
+    config: SupervisorConfig,
+) -> Dict:
+    """
+    Run one point against every replica. With launched replicas, the dead ones are
+    restarted first and the first replica supervises the point (its retries, and
+    its scheduler stats in the record), otherwise a failing point is recorded as
+    failed at once.
+    """
+    if supervisors:
+        for idx, supervisor in enumerate(supervisors[1:], start=1):
+            if not supervisor.alive() and not supervisor.restart():
+                record = failed_record(
+                    workload, f"replica {idx} is down, no restart left", 0
+                )
+                print(f"\033[91m Point marked as failed: {record['error']} \033[0m")
+                save_record(record, output_file)
+                return record
+        item = supervisors[0].run_point(workload, output_file)
+        if not item.get("failed"):
+            # the point was served by all the replicas, not only the first one
+            item.update(
+                efficiency_metrics(
+                    item,
+                    supervisors[0].server_cmd,
+                    supervisors[0].backend,
+                    config.roofline,
+                    num_replicas=len(supervisors),
+                )
+            )
+            save_record(item, output_file)
+        return item
+
+    try:
+        return run_client_cmd(workload, output_file, timeout=config.client_timeout)
+    except Exception as e:
+        record = failed_record(workload, f"{type(e).__name__}: {e}", 1)
+        print(f"\033[91m Point marked as failed: {record['error']} \033[0m")
+        save_record(record, output_file)
+        return record
+
+
+def routing_bench(
+    workload: RoutedWorkload,
+    *,
+    policies: List[str],
+    loads: List[float],
+    host,
+    ports: List[int],
+    server_cmds: Optional[List[str]] = None,
+    metrics: Optional[List[str]] = None,
+    warmup_config: Optional[WarmupConfig] = None,
+    supervisor_config: Optional[SupervisorConfig] = None,
+    output_dir: str = "output",
+):
+    """
+    Compare the client-side routing ``policies`` (see ROUTING_POLICIES) over the
+    data-parallel replicas listening on ``ports``, each policy being a label of a
+    cmp report swept through ``loads``.
+
+    With ``server_cmds`` (one per port), the replicas are launched for every
+    policy, so that each of them starts with cold prefix caches, and their logs
+    go to ``{policy}_replica{idx}_server.log``. Without, the replicas are
+    expected to be running already.
+    """
+    for policy in policies:
+        assert (
+            policy in ROUTING_POLICIES
+        ), f"{policy=} should be one of {list(ROUTING_POLICIES)}"
+    assert len(set(policies)) == len(policies), f"the policies {policies} should differ"
+    assert ports, "ports should not be empty"
+    if server_cmds is not None:
+        assert len(server_cmds) == len(
+            ports
+        ), f"The length of server_cmds and ports should be equal, but found {len(server_cmds)=}, {len(ports)=}"
+    supervisor_config = supervisor_config or SupervisorConfig()
+    endpoints = [f"http://{host}:{port}" for port in ports]
+
+    os.makedirs(output_dir, exist_ok=False)
+    save_report_config(
+        output_dir,
+        mode="routing",
+        labels=policies,
+        input_features=[workload.load_key],
+        metrics=metrics or ROUTING_METRICS,
+    )
+
+    try:
+        for policy in policies:
+            print(f"======= Running {policy} over {len(endpoints)} replicas =======")
+            policy_workload = replace(workload, endpoints=endpoints, policy=policy)
+            supervisors = []
+            if server_cmds is not None:
+                supervisors = [
+                    Supervisor(
+                        server_cmd,
+                        get_server_backend(server_cmd),
+                        base_url,
+                        supervisor_config,
+                        log_file=os.path.join(
+                            output_dir, f"{policy}_replica{idx}_server.log"
+                        ),
+                    )
+                    for idx, (server_cmd, base_url) in enumerate(
+                        zip(server_cmds, endpoints)
+                    )
+                ]
+                started = start_replicas(supervisors)
+                for idx, base_url in enumerate(endpoints):
+                    if started[idx]:
+                        converge_warmup(
+                            [policy_workload.with_load(load) for load in loads],
+                            base_url,
+                            label=f"{policy}_replica{idx}",
+                            output_dir=output_dir,
+                            config=warmup_config,
+                        )
+
+            for client_idx, load in enumerate(loads):
+                print(f"==== Running {policy} at {load} ====")
+                output_file = os.path.join(
+                    output_dir, dummy_get_filename(client_idx, label=policy)
+                )
+                item = run_routed_point(
+                    policy_workload.with_load(load),
+                    output_file,
+                    supervisors,
+                    supervisor_config,
+                )
+                if not item.get("failed"):
+                    print(
+                        f"Requests per replica: {item['replica_requests']}, "
+                        f"imbalance {item['request_imbalance']:.2f}"
+                    )
+                build_report(output_dir)
+                time.sleep(5)
+
+            for supervisor in supervisors:
+                supervisor.stop()
+            if supervisors:
+                time.sleep(5)  # wait them to exit gracefully and completely
+
+        build_report(output_dir)
+    finally:
+        kill_process_tree(os.getpid(), include_parent=False)
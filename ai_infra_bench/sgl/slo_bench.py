@@ -1,32 +1,33 @@
 import os
-from typing import Callable, Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from tqdm import tqdm
 
+from ai_infra_bench.backends import get_server_backend
 from ai_infra_bench.check import slo_check_params
+from ai_infra_bench.dashboard import Dashboard, DashboardConfig
+from ai_infra_bench.report import build_report, save_report_config
+from ai_infra_bench.supervisor import Supervisor, SupervisorConfig
 from ai_infra_bench.utils import (
-    add_request_rate,
+    add_load,
     colors,
     dummy_get_filename,
     graph_per_row,
     kill_process_tree,
-    read_jsonl,
-    run_cmd,
-    wait_for_server,
-    warmup,
+    metric_strf,
 )
+from ai_infra_bench.warmup import WarmupConfig, converge_warmup
+from ai_infra_bench.workload import Workload
 
 
-def slo_export_tables(
+def slo_table_md(
     data: List[List[Dict]],
     input_features: List[str],
     metrics: List[str],
     labels: List[str],
-    output_dir: str,
-):
-    print(f"Writing table to {os.path.join(output_dir, 'table.md')}")
+) -> str:
     md_tables_str = ""
     for server_data, label in zip(data, labels):
         server_data.sort(
@@ -46,14 +47,68 @@ def slo_export_tables(
                 md_tables_str += "| " + f"{item[input_feature]:.2f}" + " "
             md_tables_str += "|     "
             for metric in metrics:
-                md_tables_str += "| " + f"{item[metric]:.2f}" + " "
+                md_tables_str += "| " + metric_strf(item.get(metric)) + " "
             md_tables_str += "|\n"
         md_tables_str += "\n" * 5
+    return md_tables_str
+
+
+def slo_export_tables(
+    data: List[List[Dict]],
+    input_features: List[str],
+    metrics: List[str],
+    labels: List[str],
+    output_dir: str,
+):
+    print(f"Writing table to {os.path.join(output_dir, 'table.md')}")
+    md_tables_str = slo_table_md(data, input_features, metrics, labels)
     with open(os.path.join(output_dir, "table.md"), mode="w", encoding="utf-8") as f:
         f.write(md_tables_str)
     print("Writing table done")
 
 
+def slo_export_turn_tables(
+    data: List[List[Dict]],
+    input_features: List[str],
+    labels: List[str],
+    output_dir: str,
+):
+    """Per-turn TTFT of the session workloads, one row per searched point"""
+    md_tables_str = ""
+    for server_data, label in zip(data, labels):
+        server_data = [item for item in server_data if "per_turn_mean_ttft_ms" in item]
+        if not server_data:
+            continue
+        num_turns = len(server_data[0]["per_turn_mean_ttft_ms"])
+        md_tables_str += f"Title: **{label}** (mean / p99 TTFT in ms per turn)\n"
+        md_tables_str += (
+            "| "
+            + " | ".join(str(input_feature) for input_feature in input_features)
+            + " |     | "
+            + " | ".join(f"turn_{turn}" for turn in range(num_turns))
+            + " |\n"
+        )
+        md_tables_str += "| --- " * (len(input_features) + num_turns + 1) + "|\n"
+        for item in server_data:
+            for input_feature in input_features:
+                md_tables_str += "| " + f"{item[input_feature]:.2f}" + " "
+            md_tables_str += "|     "
+            for mean_ttft, p99_ttft in zip(
+                item["per_turn_mean_ttft_ms"], item["per_turn_p99_ttft_ms"]
+            ):
+                md_tables_str += "| " + f"{mean_ttft:.2f} / {p99_ttft:.2f}" + " "
+            md_tables_str += "|\n"
+        md_tables_str += "\n" * 5
+    if not md_tables_str:
+        return
+    print(f"Writing per-turn table to {os.path.join(output_dir, 'turn_table.md')}")
+    with open(
+        os.path.join(output_dir, "turn_table.md"), mode="w", encoding="utf-8"
+    ) as f:
+        f.write(md_tables_str)
+    print("Writing per-turn table done")
+
+
 def slo_plot(
     data: List[List[Dict]],
     input_features: List[str],
@@ -69,13 +124,14 @@ def slo_plot(
 
             fig = make_subplots(rows=rows, cols=cols)
 
-            x = [item[input_feature] for item in data[i]]
             cur_row, cur_col = 0, 0
             for metric in metrics:
+                # a metric of an empty group is None, its point is skipped
+                points = [item for item in data[i] if item.get(metric) is not None]
                 fig.add_trace(
                     go.Scatter(
-                        x=x,
-                        y=[item[metric] for item in data[i]],
+                        x=[item[input_feature] for item in points],
+                        y=[item[metric] for item in points],
                         name=f"{label}/{metric}",
                         mode="lines+markers",
                         marker=dict(size=8),
@@ -106,7 +162,7 @@ def slo_plot(
 
 def slo_bench(
     server_cmds: List[str],
-    client_cmds: List[str],
+    client_cmds: List[Union[str, Workload]],
     *,
     request_rates: List[Tuple[int, int]],
     input_features: List[str],
@@ -116,60 +172,81 @@ def slo_bench(
     port,
     check_slo: Callable[[Dict], bool],
     output_dir: str = "output",
+    warmup_config: Optional[WarmupConfig] = None,
+    supervisor_config: Optional[SupervisorConfig] = None,
+    dashboard_config: Optional[DashboardConfig] = None,
 ):
+    # a binary search over n loads runs at most floor(log2(n)) + 1 of them
+    dashboard = Dashboard(
+        sum((right - left + 1).bit_length() for left, right in request_rates),
+        dashboard_config,
+    )
     try:
         slo_check_params(server_cmds, client_cmds, labels)
         os.makedirs(output_dir, exist_ok=False)
-
-        data: List[List[Dict]] = []
+        save_report_config(
+            output_dir,
+            mode="slo",
+            labels=labels,
+            input_features=input_features,
+            metrics=metrics,
+        )
+        dashboard.start()
 
         for idx, server_cmd in tqdm(enumerate(server_cmds)):
             # launch server
-            run_cmd(server_cmd, is_block=False)
-            wait_for_server(f"http://{host}:{port}", 120)
+            backend = get_server_backend(server_cmd)
+            base_url = f"http://{host}:{port}"
+            supervisor = Supervisor(
+                server_cmd,
+                backend,
+                base_url,
+                supervisor_config,
+                log_file=os.path.join(output_dir, f"{labels[idx]}_server.log"),
+            )
 
             left, right = request_rates[idx]
 
-            warmup_cmd = add_request_rate(client_cmds[idx], left)
-            warmup(warmup_cmd, output_dir)
+            if supervisor.start():
+                # cover both ends of the searched range
+                converge_warmup(
+                    [
+                        add_load(client_cmds[idx], left),
+                        add_load(client_cmds[idx], right),
+                    ],
+                    base_url,
+                    label=labels[idx],
+                    output_dir=output_dir,
+                    config=warmup_config,
+                )
 
-            inner_data: List[Dict] = []
             client_idx = 0
             while left <= right:
                 mid = (left + right) // 2
 
-                cmd = add_request_rate(client_cmds[idx], mid)
+                cmd = add_load(client_cmds[idx], mid)
                 output_file = os.path.join(
                     output_dir, dummy_get_filename(client_idx, label=labels[idx])
                 )
                 client_idx += 1
-                cmd += f" --output-file {output_file}"
 
                 print(f"==== Running {mid} ====")
-                run_cmd(cmd, is_block=True)
-
-                item = read_jsonl(output_file)[-1]
-                if check_slo(item):
+                with dashboard.point(labels[idx], cmd, base_url, supervisor.backend):
+                    item = supervisor.run_point(cmd, output_file)
+                # a load the server cannot survive does not meet the SLO
+                if not item.get("failed") and check_slo(item):
                     left = mid + 1
                 else:
                     right = mid - 1
-                inner_data.append(item)
+
+                # keep the report viewable during the search
+                build_report(output_dir)
 
             print(f"\033[92m The maximum concurrency satisfying SLO is {right} \033[0m")
-            data.append(inner_data)
-        slo_export_tables(
-            data=data,
-            input_features=input_features,
-            metrics=metrics,
-            labels=labels,
-            output_dir=output_dir,
-        )
-        slo_plot(
-            data=data,
-            input_features=input_features,
-            metrics=metrics,
-            labels=labels,
-            output_dir=output_dir,
-        )
+
+            # the next server reuses the same port
+            supervisor.stop()
+        build_report(output_dir)
     finally:
+        dashboard.stop()
         kill_process_tree(os.getpid(), include_parent=False)
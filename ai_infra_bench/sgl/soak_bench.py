@@ -0,0 +1,174 @@
+import os
+import time
+from typing import Dict, List, Optional
+
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from tqdm import tqdm
+
+from ai_infra_bench.backends import get_server_backend
+from ai_infra_bench.check import check_server_client_cmds
+from ai_infra_bench.report import build_report, save_report_config
+from ai_infra_bench.supervisor import Supervisor, SupervisorConfig
+from ai_infra_bench.utils import (
+    colors,
+    dummy_get_filename,
+    graph_per_row,
+    kill_process_tree,
+)
+from ai_infra_bench.warmup import WarmupConfig, converge_warmup
+from ai_infra_bench.workload.soak import SoakWorkload
+
+SOAK_METRICS = [
+    "output_throughput",
+    "p99_ttft_ms",
+    "p99_tpot_ms",
+    "rss_mb",
+]
+
+
+def soak_table_md(
+    data: List[List[Dict]],
+    input_features: List[str],
+    metrics: List[str],
+    labels: List[str],
+) -> str:
+    md_tables_str = ""
+    for server_data, label in zip(data, labels):
+        item = server_data[-1]
+        md_tables_str += f"Title: **{label}** (first vs last window)\n"
+        md_tables_str += "| metric | first | last | change | p-value | drifted |\n"
+        md_tables_str += "| --- " * 6 + "|\n"
+        for metric, drift in item["drift"].items():
+            md_tables_str += (
+                f"| {metric} | {drift['first_median']:.2f} "
+                f"| {drift['last_median']:.2f} | {drift['change'] * 100:+.1f}% "
+                f"| {drift['p_value']:.3g} | {'**yes**' if drift['drifted'] else 'no'} |\n"
+            )
+        md_tables_str += "\n"
+
+        md_tables_str += (
+            "| "
+            + " | ".join(str(input_feature) for input_feature in input_features)
+            + " |     | "
+            + " | ".join(str(metric) for metric in metrics)
+            + " |\n"
+        )
+        md_tables_str += "| --- " * (len(input_features) + len(metrics) + 1) + "|\n"
+        for point in item["timeseries"]:
+            for input_feature in input_features:
+                md_tables_str += "| " + f"{point[input_feature]:.2f}" + " "
+            md_tables_str += "|     "
+            for metric in metrics:
+                md_tables_str += "| " + f"{point[metric]:.2f}" + " "
+            md_tables_str += "|\n"
+        md_tables_str += "\n" * 5
+    return md_tables_str
+
+
+def soak_plot(
+    data: List[List[Dict]],
+    input_features: List[str],
+    metrics: List[str],
+    labels: List[str],
+    output_dir: str,
+):
+    print("Ploting graphs in html")
+    for server_data, label in zip(data, labels):
+        item = server_data[-1]
+        drifted = item.get("drifted", [])
+        for input_feature in input_features:
+            rows = (len(metrics) - 1) // graph_per_row + 1
+            titles = [
+                f"{metric} (drifted)" if metric in drifted else metric
+                for metric in metrics
+            ]
+            fig = make_subplots(rows=rows, cols=graph_per_row, subplot_titles=titles)
+
+            x = [point[input_feature] for point in item["timeseries"]]
+            for i, metric in enumerate(metrics):
+                row, col = i // graph_per_row + 1, i % graph_per_row + 1
+                fig.add_trace(
+                    go.Scatter(
+                        x=x,
+                        y=[point[metric] for point in item["timeseries"]],
+                        name=f"{label}/{metric}",
+                        mode="lines+markers",
+                        marker=dict(size=6),
+                        line=dict(color=colors[i % len(colors)], width=3),
+                        hovertemplate=f"<br>{input_feature}: %{{x}}<br>{metric}: %{{y}}<br><extra></extra>",
+                    ),
+                    row=row,
+                    col=col,
+                )
+                fig.update_xaxes(title_text=input_feature, row=row, col=col)
+                fig.update_yaxes(title_text=metric, row=row, col=col)
+            fig.update_layout(title_text=f"{label} soak")
+            fig.write_html(os.path.join(output_dir, f"{label}_{input_feature}.html"))
+    print("Ploting graphs DONE")
+
+
+def soak_bench(
+    server_cmds: List[str],
+    workloads: List[SoakWorkload],
+    *,
+    labels: List[str],
+    host,
+    port,
+    metrics: List[str] = SOAK_METRICS,
+    warmup_config: Optional[WarmupConfig] = None,
+    supervisor_config: Optional[SupervisorConfig] = None,
+    output_dir: str = "output",
+):
+    """
+    Hold a constant load on every server for ``workload.duration_s`` seconds and
+    record how the latencies, the throughput and the server RSS evolve over time.
+    """
+    check_server_client_cmds(server_cmds, workloads, labels=labels)
+    assert len(server_cmds) == len(
+        workloads
+    ), f"The length of server_cmds and workloads should be equal, but found {len(server_cmds)=}, {len(workloads)=}"
+
+    os.makedirs(output_dir, exist_ok=False)
+    save_report_config(
+        output_dir,
+        mode="soak",
+        labels=labels,
+        input_features=["elapsed_s"],
+        metrics=metrics,
+    )
+
+    try:
+        for idx, server_cmd in tqdm(enumerate(server_cmds)):
+            backend = get_server_backend(server_cmd)
+            base_url = f"http://{host}:{port}"
+            supervisor = Supervisor(
+                server_cmd,
+                backend,
+                base_url,
+                supervisor_config,
+                log_file=os.path.join(output_dir, f"{labels[idx]}_server.log"),
+            )
+            if supervisor.start():
+                converge_warmup(
+                    [workloads[idx]],
+                    base_url,
+                    label=labels[idx],
+                    output_dir=output_dir,
+                    config=warmup_config,
+                )
+
+            print(f"==== Soaking {labels[idx]} for {workloads[idx].duration_s}s ====")
+            output_file = os.path.join(
+                output_dir, dummy_get_filename(0, label=labels[idx])
+            )
+            item = supervisor.run_point(workloads[idx], output_file)
+            if item.get("drifted"):
+                print(f"\033[91m Drift detected in {item['drifted']} \033[0m")
+
+            build_report(output_dir)
+
+            supervisor.stop()
+            time.sleep(5)  # wait it to exit gracefully and completely
+    finally:
+        kill_process_tree(os.getpid(), include_parent=False)
@@ -0,0 +1,329 @@
+import json
+import os
+import time
+from dataclasses import replace
+from typing import Dict, List, Optional, Union
+
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from tqdm import tqdm
+
+from ai_infra_bench.backends import get_server_backend
+from ai_infra_bench.check import check_server_client_cmds
+from ai_infra_bench.report import build_report, save_report_config
+from ai_infra_bench.sgl.cmp_bench import cmp_table_md
+from ai_infra_bench.supervisor import Supervisor, SupervisorConfig, save_record
+from ai_infra_bench.utils import (
+    colors,
+    dummy_get_filename,
+    graph_per_row,
+    kill_process_tree,
+    load_label_results,
+    set_cmd_args,
+)
+from ai_infra_bench.warmup import WarmupConfig, converge_warmup
+from ai_infra_bench.workload import Workload
+
+SPEC_METRICS = ["mean_tpot_ms", "p99_tpot_ms", "output_throughput"]
+SPEC_PLOTS = ["tpot_speedup", "throughput_speedup", "accept_length"]
+
+
+def with_concurrency(client_cmd: Union[str, Workload], concurrency: int):
+    """
+    The client at a fixed concurrency, with no request rate limit: the load of a
+    workload is set alone, with_load also sets the request rate of some of them
+    """
+    if isinstance(client_cmd, str):
+        return set_cmd_args(client_cmd, {"--max-concurrency": concurrency})
+    if not hasattr(client_cmd, client_cmd.load_key):
+        # e.g. a ramp, whose with_load says why it cannot be set
+        return client_cmd.with_load(concurrency)
+    return replace(client_cmd, **{client_cmd.load_key: concurrency})
+
+
+def accept_length(item: Dict) -> Optional[float]:
+    """Reported by bench_serving, else read from the scheduler log of the server"""
+    return item.get("accept_length") or item.get("server_mean_accept_length")
+
+
+def crossover(concurrencies: List[float], speedups: List[float]) -> Optional[float]:
+    """
+    The concurrency at which the speedup first falls below 1, interpolated
+    between the two points around it, 0 when it never pays off and None when it
+    always does.
+    """
+    if not speedups:
+        return None
+    if speedups[0] < 1:
+        return 0.0
+    for (c0, s0), (c1, s1) in zip(
+        zip(concurrencies, speedups), zip(concurrencies[1:], speedups[1:])
+    ):
+        if s1 < 1:
+            return c0 + (s0 - 1) * (c1 - c0) / (s0 - s1)
+    return None
+
+
+def spec_summary(data: List[List[Dict]], labels: List[str]) -> Dict[str, Dict]:
+    """
+    {dataset: {variant: points and crossover}}, every variant being compared
+    with the baseline (the first label) on the same dataset and concurrency
+    """
+    baseline = {
+        (item["dataset"], item["max_concurrency"]): item
+        for item in data[0]
+        if not item.get("failed")
+    }
+    summary: Dict[str, Dict] = {}
+    for server_data, label in zip(data[1:], labels[1:]):
+        for item in server_data:
+            key = (item.get("dataset"), item.get("max_concurrency"))
+            if item.get("failed") or key not in baseline:
+                continue
+            base = baseline[key]
+            # e.g. single-token outputs, whose TPOT is 0
+            if not (
+                base["mean_tpot_ms"]
+                and item["mean_tpot_ms"]
+                and base["output_throughput"]
+            ):
+                continue
+            variant = summary.setdefault(item["dataset"], {}).setdefault(
+                label, {"points": []}
+            )
+            variant["points"].append(
+                {
+                    "max_concurrency": item["max_concurrency"],
+                    "accept_length": accept_length(item),
+                    "baseline_tpot_ms": base["mean_tpot_ms"],
+                    "tpot_ms": item["mean_tpot_ms"],
+                    "tpot_speedup": base["mean_tpot_ms"] / item["mean_tpot_ms"],
+                    "throughput_speedup": item["output_throughput"]
+                    / base["output_throughput"],
+                }
+            )
+    for variants in summary.values():
+        for variant in variants.values():
+            variant["points"].sort(key=lambda point: point["max_concurrency"])
+            variant["crossover"] = crossover(
+                [point["max_concurrency"] for point in variant["points"]],
+                [point["tpot_speedup"] for point in variant["points"]],
+            )
+    return summary
+
+
+def _crossover_str(value: Optional[float], points: List[Dict]) -> str:
+    if value is None:
+        return f"none, still pays off at {points[-1]['max_concurrency']}"
+    if value == 0:
+        return f"never pays off from {points[0]['max_concurrency']}"
+    return f"~{value:.1f}"
+
+
+def spec_table_md(
+    data: List[List[Dict]],
+    input_features: List[str],
+    metrics: List[str],
+    labels: List[str],
+) -> str:
+    """Per dataset: the speedups of every variant, their crossover, then the cmp tables"""
+    if not data[0]:
+        return ""
+    summary = spec_summary(data, labels)
+    datasets = list(dict.fromkeys(item.get("dataset") for item in data[0]))
+    md_tables_str = ""
+    for dataset in datasets:
+        variants = summary.get(dataset, {})
+        md_tables_str += (
+            f"Title: **{dataset}** (accept length / TPOT speedup / throughput "
+            f"speedup over {labels[0]})\n"
+        )
+        md_tables_str += "| max_concurrency |     | " + " | ".join(labels[1:]) + " |\n"
+        md_tables_str += "| --- " * (len(labels) + 1) + "|\n"
+        concurrencies = sorted(
+            {
+                point["max_concurrency"]
+                for variant in variants.values()
+                for point in variant["points"]
+            }
+        )
+        for concurrency in concurrencies:
+            md_tables_str += f"| {concurrency:.2f} |     "
+            for label in labels[1:]:
+                point = next(
+                    (
+                        point
+                        for point in variants.get(label, {"points": []})["points"]
+                        if point["max_concurrency"] == concurrency
+                    ),
+                    None,
+                )
+                if point is None:
+                    md_tables_str += "| - "
+                    continue
+                accepted = (
+                    f"{point['accept_length']:.2f}"
+                    if point["accept_length"] is not None
+                    else "-"
+                )
+                speedup = f"{point['tpot_speedup']:.2f}x"
+                if point["tpot_speedup"] < 1:
+                    speedup = f"**{speedup}**"
+                md_tables_str += (
+                    f"| {accepted} / {speedup} / {point['throughput_speedup']:.2f}x "
+                )
+            md_tables_str += "|\n"
+        md_tables_str += "\n"
+        for label, variant in variants.items():
+            md_tables_str += (
+                f"- {label}: crossover at max_concurrency "
+                f"{_crossover_str(variant['crossover'], variant['points'])}\n"
+            )
+        md_tables_str += "\n" * 5
+
+        # the metrics of every label on this dataset
+        md_tables_str += f"Title: **{dataset}**\n"
+        md_tables_str += cmp_table_md(
+            [
+                [item for item in server_data if item.get("dataset") == dataset]
+                for server_data in data
+            ],
+            input_features,
+            metrics,
+            labels,
+        )
+    return md_tables_str
+
+
+def spec_plot(data, input_features, metrics, labels, output_dir):
+    """One html per dataset, the speedups and accept length of every variant"""
+    print("Ploting graphs in html")
+    summary = spec_summary(data, labels) if data[0] else {}
+    for dataset, variants in summary.items():
+        rows = (len(SPEC_PLOTS) - 1) // graph_per_row + 1
+        fig = make_subplots(rows=rows, cols=graph_per_row, subplot_titles=SPEC_PLOTS)
+        for plot_idx, plot_key in enumerate(SPEC_PLOTS):
+            row, col = plot_idx // graph_per_row + 1, plot_idx % graph_per_row + 1
+            for label_idx, label in enumerate(labels[1:]):
+                points = variants.get(label, {"points": []})["points"]
+                fig.add_trace(
+                    go.Scatter(
+                        x=[point["max_concurrency"] for point in points],
+                        y=[point[plot_key] for point in points],
+                        name=label,
+                        legendgroup=label,
+                        showlegend=plot_idx == 0,
+                        mode="lines+markers",
+                        marker=dict(size=8),
+                        line=dict(
+                            color=colors[(label_idx + 1) % len(colors)],
+                            width=3,
+                        ),
+                        hovertemplate=f"<br>max_concurrency: %{{x}}<br>{plot_key}: %{{y}}<br><extra></extra>",
+                    ),
+                    row=row,
+                    col=col,
+                )
+            if plot_key.endswith("speedup"):
+                # above the line, speculation pays off
+                fig.add_hline(y=1, line_dash="dash", row=row, col=col)
+            fig.update_xaxes(title_text="max_concurrency", type="log", row=row, col=col)
+            fig.update_yaxes(title_text=plot_key, row=row, col=col)
+        fig.update_layout(title_text=f"Speculative decoding on {dataset}")
+        fig.write_html(os.path.join(output_dir, f"spec_{dataset}.html"))
+    print("Ploting graphs DONE")
+
+
+def spec_bench(
+    server_cmds: List[str],
+    datasets: Dict[str, Union[str, Workload]],
+    *,
+    concurrencies: List[int],
+    labels: List[str],
+    host,
+    port,
+    metrics: Optional[List[str]] = None,
+    warmup_config: Optional[WarmupConfig] = None,
+    supervisor_config: Optional[SupervisorConfig] = None,
+    output_dir: str = "output",
+) -> Dict[str, Dict]:
+    """
+    Compare speculative decoding variants of a server with its baseline, the
+    first of ``server_cmds``, on every dataset of ``datasets`` ({name: client
+    command or workload}) at every concurrency.
+
+    Every variant reports its acceptance length, its TPOT and throughput speedup
+    over the baseline, and the crossover concurrency above which speculation
+    stops paying off, per dataset. They are written to table.md, spec_{dataset}.html
+    and spec.json, which is also returned.
+    """
+    check_server_client_cmds(server_cmds, list(datasets.values()), labels=labels)
+    assert len(server_cmds) >= 2, "server_cmds should hold a baseline and a variant"
+    assert concurrencies, "concurrencies should not be empty"
+    client_cmds = [
+        (name, concurrency, with_concurrency(client_cmd, concurrency))
+        for name, client_cmd in datasets.items()
+        for concurrency in sorted(concurrencies)
+    ]
+
+    os.makedirs(output_dir, exist_ok=False)
+    save_report_config(
+        output_dir,
+        mode="spec",
+        labels=labels,
+        input_features=["max_concurrency"],
+        metrics=metrics or SPEC_METRICS,
+    )
+
+    try:
+        for server_idx, server_cmd in tqdm(enumerate(server_cmds)):
+            label = labels[server_idx]
+            base_url = f"http://{host}:{port}"
+            supervisor = Supervisor(
+                server_cmd,
+                get_server_backend(server_cmd),
+                base_url,
+                supervisor_config,
+                log_file=os.path.join(output_dir, f"{label}_server.log"),
+            )
+            if supervisor.start():
+                converge_warmup(
+                    [client_cmd for _, _, client_cmd in client_cmds],
+                    base_url,
+                    label=label,
+                    output_dir=output_dir,
+                    config=warmup_config,
+                )
+
+            for client_idx, (name, concurrency, client_cmd) in enumerate(client_cmds):
+                print(f"==== Running {label} on {name} at {concurrency} ====")
+                output_file = os.path.join(
+                    output_dir, dummy_get_filename(client_idx, label=label)
+                )
+                item = supervisor.run_point(client_cmd, output_file)
+                # the dataset tells the points apart in the report
+                item.update(dataset=name, max_concurrency=concurrency)
+                save_record(item, output_file)
+                build_report(output_dir)
+                time.sleep(5)
+
+            supervisor.stop()
+            time.sleep(5)  # wait it to exit gracefully and completely
+
+        build_report(output_dir)
+        data = [
+            load_label_results(output_dir, label, include_failed=True)
+            for label in labels
+        ]
+        summary = spec_summary(data, labels)
+        with open(os.path.join(output_dir, "spec.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        for dataset, variants in summary.items():
+            for label, variant in variants.items():
+                print(
+                    f"\033[92m {label} on {dataset}: crossover at max_concurrency "
+                    f"{_crossover_str(variant['crossover'], variant['points'])} \033[0m"
+                )
+        return summary
+    finally:
+        kill_process_tree(os.getpid(), include_parent=False)
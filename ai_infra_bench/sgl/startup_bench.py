@@ -0,0 +1,175 @@
+import json
+import os
+import socket
+import time
+from typing import Dict, List, Optional
+
+import requests
+from tqdm import tqdm
+
+from ai_infra_bench.backends import Backend, get_server_backend
+from ai_infra_bench.check import check_server_client_cmds
+from ai_infra_bench.report import build_report, save_report_config
+from ai_infra_bench.server_log import launch_server, parse_startup_phases
+from ai_infra_bench.utils import dummy_get_filename, kill_process_tree
+
+STARTUP_METRICS = [
+    "time_to_listening_s",
+    "time_to_ready_s",
+    "time_to_first_completion_s",
+]
+
+
+def drop_page_cache() -> bool:
+    """Evict the weights from the OS page cache for a cold start, needs root"""
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+    except OSError as e:
+        print(f"\033[93m Cannot drop the page cache ({e}), the start is warm \033[0m")
+        return False
+    return True
+
+
+def _completion_ok(base_url: str) -> bool:
+    try:
+        model = requests.get(f"{base_url}/v1/models", timeout=5).json()["data"][0]["id"]
+        response = requests.post(
+            f"{base_url}/v1/chat/completions",
+            json={
+                "model": model,
+                "messages": [{"role": "user", "content": "hi"}],
+                "max_tokens": 1,
+            },
+            timeout=60,
+        )
+    except (requests.exceptions.RequestException, ValueError, KeyError):
+        return False
+    return response.status_code == 200
+
+
+def measure_startup(
+    server_cmd: str,
+    backend: Backend,
+    *,
+    host: str,
+    port,
+    log_file: str,
+    timeout: float = 1200,
+) -> Dict:
+    """
+    Launch the server once and time how long it takes to accept TCP connections,
+    to answer 200 on its ready path and to serve its first completion.
+    """
+    base_url = f"http://{host}:{port}"
+    milestones = {metric: None for metric in STARTUP_METRICS}
+    error = ""
+
+    start_time = time.perf_counter()
+    process, server_log = launch_server(server_cmd, log_file)
+    try:
+        while milestones["time_to_first_completion_s"] is None:
+            elapsed = time.perf_counter() - start_time
+            if process.poll() is not None:
+                error = f"server exited with code {process.returncode}"
+                break
+            if elapsed > timeout:
+                error = f"server not ready within {timeout}s"
+                break
+
+            if milestones["time_to_listening_s"] is None:
+                try:
+                    socket.create_connection((host, int(port)), timeout=0.5).close()
+                    milestones["time_to_listening_s"] = elapsed
+                except OSError:
+                    pass
+            elif milestones["time_to_ready_s"] is None:
+                try:
+                    response = requests.get(
+                        f"{base_url}{backend.ready_path}", timeout=5
+                    )
+                    if response.status_code == 200:
+                        milestones["time_to_ready_s"] = elapsed
+                except requests.exceptions.RequestException:
+                    pass
+            elif _completion_ok(base_url):
+                milestones["time_to_first_completion_s"] = (
+                    time.perf_counter() - start_time
+                )
+            time.sleep(0.1)
+    finally:
+        backend.teardown(process)
+        server_log.close()
+
+    if error:
+        return {"failed": True, "error": error, "attempts": 1, **milestones}
+    record = dict(milestones)
+    record.update(parse_startup_phases(server_log.between(start_time), backend))
+    return record
+
+
+def startup_bench(
+    server_cmds: List[str],
+    *,
+    labels: List[str],
+    host,
+    port,
+    num_runs: int = 3,
+    metrics: Optional[List[str]] = None,
+    cold: bool = False,
+    timeout: float = 1200,
+    output_dir: str = "output",
+):
+    """
+    Launch every server ``num_runs`` times and compare their startup times, with
+    the same tables and plots as cmp_bench (one row per run). With ``cold`` the
+    OS page cache is dropped before every launch.
+    """
+    check_server_client_cmds(server_cmds, [], labels=labels)
+    backends = [get_server_backend(cmd) for cmd in server_cmds]
+    if metrics is None:
+        # the phases found in the logs depend on the engines
+        metrics = list(STARTUP_METRICS)
+        for backend in backends:
+            metrics.extend(
+                f"{phase}_s"
+                for phase in backend.startup_phases
+                if f"{phase}_s" not in metrics
+            )
+
+    os.makedirs(output_dir, exist_ok=False)
+    save_report_config(
+        output_dir,
+        mode="cmp",
+        labels=labels,
+        input_features=["run"],
+        metrics=metrics,
+    )
+
+    try:
+        for idx, server_cmd in tqdm(enumerate(server_cmds)):
+            for run in range(num_runs):
+                print(f"==== Starting {labels[idx]}, run {run} ====")
+                is_cold = cold and drop_page_cache()
+                record = measure_startup(
+                    server_cmd,
+                    backends[idx],
+                    host=host,
+                    port=port,
+                    log_file=os.path.join(
+                        output_dir, f"{labels[idx]}_server_{run:02d}.log"
+                    ),
+                    timeout=timeout,
+                )
+                record.update(run=run, cold=is_cold)
+                output_file = os.path.join(
+                    output_dir, dummy_get_filename(run, label=labels[idx])
+                )
+                with open(output_file, mode="w", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+
+                build_report(output_dir)
+                time.sleep(5)  # let the port and the GPU memory be released
+    finally:
+        kill_process_tree(os.getpid(), include_parent=False)
@@ -0,0 +1,142 @@
+import os
+import time
+from typing import Dict, List, Optional
+
+from tqdm import tqdm
+
+from ai_infra_bench.backends import get_server_backend
+from ai_infra_bench.check import check_server_client_cmds
+from ai_infra_bench.report import build_report, save_report_config
+from ai_infra_bench.sgl.general_bench import general_plot, general_table_md
+from ai_infra_bench.supervisor import Supervisor, SupervisorConfig
+from ai_infra_bench.utils import dummy_get_filename, kill_process_tree
+from ai_infra_bench.warmup import WarmupConfig, converge_warmup
+from ai_infra_bench.workload.multi_tenant import MultiTenantWorkload
+
+TENANT_CLASS_METRICS = [
+    "p99_ttft_ms",
+    "p99_tpot_ms",
+    "output_throughput",
+    "slo_attainment",
+]
+
+
+def tenant_table_md(
+    data: List[List[Dict]],
+    input_features: List[str],
+    metrics: List[str],
+    labels: List[str],
+) -> str:
+    """The general tables, followed by the SLO compliance of every class"""
+    md_tables_str = general_table_md(data, input_features, metrics, labels)
+    for server_data, label in zip(data, labels):
+        if not server_data:
+            continue
+        classes = server_data[0]["classes"]
+        md_tables_str += f"Title: **{label}** (SLO attainment per class)\n"
+        md_tables_str += (
+            "| "
+            + " | ".join(str(input_feature) for input_feature in input_features)
+            + " |     | "
+            + " | ".join(classes)
+            + " |\n"
+        )
+        md_tables_str += "| --- " * (len(input_features) + len(classes) + 1) + "|\n"
+        for item in server_data:
+            for input_feature in input_features:
+                md_tables_str += "| " + f"{item[input_feature]:.2f}" + " "
+            md_tables_str += "|     "
+            for name in classes:
+                met = "met" if item[f"{name}_slo_met"] else "**missed**"
+                md_tables_str += f"| {item[f'{name}_slo_attainment'] * 100:.1f}% {met} "
+            md_tables_str += "|\n"
+        md_tables_str += "\n" * 5
+    return md_tables_str
+
+
+tenant_plot = general_plot
+
+
+def tenant_bench(
+    server_cmds: List[str],
+    workloads: List[MultiTenantWorkload],
+    *,
+    background_loads: List[float],
+    labels: List[str],
+    host,
+    port,
+    metrics: Optional[List[str]] = None,
+    warmup_config: Optional[WarmupConfig] = None,
+    supervisor_config: Optional[SupervisorConfig] = None,
+    output_dir: str = "output",
+):
+    """
+    Run the traffic classes of ``workloads[idx]`` together against every server,
+    once per background load, and report the metrics and the SLO compliance of
+    every class as the background class pushes harder.
+    """
+    check_server_client_cmds(server_cmds, workloads, labels=labels)
+    assert len(server_cmds) == len(
+        workloads
+    ), f"The length of server_cmds and workloads should be equal, but found {len(server_cmds)=}, {len(workloads)=}"
+    if metrics is None:
+        metrics = [
+            f"{traffic_class.name}_{metric}"
+            for traffic_class in workloads[0].classes
+            for metric in TENANT_CLASS_METRICS
+        ]
+
+    os.makedirs(output_dir, exist_ok=False)
+    save_report_config(
+        output_dir,
+        mode="tenant",
+        labels=labels,
+        input_features=["background_load"],
+        metrics=metrics,
+    )
+
+    try:
+        for idx, server_cmd in tqdm(enumerate(server_cmds)):
+            backend = get_server_backend(server_cmd)
+            base_url = f"http://{host}:{port}"
+            supervisor = Supervisor(
+                server_cmd,
+                backend,
+                base_url,
+                supervisor_config,
+                log_file=os.path.join(output_dir, f"{labels[idx]}_server.log"),
+            )
+            if supervisor.start():
+                # the shapes and concurrencies of every class
+                converge_warmup(
+                    workloads[idx].classes,
+                    base_url,
+                    label=labels[idx],
+                    output_dir=output_dir,
+                    config=warmup_config,
+                )
+
+            for client_idx, load in enumerate(background_loads):
+                print(
+                    f"==== Running {labels[idx]}, "
+                    f"{workloads[idx].background} at {load} ===="
+                )
+                output_file = os.path.join(
+                    output_dir, dummy_get_filename(client_idx, label=labels[idx])
+                )
+                item = supervisor.run_point(workloads[idx].with_load(load), output_file)
+                missed = [
+                    name
+                    for name in item.get("classes", [])
+                    if not item[f"{name}_slo_met"]
+                ]
+                if missed:
+                    print(f"\033[93m SLO missed by {missed} \033[0m")
+
+                build_report(output_dir)
+                time.sleep(5)
+
+            supervisor.stop()
+            time.sleep(5)  # wait it to exit gracefully and completely
+    finally:
+        kill_process_tree(os.getpid(), include_parent=False)
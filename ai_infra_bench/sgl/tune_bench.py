@@ -0,0 +1,230 @@
+import itertools
+import json
+import math
+import os
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from ai_infra_bench.backends import get_server_backend
+from ai_infra_bench.check import slo_check_params
+from ai_infra_bench.report import build_report, save_report_config
+from ai_infra_bench.supervisor import Supervisor, SupervisorConfig
+from ai_infra_bench.utils import (
+    add_load,
+    dummy_get_filename,
+    kill_process_tree,
+    load_label_results,
+    set_cmd_args,
+)
+from ai_infra_bench.warmup import WarmupConfig, converge_warmup
+from ai_infra_bench.workload import Workload
+
+
+def make_trials(
+    server_cmd: str,
+    search_space: Dict[str, List],
+    request_rates: Tuple[int, int],
+    num_trials: Optional[int] = None,
+    seed: int = 0,
+) -> List[Dict]:
+    """Every combination of the search space, or num_trials of them sampled"""
+    configs = [
+        dict(zip(search_space, values))
+        for values in itertools.product(*search_space.values())
+    ]
+    if num_trials is not None and num_trials < len(configs):
+        configs = random.Random(seed).sample(configs, num_trials)
+    left, right = request_rates
+    return [
+        {
+            "label": f"trial_{idx:02d}",
+            "flags": flags,
+            "server_cmd": set_cmd_args(server_cmd, flags),
+            # the bracket of the slo_bench binary search, left - 1 meets the SLO
+            "left": left,
+            "right": right,
+            "num_points": 0,
+            "rungs": 0,
+            "error": "",
+        }
+        for idx, flags in enumerate(configs)
+    ]
+
+
+def trial_score(trial: Dict) -> Tuple[int, int]:
+    """The highest load known to meet the SLO, then the lowest known not to"""
+    if trial["error"]:
+        return (-math.inf, -math.inf)
+    return (trial["left"] - 1, trial["right"])
+
+
+def trial_done(trial: Dict) -> bool:
+    return bool(trial["error"]) or trial["left"] > trial["right"]
+
+
+def tune_table_md(trials: List[Dict], search_space: Dict[str, List]) -> str:
+    ranked = sorted(
+        trials, key=lambda trial: (trial["rungs"], trial_score(trial)), reverse=True
+    )
+    md_tables_str = (
+        "| rank | label | "
+        + " | ".join(search_space)
+        + " | max load meeting SLO | rungs | points | status |\n"
+    )
+    md_tables_str += "| --- " * (len(search_space) + 6) + "|\n"
+    for rank, trial in enumerate(ranked):
+        if trial["error"]:
+            capacity, status = "-", f"failed: {trial['error']}"
+        elif trial_done(trial):
+            capacity, status = str(trial["right"]), "searched"
+        else:
+            capacity, status = f"[{trial['left'] - 1}, {trial['right']}]", "pruned"
+        md_tables_str += (
+            f"| {rank} | {trial['label']} | "
+            + " | ".join(str(trial["flags"][flag]) for flag in search_space)
+            + f" | {capacity} | {trial['rungs']} | {trial['num_points']} | {status} |\n"
+        )
+    return md_tables_str
+
+
+def tune_bench(
+    server_cmd: str,
+    client_cmd: Union[str, Workload],
+    *,
+    search_space: Dict[str, List],
+    request_rates: Tuple[int, int],
+    input_features: List[str],
+    metrics: List[str],
+    host,
+    port,
+    check_slo: Callable[[Dict], bool],
+    num_trials: Optional[int] = None,
+    eta: int = 3,
+    probe_points: int = 2,
+    seed: int = 0,
+    output_dir: str = "output",
+    warmup_config: Optional[WarmupConfig] = None,
+    supervisor_config: Optional[SupervisorConfig] = None,
+) -> Dict:
+    """
+    Search the server flags of ``search_space`` (e.g. {"--max-running-requests":
+    [32, 64, 128]}) for the config that meets the SLO at the highest load, by
+    successive halving: every trial launches the server with its flags and runs
+    ``probe_points`` points of the slo_bench binary search over ``request_rates``,
+    the best 1/eta of them resume their search with eta times more points, and so
+    on until a single trial is left, whose search is completed.
+
+    Every trial is a label of the report (tables and plots as in slo_bench), the
+    ranking is written to tune.md and tune.json. Returns the best trial with its
+    flags, its server command, its max load meeting the SLO and its points.
+    """
+    try:
+        slo_check_params([server_cmd], [client_cmd], ["tune"])
+        assert search_space, "search_space should not be empty"
+        assert eta >= 2, f"{eta=} should be at least 2"
+        trials = make_trials(server_cmd, search_space, request_rates, num_trials, seed)
+
+        os.makedirs(output_dir, exist_ok=False)
+        save_report_config(
+            output_dir,
+            mode="slo",
+            labels=[trial["label"] for trial in trials],
+            input_features=input_features,
+            metrics=metrics,
+        )
+        backend = get_server_backend(server_cmd)
+        base_url = f"http://{host}:{port}"
+
+        def run_trial(trial: Dict, budget: float):
+            label = trial["label"]
+            print(f"==== Running {label}: {trial['flags']} ====")
+            supervisor = Supervisor(
+                trial["server_cmd"],
+                backend,
+                base_url,
+                supervisor_config,
+                log_file=os.path.join(output_dir, f"{label}_server.log"),
+            )
+            trial["rungs"] += 1
+            if not supervisor.start():
+                # e.g. out of memory, the config is out of the race
+                trial["error"] = supervisor.error
+                return
+            converge_warmup(
+                [
+                    add_load(client_cmd, trial["left"]),
+                    add_load(client_cmd, trial["right"]),
+                ],
+                base_url,
+                label=label,
+                output_dir=output_dir,
+                config=warmup_config,
+            )
+
+            num_points = 0
+            while not trial_done(trial) and num_points < budget:
+                mid = (trial["left"] + trial["right"]) // 2
+                output_file = os.path.join(
+                    output_dir, dummy_get_filename(trial["num_points"], label=label)
+                )
+                trial["num_points"] += 1
+                num_points += 1
+
+                print(f"==== Running {mid} ====")
+                item = supervisor.run_point(add_load(client_cmd, mid), output_file)
+                if not item.get("failed") and check_slo(item):
+                    trial["left"] = mid + 1
+                else:
+                    trial["right"] = mid - 1
+                build_report(output_dir)
+
+            supervisor.stop()
+            time.sleep(5)  # the next trial reuses the same port
+
+        survivors = trials
+        rung = 0
+        while True:
+            last = len(survivors) == 1
+            budget = math.inf if last else probe_points * eta**rung
+            print(
+                f"\033[92m Rung {rung}: {len(survivors)} trials, "
+                f"{budget} points each \033[0m"
+            )
+            for trial in survivors:
+                if not trial_done(trial):
+                    run_trial(trial, budget)
+            survivors = sorted(survivors, key=trial_score, reverse=True)
+            if last or all(trial_done(trial) for trial in survivors):
+                break
+            survivors = survivors[: math.ceil(len(survivors) / eta)]
+            rung += 1
+
+        build_report(output_dir)
+        table_path = os.path.join(output_dir, "tune.md")
+        print(f"Writing table to {table_path}")
+        with open(table_path, "w", encoding="utf-8") as f:
+            f.write(tune_table_md(trials, search_space))
+        print("Writing table DONE")
+
+        best = survivors[0]
+        result = {}
+        if best["error"]:
+            print("\033[91m Every trial failed, see tune.md \033[0m")
+        else:
+            result = {
+                "label": best["label"],
+                "flags": best["flags"],
+                "server_cmd": best["server_cmd"],
+                "max_load": best["right"],
+                "points": load_label_results(output_dir, best["label"]),
+            }
+            print(
+                f"\033[92m Best flags: {best['flags']}, the maximum load satisfying "
+                f"SLO is {best['right']} ({best['label']}) \033[0m"
+            )
+        with open(os.path.join(output_dir, "tune.json"), "w", encoding="utf-8") as f:
+            json.dump({"best": result.get("label"), "trials": trials}, f, indent=2)
+        return result
+    finally:
+        kill_process_tree(os.getpid(), include_parent=False)
@@ -0,0 +1,217 @@
+"""
+Run the independent servers of a sweep side by side on one node: every server
+gets a free resource slot (a set of devices and a port) big enough for its
+parallelism, with its own clients, and the results land in the usual files so
+that the report merges them as for a sequential sweep.
+"""
+
+import contextlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+from ai_infra_bench.backends import Backend
+from ai_infra_bench.dashboard import Dashboard
+from ai_infra_bench.efficiency import parse_parallelism
+from ai_infra_bench.report import build_report
+from ai_infra_bench.supervisor import Supervisor, SupervisorConfig
+from ai_infra_bench.utils import dummy_get_filename, parse_cmd_args, set_cmd_args
+from ai_infra_bench.warmup import WarmupConfig, converge_warmup
+
+
+@dataclass
+class ResourceSlot:
+    """
+    Where one server runs: the devices it sees through ``env_var``
+    (``HIP_VISIBLE_DEVICES`` on ROCm) and the port it listens on.
+    """
+
+    devices: str
+    port: int
+    env_var: str = "CUDA_VISIBLE_DEVICES"
+
+    @property
+    def num_devices(self) -> int:
+        return len([device for device in self.devices.split(",") if device.strip()])
+
+    @property
+    def env(self) -> Dict[str, str]:
+        return {self.env_var: self.devices}
+
+
+def make_slots(
+    num_devices: int,
+    devices_per_slot: int,
+    base_port: int,
+    env_var: str = "CUDA_VISIBLE_DEVICES",
+) -> List[ResourceSlot]:
+    """
+    The devices of the node split in consecutive slots on consecutive ports, e.g.
+    make_slots(8, 2, 30000) gives "0,1" on 30000 ... "6,7" on 30003.
+    """
+    assert (
+        num_devices % devices_per_slot == 0
+    ), f"{num_devices} devices can not be split in slots of {devices_per_slot}"
+    return [
+        ResourceSlot(
+            devices=",".join(str(d) for d in range(start, start + devices_per_slot)),
+            port=base_port + i,
+            env_var=env_var,
+        )
+        for i, start in enumerate(range(0, num_devices, devices_per_slot))
+    ]
+
+
+def check_slots(slots: List[ResourceSlot], num_devices: List[int]):
+    assert slots, "At least one resource slot is needed"
+    ports = [slot.port for slot in slots]
+    assert len(set(ports)) == len(ports), f"The slots share a port: {ports}"
+    seen = set()
+    for slot in slots:
+        for device in slot.devices.split(","):
+            key = (slot.env_var, device.strip())
+            assert key not in seen, f"Device {device} is in several slots"
+            seen.add(key)
+    largest = max(slot.num_devices for slot in slots)
+    for server_idx, needed in enumerate(num_devices):
+        assert needed <= largest, (
+            f"The {server_idx}-th server needs {needed} devices, "
+            f"the largest slot has {largest}"
+        )
+
+
+class SlotPool:
+    """The free slots, handed out to the servers as they need them"""
+
+    def __init__(self, slots: List[ResourceSlot]):
+        self.free = list(slots)
+        self.cond = threading.Condition()
+
+    @contextlib.contextmanager
+    def acquire(self, num_devices: int) -> Iterator[ResourceSlot]:
+        """The smallest free slot with num_devices devices, waiting for one"""
+
+        def fitting() -> List[ResourceSlot]:
+            return sorted(
+                (slot for slot in self.free if slot.num_devices >= num_devices),
+                key=lambda slot: slot.num_devices,
+            )
+
+        with self.cond:
+            self.cond.wait_for(fitting)
+            slot = fitting()[0]
+            self.free.remove(slot)
+        try:
+            yield slot
+        finally:
+            with self.cond:
+                self.free.append(slot)
+                self.cond.notify_all()
+
+
+def retarget(cmd, host: str, port: int):
+    """
+    The command of a server or a client pointed at port. The workloads are left
+    as they are, they are given the base url of their server.
+    """
+    if not isinstance(cmd, str):
+        return cmd
+    if "--base-url" in parse_cmd_args(cmd):
+        return set_cmd_args(cmd, {"--base-url": f"http://{host}:{port}"})
+    return set_cmd_args(cmd, {"--port": port})
+
+
+def run_on_slots(
+    run: Callable[[int, ResourceSlot], None],
+    num_devices: List[int],
+    slots: List[ResourceSlot],
+    serialize: bool = False,
+):
+    """
+    run(idx, slot) for every job, the idx-th needing num_devices[idx] devices,
+    as many at a time as there are slots or one at a time with serialize. The
+    first error of a job is raised once all of them are done.
+    """
+    check_slots(slots, num_devices)
+    pool = SlotPool(slots)
+
+    def job(idx: int):
+        with pool.acquire(num_devices[idx]) as slot:
+            print(
+                f"======= Running {idx + 1}-th server on {slot.env_var}={slot.devices}, "
+                f"port {slot.port} ======="
+            )
+            run(idx, slot)
+
+    with ThreadPoolExecutor(max_workers=1 if serialize else len(slots)) as executor:
+        futures = [executor.submit(job, idx) for idx in range(len(num_devices))]
+    for future in futures:
+        future.result()
+
+
+def bench_on_slots(
+    server_cmds: List[str],
+    client_cmds: List[List],
+    *,
+    backends: List[Backend],
+    labels: List[str],
+    host: str,
+    slots: List[ResourceSlot],
+    serialize: bool = False,
+    output_dir: str = "output",
+    warmup_config: Optional[WarmupConfig] = None,
+    supervisor_config: Optional[SupervisorConfig] = None,
+    dashboard: Optional[Dashboard] = None,
+):
+    """
+    The loop of general_bench and cmp_bench with the servers scheduled on the
+    slots, client_cmds[i] being the clients of the i-th server. The report is
+    rebuilt after every point, without the weights prefetch: the next server of
+    a slot is not known in advance.
+    """
+    report_lock = threading.Lock()
+    dashboard = dashboard or Dashboard(sum(len(cmds) for cmds in client_cmds))
+
+    def run_server(server_idx: int, slot: ResourceSlot):
+        label = labels[server_idx]
+        base_url = f"http://{host}:{slot.port}"
+        cmds = [retarget(cmd, host, slot.port) for cmd in client_cmds[server_idx]]
+        supervisor = Supervisor(
+            retarget(server_cmds[server_idx], host, slot.port),
+            backends[server_idx],
+            base_url,
+            supervisor_config,
+            log_file=os.path.join(output_dir, f"{label}_server.log"),
+            env=slot.env,
+        )
+        try:
+            if supervisor.start():
+                converge_warmup(
+                    cmds,
+                    base_url,
+                    label=label,
+                    output_dir=output_dir,
+                    config=warmup_config,
+                )
+            for client_idx, cmd in enumerate(cmds):
+                output_file = os.path.join(
+                    output_dir, dummy_get_filename(client_idx, label=label)
+                )
+                with dashboard.point(label, cmd, base_url, supervisor.backend):
+                    supervisor.run_point(cmd, output_file)
+                with report_lock:
+                    build_report(output_dir)
+                time.sleep(5)
+        finally:
+            supervisor.stop()
+        time.sleep(5)  # wait it to exit gracefully and release the slot
+
+    num_devices = [
+        parse_parallelism(server_cmd, backend)["num_gpus"]
+        for server_cmd, backend in zip(server_cmds, backends)
+    ]
+    run_on_slots(run_server, num_devices, slots, serialize=serialize)
+    build_report(output_dir)
@@ -0,0 +1,253 @@
+import json
+import os
+import subprocess
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+import requests
+
+from ai_infra_bench.backends import Backend
+from ai_infra_bench.efficiency import Roofline, efficiency_metrics
+from ai_infra_bench.server_log import (
+    ServerLog,
+    digest_scheduler_stats,
+    export_scheduler_stats,
+    launch_server,
+    parse_scheduler_stats,
+)
+from ai_infra_bench.utils import (
+    parse_cmd_args,
+    run_client_cmd,
+    run_cmd,
+    wait_for_server,
+)
+
+
+@dataclass
+class SupervisorConfig:
+    """
+    - max_retries: how many times a failed point is retried before being marked
+      as failed.
+    - max_restarts: how many times the server may be restarted, after that the
+      remaining points of the server are marked as failed without being run.
+    - client_timeout: seconds after which a client point is considered as hanging.
+    - server_timeout: seconds given to the server to become ready.
+    - roofline: the hardware and model size of the servers, to add the decode
+      roofline of every point to its record next to the per-GPU metrics.
+    """
+
+    max_retries: int = 2
+    max_restarts: int = 3
+    client_timeout: Optional[float] = None
+    server_timeout: float = 120
+    roofline: Optional[Roofline] = None
+
+
+def failed_record(client_cmd, error: str, attempts: int) -> Dict:
+    """What is stored in the result file of a point which could not be measured"""
+    record = {"failed": True, "error": error, "attempts": attempts}
+    if isinstance(client_cmd, str):
+        args = parse_cmd_args(client_cmd)
+        for key in ("--max-concurrency", "--request-rate", "--num-prompts"):
+            if key in args:
+                value = float(args[key])
+                record[key[2:].replace("-", "_")] = (
+                    int(value) if value.is_integer() else value
+                )
+        record["client_cmd"] = " ".join(client_cmd.split())
+    else:
+        record[client_cmd.load_key] = getattr(client_cmd, client_cmd.load_key, None)
+        record["client_cmd"] = repr(client_cmd)
+    return record
+
+
+def save_record(item: Dict, output_file: Optional[str]):
+    """The record of the point is the only line of its output file"""
+    if output_file is None:
+        return
+    # replaced at once, a report built meanwhile never reads a partial line
+    tmp_file = f"{output_file}.tmp"
+    with open(tmp_file, mode="w", encoding="utf-8") as f:
+        f.write(json.dumps(item) + "\n")
+    os.replace(tmp_file, output_file)
+
+
+def remove_file(path: Optional[str]):
+    if path is not None and os.path.exists(path):
+        os.remove(path)
+
+
+class Supervisor:
+    """
+    Keeps one server alive during its points: the server is restarted when it
+    dies, a point is retried when its client fails, hangs or the server died
+    under it, and a point which keeps failing is recorded as failed instead of
+    aborting the whole sweep.
+
+    With a ``log_file``, the server output is appended to it instead of the
+    console, and the scheduler stats logged during a point are digested into its
+    record, their time-series is written next to its output file as a csv.
+
+    ``env`` is set for the server over the current environment, e.g. the
+    ``CUDA_VISIBLE_DEVICES`` of its resource slot.
+
+    The server of an external backend (e.g. ``openai``) is already running, it
+    is only waited for, never launched, restarted nor stopped.
+    """
+
+    def __init__(
+        self,
+        server_cmd: str,
+        backend: Backend,
+        base_url: str,
+        config: Optional[SupervisorConfig] = None,
+        log_file: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+    ):
+        self.server_cmd = server_cmd
+        self.backend = backend
+        self.base_url = base_url
+        self.config = config or SupervisorConfig()
+        self.log_file = log_file
+        self.env = env
+        self.process: Optional[subprocess.Popen] = None
+        self.server_log: Optional[ServerLog] = None
+        self.restarts = 0
+        self.error = ""
+
+    def start(self) -> bool:
+        """Launch the server, returns whether it became ready"""
+        if self.backend.external:
+            print(f"Waiting for the running server at {self.base_url}")
+        elif self.log_file is None:
+            self.process = run_cmd(self.server_cmd, is_block=False, env=self.env)
+        else:
+            self.process, self.server_log = launch_server(
+                self.server_cmd, self.log_file, env=self.env
+            )
+        try:
+            wait_for_server(
+                self.base_url,
+                timeout=self.config.server_timeout,
+                ready_path=self.backend.ready_path,
+                process=self.process,
+            )
+        except (RuntimeError, TimeoutError) as e:
+            self.error = f"server failed to start: {e}"
+            print(f"\033[91m {self.error} \033[0m")
+            self.stop()
+            return False
+        return True
+
+    def stop(self):
+        if self.process is not None:
+            self.backend.teardown(self.process)
+            self.process = None
+        if self.server_log is not None:
+            self.server_log.close()
+            self.server_log = None
+
+    def alive(self) -> bool:
+        if not self.backend.external and (
+            self.process is None or self.process.poll() is not None
+        ):
+            return False
+        try:
+            response = requests.get(
+                f"{self.base_url}{self.backend.ready_path}", timeout=10
+            )
+        except requests.exceptions.RequestException:
+            return False
+        return response.status_code == 200
+
+    def restart(self) -> bool:
+        while self.restarts < self.config.max_restarts:
+            self.restarts += 1
+            action = "Waiting again for" if self.backend.external else "Restarting"
+            print(
+                f"\033[93m {action} the server "
+                f"({self.restarts}/{self.config.max_restarts}) \033[0m"
+            )
+            self.stop()
+            time.sleep(5)  # let the port and the GPU memory be released
+            if self.start():
+                return True
+        return False
+
+    def run_point(self, client_cmd, output_file: Optional[str]) -> Dict:
+        """
+        Run one point, returns its record or a failed record. The client writes
+        next to output_file, which only ever gets the final record through
+        save_record, so a report built meanwhile never reads a partial file.
+        """
+        attempts = 0
+        self.error = ""
+        client_file = None if output_file is None else f"{output_file}.part"
+        while attempts <= self.config.max_retries:
+            if not self.alive() and not self.restart():
+                self.error = self.error or "server is down, no restart left"
+                break
+            attempts += 1
+            # the clients append to their output file, drop the failed attempts
+            remove_file(client_file)
+            # the workloads monitoring the server follow it across restarts
+            if hasattr(client_cmd, "server_pid") and self.process is not None:
+                client_cmd = replace(client_cmd, server_pid=self.process.pid)
+            start_time = time.perf_counter()
+            try:
+                item = run_client_cmd(
+                    client_cmd,
+                    client_file,
+                    base_url=self.base_url,
+                    timeout=self.config.client_timeout,
+                )
+                if item.get("completed", 1) == 0:
+                    raise RuntimeError("no request completed")
+                if not self.alive():
+                    raise RuntimeError("server died during the point")
+                item.update(
+                    efficiency_metrics(
+                        item, self.server_cmd, self.backend, self.config.roofline
+                    )
+                )
+                if self.server_log is not None:
+                    self.add_scheduler_stats(item, output_file, start_time)
+                else:
+                    save_record(item, output_file)
+                remove_file(client_file)
+                return item
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                print(
+                    f"\033[93m Point failed (attempt {attempts}): {self.error} \033[0m"
+                )
+
+        record = failed_record(client_cmd, self.error, attempts)
+        print(f"\033[91m Point marked as failed: {self.error} \033[0m")
+        save_record(record, output_file)
+        remove_file(client_file)
+        return record
+
+    def add_scheduler_stats(
+        self,
+        item: Dict,
+        output_file: Optional[str],
+        start_time: float,
+        end_time: Optional[float] = None,
+    ):
+        """
+        Digest the scheduler stats logged between start_time and end_time into
+        item, and rewrite output_file with it.
+        """
+        samples = parse_scheduler_stats(
+            self.server_log.between(start_time, end_time or time.perf_counter()),
+            self.backend,
+            start_time,
+        )
+        item.update(digest_scheduler_stats(samples))
+        save_record(item, output_file)
+        if output_file is not None and samples:
+            export_scheduler_stats(
+                samples, os.path.splitext(output_file)[0] + "_server.csv"
+            )
@@ -1,52 +1,67 @@
 from __future__ import annotations
 
+import glob
 import json
 import os
+import re
 import signal
 import subprocess
 import sys
 import threading
 import time
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import numpy as np
 import psutil
 import requests
 
+from ai_infra_bench.backends import get_backend, get_client_backend
+
 colors = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b"]
 graph_per_row = 3
 FULL_DATA_JSON_PATH = "full_data_json"  # used to store all json files
 
 
-def warmup(cmd: str, output_dir: str):
-    cmd += f" --output-file {output_dir}/.warmup.json"
-    run_cmd(cmd, is_block=True)
+def warmup(cmd, output_dir: str, base_url: str = None):
+    run_client_cmd(cmd, os.path.join(output_dir, ".warmup.json"), base_url=base_url)
 
 
-def wait_for_server(base_url: str, timeout=None):
+def wait_for_server(
+    base_url: str,
+    timeout=None,
+    ready_path: str = "/v1/models",
+    process: subprocess.Popen = None,
+):
     start_time = time.perf_counter()
 
     while True:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(
+                f"Server exited with code {process.returncode} before becoming ready"
+            )
         try:
             response = requests.get(
-                f"{base_url}/v1/models", headers={"Authorization": "Muqi1029"}
+                f"{base_url}{ready_path}", headers={"Authorization": "Muqi1029"}
             )
             if response.status_code == 200:
                 print("Server becomes ready!")
                 break
-            if timeout and time.perf_counter() - start_time > timeout:
-                raise TimeoutError(
-                    "Server did not become ready within the timeout period"
-                )
         except requests.exceptions.RequestException:
-            time.sleep(1)
+            pass
+        if timeout and time.perf_counter() - start_time > timeout:
+            raise TimeoutError("Server did not become ready within the timeout period")
+        time.sleep(1)
 
 
-def run_cmd(cmd: str, is_block=True):
+def run_cmd(cmd: str, is_block=True, timeout=None, env: Optional[Dict] = None):
+    """env is set over the environment of the current process"""
     cmd = cmd.replace("\\\n", " ").replace("\\", " ")
+    env = {**os.environ, **env} if env else None
     if is_block:
-        return subprocess.run(cmd.split(), text=True, stderr=subprocess.STDOUT)
-    return subprocess.Popen(cmd.split(), text=True, stderr=subprocess.STDOUT)
+        return subprocess.run(
+            cmd.split(), text=True, stderr=subprocess.STDOUT, timeout=timeout, env=env
+        )
+    return subprocess.Popen(cmd.split(), text=True, stderr=subprocess.STDOUT, env=env)
 
 
 def dummy_get_filename(i, label):
@@ -61,6 +76,44 @@ def read_jsonl(filepath: str):
     return data
 
 
+def find_labels(output_dir: str) -> List[str]:
+    """Labels of all the result files written by dummy_get_filename in output_dir"""
+    labels = set()
+    for filename in os.listdir(output_dir):
+        match = re.fullmatch(r"(.+)_client_(\d+)\.jsonl", filename)
+        if match:
+            labels.add(match.group(1))
+    return sorted(labels)
+
+
+def label_result_files(output_dir: str, label: str) -> List[str]:
+    """The result files of label written by dummy_get_filename, in client order"""
+    pattern = re.compile(re.escape(label) + r"_client_(\d+)\.jsonl")
+    indexed_files = []
+    for filepath in glob.glob(os.path.join(glob.escape(output_dir), "*.jsonl")):
+        match = pattern.fullmatch(os.path.basename(filepath))
+        if match:
+            indexed_files.append((int(match.group(1)), filepath))
+    return [filepath for _, filepath in sorted(indexed_files)]
+
+
+def load_label_results(
+    output_dir: str, label: str, include_failed: bool = False
+) -> List[Dict]:
+    """The last record of each result file of label, in client order"""
+    data = [
+        read_jsonl(filepath)[-1] for filepath in label_result_files(output_dir, label)
+    ]
+    if include_failed:
+        return data
+    return [item for item in data if not item.get("failed")]
+
+
+def metric_strf(value) -> str:
+    """A metric of a table, - when the record has none, e.g. of an empty group"""
+    return "-" if value is None else f"{value:.2f}"
+
+
 def avg_std_strf(
     key: str, item_list: List[Dict[str, float]], *, sep=", ", precision: int = None
 ) -> str:
@@ -83,6 +136,43 @@ def avg_std_strf(
     )
 
 
+def parse_cmd_args(cmd: str) -> Dict[str, str]:
+    """The --key value pairs of a command, a flag without a value maps to "" """
+    tokens = cmd.replace("\\\n", " ").replace("\\", " ").split()
+    args = {}
+    for i, token in enumerate(tokens):
+        if not token.startswith("--"):
+            continue
+        key, sep, value = token.partition("=")
+        if not sep and i + 1 < len(tokens) and not tokens[i + 1].startswith("--"):
+            value = tokens[i + 1]
+        args[key] = value
+    return args
+
+
+def set_cmd_args(cmd: str, args: Dict) -> str:
+    """
+    cmd with the --key value pairs of args replacing its own, a True value is
+    passed as a bare flag and a False or None value removes the key
+    """
+    tokens = cmd.replace("\\\n", " ").replace("\\", " ").split()
+    kept = []
+    i = 0
+    while i < len(tokens):
+        key, sep, _ = tokens[i].partition("=")
+        if key not in args:
+            kept.append(tokens[i])
+        elif not sep and i + 1 < len(tokens) and not tokens[i + 1].startswith("--"):
+            i += 1  # drop its value too
+        i += 1
+    for key, value in args.items():
+        if value is True:
+            kept.append(key)
+        elif value is not False and value is not None:
+            kept.extend([key, str(value)])
+    return " ".join(kept)
+
+
 def add_request_rate(cmd: str, rate: int):
     cmd += f" --max-concurrency {rate} --request-rate {rate}"
     if "num-prompt" not in cmd:
@@ -90,17 +180,42 @@ def add_request_rate(cmd: str, rate: int):
     return cmd
 
 
+def add_load(client_cmd, load: int):
+    """add_request_rate for both bench_serving commands and native workloads"""
+    if isinstance(client_cmd, str):
+        return add_request_rate(client_cmd, load)
+    return client_cmd.with_load(load)
+
+
+def run_client_cmd(
+    client_cmd, output_file: str, base_url: str = None, timeout=None
+) -> Dict:
+    """Run one client point and return its result record"""
+    if isinstance(client_cmd, str):
+        backend = get_client_backend(client_cmd) or get_backend("sglang")
+        completed = run_cmd(
+            f"{client_cmd} {backend.client_output_args(output_file)}",
+            is_block=True,
+            timeout=timeout,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"Client exited with code {completed.returncode}")
+        # the reports are rebuilt from the file, it holds the SGLang key names
+        record = backend.normalize(read_jsonl(output_file)[-1])
+        with open(output_file, mode="w", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        return record
+    return client_cmd.run(base_url, output_file=output_file, timeout=timeout)
+
+
 def sort_data_by_key(key: str, data: List[List[Dict]]):
     num_points = len(data)
     if num_points == 0:
         return data
-    assert isinstance(data[0][key], (int, float))
+    assert isinstance(data[0][0][key], (int, float))
     val_list = [item_list[0][key] for item_list in data]
-    sorted_indices = sorted(range(range(len(data))), key=lambda i: val_list[i])
-    sorted_data = []
-    for idx in sorted_indices:
-        sorted_data.append(data[idx])
-    return sorted_data
+    sorted_indices = sorted(range(len(data)), key=lambda i: val_list[i])
+    return [data[idx] for idx in sorted_indices]
 
 
 def kill_process_tree(parent_pid, include_parent: bool = True, skip_pid: int = None):
@@ -0,0 +1,241 @@
+"""
+Convergence-based server warmup.
+
+Instead of replaying a whole client command, short bursts covering the input
+lengths and batch sizes of the sweep are sent round after round, until the mean
+latency of every (shape, batch size) burst changes by less than ``tolerance``
+between two rounds without errors, or until ``max_s`` seconds have elapsed. This exercises the
+CUDA graphs and the caches the measurements will hit, in a fraction of the time.
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+import numpy as np
+
+from ai_infra_bench.utils import parse_cmd_args
+from ai_infra_bench.workload.base import (
+    AIOHTTP_TIMEOUT,
+    get_model_name,
+    make_prompt,
+    request_chat_completion,
+)
+from ai_infra_bench.workload.distributions import as_distribution
+
+WARMUP_FILE = "warmup.jsonl"
+
+# bench_serving defaults
+DEFAULT_INPUT_LEN = 1024
+DEFAULT_OUTPUT_LEN = 1024
+DEFAULT_BATCH_SIZE = 1
+
+
+@dataclass
+class WarmupConfig:
+    max_s: float = 180
+    tolerance: float = 0.1
+    min_rounds: int = 2
+    max_rounds: int = 10
+    # decoding a few tokens is enough to run the decode graphs of a batch size
+    max_output_len: int = 16
+    max_shapes: int = 3
+    max_batch_sizes: int = 4
+
+
+def _spread(values: List, k: int) -> List:
+    """At most k of the sorted distinct values, evenly spread from min to max"""
+    values = sorted(set(values))
+    if len(values) <= k:
+        return values
+    return [values[int(round(i))] for i in np.linspace(0, len(values) - 1, k)]
+
+
+def _cmd_shape(client_cmd) -> Tuple[int, int, Optional[int]]:
+    if isinstance(client_cmd, str):
+        args = parse_cmd_args(client_cmd)
+        batch_size = args.get("--max-concurrency")
+        return (
+            int(args.get("--random-input-len", DEFAULT_INPUT_LEN)),
+            int(args.get("--random-output-len", DEFAULT_OUTPUT_LEN)),
+            int(batch_size) if batch_size else None,
+        )
+    # native workloads
+    input_len = getattr(client_cmd, "input_len", None) or getattr(
+        client_cmd, "turn_input_len", DEFAULT_INPUT_LEN
+    )
+    output_len = getattr(client_cmd, "output_len", None) or getattr(
+        client_cmd, "turn_output_len", DEFAULT_OUTPUT_LEN
+    )
+    batch_size = getattr(client_cmd, "max_concurrency", None) or getattr(
+        client_cmd, "max_sessions", None
+    )
+    return (
+        int(as_distribution(input_len).mean()),
+        int(as_distribution(output_len).mean()),
+        batch_size,
+    )
+
+
+def warmup_plan(
+    client_cmds: List, config: WarmupConfig
+) -> Tuple[List[Tuple[int, int]], List[int]]:
+    """The (input_len, output_len) shapes and the batch sizes to warm up"""
+    shapes, batch_sizes = [], []
+    for client_cmd in client_cmds:
+        input_len, output_len, batch_size = _cmd_shape(client_cmd)
+        shapes.append((input_len, min(output_len, config.max_output_len)))
+        if batch_size:
+            batch_sizes.append(int(batch_size))
+        # a ramp goes through all its concurrency levels
+        if getattr(client_cmd, "load_key", None) == "max_concurrency":
+            batch_sizes.extend(int(step) for step in getattr(client_cmd, "steps", []))
+    return _spread(shapes, config.max_shapes), _spread(
+        batch_sizes or [DEFAULT_BATCH_SIZE], config.max_batch_sizes
+    )
+
+
+async def _chat_request(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    model: str,
+    input_len: int,
+    output_len: int,
+    rng: np.random.Generator,
+):
+    return await request_chat_completion(
+        session,
+        base_url,
+        {
+            "model": model,
+            "messages": [{"role": "user", "content": make_prompt(input_len, rng)}],
+            "max_tokens": output_len,
+            "ignore_eos": True,
+        },
+        prompt_len=input_len,
+    )
+
+
+async def _warmup_round(
+    base_url: str,
+    model: str,
+    shapes: List[Tuple[int, int]],
+    batch_sizes: List[int],
+    rng: np.random.Generator,
+    send: Callable = _chat_request,
+) -> Tuple[Dict[str, Optional[float]], int]:
+    """
+    One burst per (shape, batch size), returns their mean latency, None when no
+    request of the burst succeeded, and the errors
+    """
+    latencies, errored = {}, 0
+    async with aiohttp.ClientSession(timeout=AIOHTTP_TIMEOUT) as session:
+        for input_len, output_len in shapes:
+            for batch_size in batch_sizes:
+                outputs = await asyncio.gather(
+                    *[
+                        send(session, base_url, model, input_len, output_len, rng)
+                        for _ in range(batch_size)
+                    ]
+                )
+                succeeded = [output.latency for output in outputs if output.success]
+                errored += len(outputs) - len(succeeded)
+                key = f"{input_len}x{output_len}@{batch_size}"
+                latencies[key] = float(np.mean(succeeded)) if succeeded else None
+    return latencies, errored
+
+
+def converge_warmup(
+    client_cmds: List,
+    base_url: str,
+    *,
+    label: str,
+    output_dir: str,
+    config: Optional[WarmupConfig] = None,
+) -> Dict:
+    """
+    Warm the server of ``label`` up for the sweep ``client_cmds``, the report is
+    appended to warmup.jsonl in output_dir. The bursts are chat requests, unless
+    the workloads send their own with a ``warmup_request`` method.
+    """
+    config = config or WarmupConfig()
+    shapes, batch_sizes = warmup_plan(client_cmds, config)
+    model = get_model_name(base_url)
+    rng = np.random.default_rng(0)
+    send = getattr(client_cmds[0], "warmup_request", None) if client_cmds else None
+
+    print(f"Begin Warmup: shapes {shapes}, batch sizes {batch_sizes}")
+    start_time = time.perf_counter()
+    rounds: List[Dict[str, Optional[float]]] = []
+    # None after a round with errors, which can not converge
+    max_changes: List[Optional[float]] = []
+    errored = 0
+    previous_clean = False
+    converged = False
+    while len(rounds) < config.max_rounds:
+        remaining = config.max_s - (time.perf_counter() - start_time)
+        if remaining <= 0:
+            break
+        try:
+            latencies, round_errored = asyncio.run(
+                asyncio.wait_for(
+                    _warmup_round(
+                        base_url,
+                        model,
+                        shapes,
+                        batch_sizes,
+                        rng,
+                        send or _chat_request,
+                    ),
+                    timeout=remaining,
+                )
+            )
+        except asyncio.TimeoutError:
+            break
+        errored += round_errored
+        clean = round_errored == 0 and None not in latencies.values()
+        if rounds:
+            max_changes.append(
+                max(
+                    abs(latencies[key] - rounds[-1][key]) / max(rounds[-1][key], 1e-9)
+                    for key in latencies
+                )
+                if clean and previous_clean
+                else None
+            )
+        rounds.append(latencies)
+        previous_clean = clean
+        if (
+            len(rounds) >= config.min_rounds
+            and max_changes
+            and max_changes[-1] is not None
+            and max_changes[-1] <= config.tolerance
+        ):
+            converged = True
+            break
+
+    result = {
+        "label": label,
+        "converged": converged,
+        "duration": time.perf_counter() - start_time,
+        "rounds": len(rounds),
+        "errored": errored,
+        "shapes": shapes,
+        "batch_sizes": batch_sizes,
+        "max_change_per_round": max_changes,
+        "latencies": rounds[-1] if rounds else {},
+        "config": asdict(config),
+    }
+    with open(os.path.join(output_dir, WARMUP_FILE), mode="a", encoding="utf-8") as f:
+        f.write(json.dumps(result) + "\n")
+
+    status = "converged" if converged else "\033[93mNOT converged\033[0m"
+    print(
+        f"Warmup DONE: {status} after {result['rounds']} rounds "
+        f"in {result['duration']:.1f}s"
+    )
+    return result
@@ -0,0 +1,55 @@
+from ai_infra_bench.workload.base import (
+    RequestOutput,
+    Workload,
+    summarize,
+    summarize_group,
+    summarize_items,
+)
+from ai_infra_bench.workload.cancellation import CancellationWorkload
+from ai_infra_bench.workload.distributions import (
+    Constant,
+    Distribution,
+    Empirical,
+    Exponential,
+    Histogram,
+    LogNormal,
+    Mixture,
+    Uniform,
+)
+from ai_infra_bench.workload.embedding import EmbeddingWorkload
+from ai_infra_bench.workload.lora import LoraWorkload
+from ai_infra_bench.workload.multi_tenant import MultiTenantWorkload, TrafficClass
+from ai_infra_bench.workload.ramp import RampWorkload
+from ai_infra_bench.workload.random_dataset import RandomWorkload
+from ai_infra_bench.workload.routing import RoutedWorkload
+from ai_infra_bench.workload.session import SessionWorkload
+from ai_infra_bench.workload.soak import RingBuffer, SoakWorkload
+from ai_infra_bench.workload.structured import StructuredWorkload
+
+__all__ = [
+    "CancellationWorkload",
+    "Constant",
+    "Distribution",
+    "EmbeddingWorkload",
+    "Empirical",
+    "Exponential",
+    "Histogram",
+    "LogNormal",
+    "LoraWorkload",
+    "Mixture",
+    "MultiTenantWorkload",
+    "RampWorkload",
+    "RandomWorkload",
+    "RequestOutput",
+    "RingBuffer",
+    "RoutedWorkload",
+    "SessionWorkload",
+    "SoakWorkload",
+    "StructuredWorkload",
+    "TrafficClass",
+    "Uniform",
+    "Workload",
+    "summarize",
+    "summarize_group",
+    "summarize_items",
+]
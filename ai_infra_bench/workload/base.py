@@ -0,0 +1,314 @@
+import asyncio
+import contextlib
+import json
+import time
+from dataclasses import dataclass, field, replace
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+import numpy as np
+import requests
+
+AIOHTTP_TIMEOUT = aiohttp.ClientTimeout(total=6 * 60 * 60)
+
+# Short common words, most of them are a single token for the mainstream tokenizers,
+# so the number of words is a good enough approximation of the number of tokens.
+WORDS = (
+    "the of and to in is you that it he was for on are as with his they at be this "
+    "have from or one had by word but not what all were we when your can said there "
+    "use an each which she do how their if will up other about out many then them "
+    "these so some her would make like him into time has look two more write go see "
+    "number no way could people my than first water been call who oil its now find "
+    "long down day did get come made may part over new sound take only little work "
+    "know place year live me back give most very after thing our just name good"
+).split()
+
+
+@dataclass
+class RequestOutput:
+    success: bool = False
+    generated_text: str = ""
+    latency: float = 0.0
+    ttft: float = 0.0
+    itl: List[float] = field(default_factory=list)
+    prompt_len: int = 0
+    output_len: int = 0
+    start_time: float = 0.0
+    error: str = ""
+    tags: Dict = field(default_factory=dict)
+    # abandoned by the client before its end, not a success nor an error
+    cancelled: bool = False
+
+    @property
+    def tpot(self) -> float:
+        if self.output_len <= 1:
+            return 0.0
+        return (self.latency - self.ttft) / (self.output_len - 1)
+
+
+# notified of every request sent by the workloads, e.g. by the live dashboard:
+# ``request_started()`` when it is sent and ``request_finished(output)`` when done
+REQUEST_LISTENERS: List = []
+
+
+def add_request_listener(listener):
+    REQUEST_LISTENERS.append(listener)
+
+
+def remove_request_listener(listener):
+    if listener in REQUEST_LISTENERS:
+        REQUEST_LISTENERS.remove(listener)
+
+
+def make_prompt(num_tokens: int, rng: np.random.Generator) -> str:
+    return " ".join(rng.choice(WORDS, size=max(1, num_tokens)))
+
+
+def get_model_name(base_url: str) -> str:
+    response = requests.get(f"{base_url}/v1/models")
+    response.raise_for_status()
+    return response.json()["data"][0]["id"]
+
+
+async def request_chat_completion(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    payload: Dict,
+    *,
+    headers: Optional[Dict] = None,
+    prompt_len: int = 0,
+    tags: Optional[Dict] = None,
+    cancel_after: Optional[int] = None,
+) -> RequestOutput:
+    """
+    Send one streaming ``/v1/chat/completions`` request and time every chunk.
+
+    With ``cancel_after``, the connection is closed once that many chunks are
+    received, right after the headers with 0, as by a client going away.
+    """
+    output = RequestOutput(prompt_len=prompt_len, tags=tags or {})
+    payload = {"stream": True, "stream_options": {"include_usage": True}, **payload}
+
+    num_chunks = 0
+    completion_tokens = None
+    text_chunks = []
+    output.start_time = most_recent = time.perf_counter()
+    for listener in REQUEST_LISTENERS:
+        listener.request_started()
+    try:
+        async with session.post(
+            f"{base_url}/v1/chat/completions", json=payload, headers=headers
+        ) as response:
+            if response.status != 200:
+                output.error = f"{response.status}: {await response.text()}"
+                return output
+            if cancel_after == 0:
+                output.cancelled = True
+                output.latency = time.perf_counter() - output.start_time
+                response.close()
+                return output
+
+            async for raw_line in response.content:
+                line = raw_line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                line = line[len("data:") :].strip()
+                if line == "[DONE]":
+                    break
+
+                chunk = json.loads(line)
+                usage = chunk.get("usage")
+                if usage:
+                    output.prompt_len = usage.get("prompt_tokens") or output.prompt_len
+                    completion_tokens = usage.get("completion_tokens")
+
+                choices = chunk.get("choices") or []
+                if not choices:
+                    continue
+                delta = choices[0].get("delta") or {}
+                content = delta.get("content") or delta.get("reasoning_content")
+                if not content:
+                    continue
+
+                now = time.perf_counter()
+                if num_chunks == 0:
+                    output.ttft = now - output.start_time
+                else:
+                    output.itl.append(now - most_recent)
+                most_recent = now
+                num_chunks += 1
+                text_chunks.append(content)
+                if num_chunks == cancel_after:
+                    output.cancelled = True
+                    response.close()
+                    break
+
+        output.latency = time.perf_counter() - output.start_time
+        output.generated_text = "".join(text_chunks)
+        output.output_len = completion_tokens or num_chunks
+        output.success = not output.cancelled
+    except Exception as e:
+        output.error = repr(e)
+    finally:
+        for listener in REQUEST_LISTENERS:
+            listener.request_finished(output)
+    return output
+
+
+async def dispatch(
+    num_requests: int,
+    send: Callable[[aiohttp.ClientSession, int], Awaitable[RequestOutput]],
+    max_concurrency: Optional[int],
+    request_rate: float,
+    rng: np.random.Generator,
+) -> Tuple[List[RequestOutput], float]:
+    """
+    Send the requests 0..num_requests-1 with ``send(session, idx)``, arriving as a
+    Poisson process at request_rate req/s (all at once with inf) with at most
+    max_concurrency of them in flight. Returns their outputs and the duration.
+    """
+    semaphore = (
+        asyncio.Semaphore(max_concurrency)
+        if max_concurrency
+        else contextlib.nullcontext()
+    )
+
+    async def limited(session: aiohttp.ClientSession, idx: int) -> RequestOutput:
+        async with semaphore:
+            return await send(session, idx)
+
+    start_time = time.perf_counter()
+    async with aiohttp.ClientSession(timeout=AIOHTTP_TIMEOUT) as session:
+        tasks = []
+        for idx in range(num_requests):
+            tasks.append(asyncio.create_task(limited(session, idx)))
+            if request_rate != float("inf"):
+                await asyncio.sleep(rng.exponential(1 / request_rate))
+        outputs = await asyncio.gather(*tasks)
+    return outputs, time.perf_counter() - start_time
+
+
+def _stats_ms(name: str, values: List[float], percentiles=(99,)) -> Dict[str, float]:
+    values_ms = np.asarray(values, dtype=float) * 1000
+    empty = values_ms.size == 0
+    stats = {
+        f"mean_{name}_ms": 0.0 if empty else float(np.mean(values_ms)),
+        f"median_{name}_ms": 0.0 if empty else float(np.median(values_ms)),
+        f"std_{name}_ms": 0.0 if empty else float(np.std(values_ms)),
+    }
+    for p in percentiles:
+        stats[f"p{p}_{name}_ms"] = 0.0 if empty else float(np.percentile(values_ms, p))
+    return stats
+
+
+def summarize(outputs: List[RequestOutput], duration: float) -> Dict:
+    """Aggregate per-request outputs into a ``bench_serving``-compatible record."""
+    succeeded = [output for output in outputs if output.success]
+    total_input = sum(output.prompt_len for output in succeeded)
+    total_output = sum(output.output_len for output in succeeded)
+    e2e_latencies = [output.latency for output in succeeded]
+
+    result = {
+        "duration": duration,
+        "completed": len(succeeded),
+        "errored": len(outputs) - len(succeeded),
+        "total_input_tokens": total_input,
+        "total_output_tokens": total_output,
+        "request_throughput": len(succeeded) / duration,
+        "input_throughput": total_input / duration,
+        "output_throughput": total_output / duration,
+    }
+    result.update(_stats_ms("e2e_latency", e2e_latencies))
+    result.update(_stats_ms("ttft", [output.ttft for output in succeeded]))
+    result.update(
+        _stats_ms(
+            "tpot", [output.tpot for output in succeeded if output.output_len > 1]
+        )
+    )
+    result.update(
+        _stats_ms("itl", [itl for output in succeeded for itl in output.itl], (95, 99))
+    )
+    result["concurrency"] = sum(e2e_latencies) / duration
+    return result
+
+
+def summarize_items(outputs: List[RequestOutput], duration: float) -> Dict:
+    """
+    The counterpart of ``summarize`` for requests with no generated token, e.g.
+    embeddings, the number of items of a request is its ``items`` tag.
+    """
+    succeeded = [output for output in outputs if output.success]
+    total_input = sum(output.prompt_len for output in succeeded)
+    total_items = sum(output.tags["items"] for output in succeeded)
+    latencies = [output.latency for output in succeeded]
+    result = {
+        "duration": duration,
+        "completed": len(succeeded),
+        "errored": len(outputs) - len(succeeded),
+        "total_input_tokens": total_input,
+        "total_items": total_items,
+        "request_throughput": len(succeeded) / duration,
+        "item_throughput": total_items / duration,
+        "input_throughput": total_input / duration,
+    }
+    result.update(_stats_ms("e2e_latency", latencies, (50, 90, 99)))
+    result["concurrency"] = sum(latencies) / duration
+    return result
+
+
+GROUP_METRICS = ["ttft", "tpot", "e2e_latency"]
+
+
+def summarize_group(outputs: List[RequestOutput], duration: float) -> Dict:
+    """
+    The requests, output throughput and length, mean and p99 latencies of a
+    group of the requests of a run, e.g. those of an adapter. The metrics of a
+    group with no completed request are None, not 0.
+    """
+    stats = summarize(outputs, duration)
+    completed = stats["completed"]
+    group = {
+        "requests": len(outputs),
+        "errored": stats["errored"],
+        "output_throughput": stats["output_throughput"] if outputs else None,
+        "mean_output_len": (
+            stats["total_output_tokens"] / completed if completed else None
+        ),
+    }
+    for metric in GROUP_METRICS:
+        for stat in ("mean", "p99"):
+            group[f"{stat}_{metric}_ms"] = (
+                stats[f"{stat}_{metric}_ms"] if completed else None
+            )
+    return group
+
+
+class Workload:
+    """
+    Base class of the native load generators.
+
+    A workload can be used wherever a ``bench_serving`` client command is accepted:
+    ``with_load`` plays the role of ``add_request_rate`` and ``run`` plays the role of
+    running the command and reading back the last line of its output file.
+    """
+
+    # the field of the workload that is searched by slo_bench
+    load_key = "max_concurrency"
+
+    def with_load(self, load) -> "Workload":
+        return replace(self, **{self.load_key: load})
+
+    def run(
+        self,
+        base_url: str,
+        output_file: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict:
+        result = asyncio.run(asyncio.wait_for(self.arun(base_url), timeout))
+        if output_file is not None:
+            with open(output_file, mode="a", encoding="utf-8") as f:
+                f.write(json.dumps(result) + "\n")
+        return result
+
+    async def arun(self, base_url: str) -> Dict:
+        raise NotImplementedError
@@ -0,0 +1,75 @@
+from typing import Dict, List
+
+import numpy as np
+
+from ai_infra_bench.workload.base import RequestOutput
+
+DEFAULT_INPUT_BUCKETS = [512, 2048, 8192]
+DEFAULT_OUTPUT_BUCKETS = [128, 512]
+
+
+def bucket_name(value: int, edges: List[int]) -> str:
+    """The [low, high) range of edges containing value, e.g. "512-2048" """
+    low = 0
+    for edge in edges:
+        if value < edge:
+            return f"{low}-{edge}"
+        low = edge
+    return f">={low}"
+
+
+def bucket_names(edges: List[int]) -> List[str]:
+    lows = [0] + list(edges)
+    return [f"{low}-{high}" for low, high in zip(lows, edges)] + [f">={lows[-1]}"]
+
+
+def _percentiles_ms(name: str, values: List[float]) -> Dict[str, float]:
+    values_ms = np.asarray(values, dtype=float) * 1000
+    if values_ms.size == 0:
+        return {f"{stat}_{name}_ms": 0.0 for stat in ("mean", "p50", "p99")}
+    return {
+        f"mean_{name}_ms": float(np.mean(values_ms)),
+        f"p50_{name}_ms": float(np.percentile(values_ms, 50)),
+        f"p99_{name}_ms": float(np.percentile(values_ms, 99)),
+    }
+
+
+def summarize_buckets(
+    outputs: List[RequestOutput], input_edges: List[int], output_edges: List[int]
+) -> List[Dict]:
+    """TTFT, TPOT and e2e latency of the succeeded requests per (input, output) length bucket"""
+    buckets: Dict[tuple, List[RequestOutput]] = {}
+    for output in outputs:
+        if not output.success:
+            continue
+        key = (
+            bucket_name(output.prompt_len, input_edges),
+            bucket_name(output.output_len, output_edges),
+        )
+        buckets.setdefault(key, []).append(output)
+
+    input_order = bucket_names(input_edges)
+    output_order = bucket_names(output_edges)
+    summaries = []
+    for input_bucket, output_bucket in sorted(
+        buckets,
+        key=lambda key: (input_order.index(key[0]), output_order.index(key[1])),
+    ):
+        bucket_outputs = buckets[(input_bucket, output_bucket)]
+        summary = {
+            "bucket": f"in {input_bucket} / out {output_bucket}",
+            "input_bucket": input_bucket,
+            "output_bucket": output_bucket,
+            "count": len(bucket_outputs),
+        }
+        summary.update(_percentiles_ms("ttft", [o.ttft for o in bucket_outputs]))
+        summary.update(
+            _percentiles_ms(
+                "tpot", [o.tpot for o in bucket_outputs if o.output_len > 1]
+            )
+        )
+        summary.update(
+            _percentiles_ms("e2e_latency", [o.latency for o in bucket_outputs])
+        )
+        summaries.append(summary)
+    return summaries
@@ -0,0 +1,192 @@
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+from ai_infra_bench.backends import BACKENDS, fetch_metrics, get_backend, read_metric
+from ai_infra_bench.workload.base import summarize
+from ai_infra_bench.workload.buckets import summarize_buckets
+from ai_infra_bench.workload.random_dataset import RandomWorkload
+
+
+def read_stat(metrics: Dict, stat: str, backend: Optional[str] = None):
+    """
+    A stat of Backend.metric_names, under the name of backend or of the first
+    registered backend exporting it.
+    """
+    backends = [get_backend(backend)] if backend else list(BACKENDS.values())
+    for candidate in backends:
+        name = candidate.metric_names.get(stat)
+        value = read_metric(metrics, name) if name else None
+        if value is not None:
+            return value
+    return None
+
+
+def orphan_stats(samples: List[Tuple[float, float, int]]) -> Dict:
+    """
+    The requests still held by the server after their client went away, from
+    (time, server requests, client requests in flight) samples: the mean and
+    max of their count and their integral over time in request-seconds.
+    """
+    if len(samples) < 2:
+        return {"mean": 0.0, "max": 0.0, "request_s": 0.0}
+    times = np.array([sample[0] for sample in samples])
+    orphans = np.array([max(0.0, server - client) for _, server, client in samples])
+    request_s = float(np.sum(orphans[:-1] * np.diff(times)))
+    return {
+        "mean": request_s / float(times[-1] - times[0]),
+        "max": float(np.max(orphans)),
+        "request_s": request_s,
+    }
+
+
+@dataclass
+class CancellationWorkload(RandomWorkload):
+    """
+    RandomWorkload with a ``cancel_ratio`` of its streaming requests abandoned by
+    their client, after a fraction of their output drawn uniformly in
+    ``cancel_range`` (0 is right after the headers, while still queued), as by
+    users navigating away or upstream timeouts. Which requests are cancelled and
+    when only depends on ``seed``, so a sweep of the ratio compares the same
+    requests.
+
+    The ``/metrics`` of the server are polled every ``poll_interval_s`` seconds
+    during the run, under the metric names of ``backend`` (any registered one by
+    default). The requests the server runs or queues beyond those its clients
+    still wait for are orphans: their mean count over the number of
+    cancellations is ``mean_abort_reclaim_ms``, the mean time the server holds a
+    cancelled request (Little's law). After the last request, the metrics are
+    polled until the server runs no request, for at most ``drain_timeout_s``
+    seconds, ``drain_s`` is how long it took.
+
+    The usual metrics are over the requests not cancelled, to compare against a
+    ratio of 0. Besides them, the record holds ``num_cancelled``, the tokens
+    received by the cancelled clients, and the ``wasted_decode_tokens`` decoded
+    for them, counted by the server, which must serve no other traffic, and
+    client-side only when it exports no generation_tokens counter.
+    """
+
+    cancel_ratio: float = 0.3
+    cancel_range: Tuple[float, float] = (0.0, 1.0)
+    poll_interval_s: float = 0.05
+    drain_timeout_s: float = 60
+    backend: Optional[str] = None
+
+    dataset_name = "cancellation"
+
+    def __post_init__(self):
+        assert (
+            0 <= self.cancel_ratio <= 1
+        ), f"{self.cancel_ratio=} should be between 0 and 1"
+        low, high = self.cancel_range
+        assert (
+            0 <= low <= high <= 1
+        ), f"{self.cancel_range=} should be an interval of [0, 1]"
+
+    def poll(self, base_url: str) -> Dict:
+        """The requests running or queued on the server and its generated tokens"""
+        backend = get_backend(self.backend or "sglang")
+        try:
+            metrics = fetch_metrics(base_url, backend)
+        except requests.RequestException:
+            return {}
+        stats = {
+            stat: read_stat(metrics, stat, self.backend)
+            for stat in ("running_req", "queue_req", "generation_tokens")
+        }
+        return {stat: value for stat, value in stats.items() if value is not None}
+
+    def prepare(self, base_url: str) -> Dict:
+        run = super().prepare(base_url)
+        cancel_rng = np.random.default_rng([self.seed, 7])
+        run["cancelled"] = cancel_rng.random(run["num_prompts"]) < self.cancel_ratio
+        run["cancel_points"] = cancel_rng.uniform(
+            *self.cancel_range, run["num_prompts"]
+        )
+        run["in_flight"] = 0
+        run["samples"] = []
+        return run
+
+    def request_payload(self, run, idx, prompt_len, max_tokens):
+        payload, kwargs = super().request_payload(run, idx, prompt_len, max_tokens)
+        if run["cancelled"][idx]:
+            kwargs["cancel_after"] = int(run["cancel_points"][idx] * max_tokens)
+        return payload, kwargs
+
+    async def send_request(self, run, session, payload, **kwargs):
+        run["in_flight"] += 1
+        try:
+            return await super().send_request(run, session, payload, **kwargs)
+        finally:
+            run["in_flight"] -= 1
+
+    async def sample(self, run: Dict) -> Dict:
+        stats = await asyncio.to_thread(self.poll, run["base_url"])
+        if "running_req" in stats:
+            server = stats["running_req"] + stats.get("queue_req", 0)
+            run["samples"].append((time.perf_counter(), server, run["in_flight"]))
+        return stats
+
+    async def send_requests(self, run):
+        async def monitor():
+            while True:
+                await self.sample(run)
+                await asyncio.sleep(self.poll_interval_s)
+
+        run["before"] = await self.sample(run)
+        monitor_task = asyncio.create_task(monitor())
+        outputs, duration = await super().send_requests(run)
+
+        # the server holds the cancelled requests it has not noticed yet
+        end_time = time.perf_counter()
+        after = {}
+        while time.perf_counter() - end_time < self.drain_timeout_s:
+            after = await self.sample(run)
+            if not after.get("running_req"):
+                break
+            await asyncio.sleep(self.poll_interval_s)
+        run["drain_s"] = time.perf_counter() - end_time
+        monitor_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await monitor_task
+        if after.get("running_req"):
+            print(f"The server still runs {after['running_req']:.0f} requests")
+        run["after"] = after
+        return outputs, duration
+
+    def extend_record(self, run, result, outputs, duration):
+        survivors = [output for output in outputs if not output.cancelled]
+        aborted = [output for output in outputs if output.cancelled]
+        received = sum(output.output_len for output in aborted)
+        orphans = orphan_stats(run["samples"])
+        before, after = run["before"], run["after"]
+
+        result["cancel_ratio"] = self.cancel_ratio
+        result.update(summarize(survivors, duration))
+        result["num_cancelled"] = len(aborted)
+        result["cancelled_received_tokens"] = received
+        if "generation_tokens" in before and "generation_tokens" in after:
+            generated = after["generation_tokens"] - before["generation_tokens"]
+            # decoded for the cancelled requests, before and after they went away
+            wasted = max(0.0, generated - result["total_output_tokens"])
+        else:
+            generated = result["total_output_tokens"] + received
+            wasted = received
+        result["server_generated_tokens"] = generated
+        result["wasted_decode_tokens"] = wasted
+        result["wasted_after_cancel_tokens"] = max(0.0, wasted - received)
+        result["wasted_token_ratio"] = wasted / generated if generated else 0.0
+        result["mean_orphaned_reqs"] = orphans["mean"]
+        result["max_orphaned_reqs"] = orphans["max"]
+        result["mean_abort_reclaim_ms"] = (
+            orphans["request_s"] / len(aborted) * 1000 if aborted else 0.0
+        )
+        result["drain_s"] = run["drain_s"]
+        result["buckets"] = summarize_buckets(
+            survivors, self.input_buckets, self.output_buckets
+        )
@@ -0,0 +1,177 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+
+class Distribution:
+    """A 1-D random variable sampled with a caller-provided ``np.random.Generator``."""
+
+    def sample(self, rng: np.random.Generator) -> float:
+        raise NotImplementedError
+
+    def mean(self) -> float:
+        raise NotImplementedError
+
+    def sample_int(self, rng: np.random.Generator, low: int = 1) -> int:
+        return max(low, int(round(self.sample(rng))))
+
+
+@dataclass
+class Constant(Distribution):
+    value: float
+
+    def sample(self, rng):
+        return self.value
+
+    def mean(self):
+        return self.value
+
+
+@dataclass
+class Uniform(Distribution):
+    low: float
+    high: float
+
+    def sample(self, rng):
+        return rng.uniform(self.low, self.high)
+
+    def mean(self):
+        return (self.low + self.high) / 2
+
+
+@dataclass
+class Exponential(Distribution):
+    mean_value: float
+
+    def sample(self, rng):
+        if self.mean_value <= 0:
+            return 0.0
+        return rng.exponential(self.mean_value)
+
+    def mean(self):
+        return self.mean_value
+
+
+@dataclass
+class LogNormal(Distribution):
+    """Parameterized by the median and the sigma of the underlying normal."""
+
+    median: float
+    sigma: float
+    low: float = 0.0
+    high: float = float("inf")
+
+    def sample(self, rng):
+        return float(
+            np.clip(rng.lognormal(np.log(self.median), self.sigma), self.low, self.high)
+        )
+
+    def mean(self):
+        return self.median * np.exp(self.sigma**2 / 2)
+
+
+@dataclass
+class Empirical(Distribution):
+    """Resamples observed values, e.g. the prompt lengths of a production log."""
+
+    values: List[float]
+
+    def sample(self, rng):
+        return float(rng.choice(self.values))
+
+    def mean(self):
+        return float(np.mean(self.values))
+
+
+@dataclass
+class Histogram(Distribution):
+    """A bin is drawn in proportion to its count, then a value uniformly inside it."""
+
+    edges: List[float]
+    counts: List[float]
+
+    def __post_init__(self):
+        assert (
+            len(self.edges) == len(self.counts) + 1
+        ), f"{len(self.edges)=} should be {len(self.counts)=} + 1"
+
+    def _probs(self) -> np.ndarray:
+        counts = np.asarray(self.counts, dtype=float)
+        return counts / counts.sum()
+
+    def sample(self, rng):
+        i = rng.choice(len(self.counts), p=self._probs())
+        return rng.uniform(self.edges[i], self.edges[i + 1])
+
+    def mean(self):
+        centers = (np.asarray(self.edges[:-1]) + np.asarray(self.edges[1:])) / 2
+        return float(np.dot(self._probs(), centers))
+
+
+@dataclass
+class Mixture(Distribution):
+    """
+    ``components[i]`` (a number or a Distribution) is sampled with probability
+    ``weights[i]``, e.g. short chat and long RAG prompts. The weights are
+    normalized, equal by default.
+    """
+
+    components: List[Distribution]
+    weights: Optional[List[float]] = None
+
+    def __post_init__(self):
+        self.components = [as_distribution(component) for component in self.components]
+        assert self.weights is None or len(self.weights) == len(
+            self.components
+        ), f"{len(self.weights)=} should be {len(self.components)=}"
+
+    def probs(self) -> np.ndarray:
+        weights = np.ones(len(self.components))
+        if self.weights is not None:
+            weights = np.asarray(self.weights, dtype=float)
+        return weights / weights.sum()
+
+    def sample_component(self, rng: np.random.Generator) -> int:
+        return int(rng.choice(len(self.components), p=self.probs()))
+
+    def sample(self, rng):
+        return self.components[self.sample_component(rng)].sample(rng)
+
+    def mean(self):
+        return float(
+            sum(
+                p * component.mean()
+                for p, component in zip(self.probs(), self.components)
+            )
+        )
+
+
+def sample_lengths(
+    input_len: Distribution, output_len: Distribution, rng: np.random.Generator
+):
+    """
+    (input_len, output_len) of one request. When both are mixtures of as many
+    components, they are drawn from the same component, so that a long RAG
+    prompt goes with a RAG answer and not with a chat one.
+    """
+    if (
+        isinstance(input_len, Mixture)
+        and isinstance(output_len, Mixture)
+        and len(input_len.components) == len(output_len.components)
+    ):
+        i = input_len.sample_component(rng)
+        return (
+            input_len.components[i].sample_int(rng),
+            output_len.components[i].sample_int(rng),
+        )
+    return input_len.sample_int(rng), output_len.sample_int(rng)
+
+
+def as_distribution(value) -> Distribution:
+    if isinstance(value, Distribution):
+        return value
+    assert isinstance(
+        value, (int, float)
+    ), f"{value=} should be a number or a Distribution"
+    return Constant(value)
@@ -0,0 +1,177 @@
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Union
+
+import aiohttp
+import numpy as np
+
+from ai_infra_bench.workload.base import (
+    REQUEST_LISTENERS,
+    RequestOutput,
+    Workload,
+    dispatch,
+    get_model_name,
+    make_prompt,
+    summarize_items,
+)
+from ai_infra_bench.workload.distributions import Distribution, as_distribution
+
+EMBEDDING_TASKS = {"embed": "/v1/embeddings", "rerank": "/v1/rerank"}
+
+
+async def request_embedding(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    path: str,
+    payload: Dict,
+    *,
+    prompt_len: int = 0,
+    num_items: int = 1,
+) -> RequestOutput:
+    """Send one embedding or rerank request, the items are kept in ``tags``"""
+    output = RequestOutput(prompt_len=prompt_len, tags={"items": num_items})
+    output.start_time = time.perf_counter()
+    for listener in REQUEST_LISTENERS:
+        listener.request_started()
+    try:
+        async with session.post(f"{base_url}{path}", json=payload) as response:
+            if response.status != 200:
+                output.error = f"{response.status}: {await response.text()}"
+                return output
+            body = await response.json()
+        output.latency = time.perf_counter() - output.start_time
+        usage = body.get("usage") or {}
+        output.prompt_len = usage.get("prompt_tokens") or output.prompt_len
+        output.success = True
+    except Exception as e:
+        output.error = repr(e)
+    finally:
+        for listener in REQUEST_LISTENERS:
+            listener.request_finished(output)
+    return output
+
+
+@dataclass
+class EmbeddingWorkload(Workload):
+    """
+    Requests to ``/v1/embeddings`` (``task="embed"``) or to ``/v1/rerank``
+    (``task="rerank"``, a query and its documents), for the embedding and rerank
+    models served next to the generative ones.
+
+    Every request carries ``batch_size`` items (texts to embed or documents to
+    rank) of ``input_len`` tokens each, both can be any Distribution, and a rerank
+    query of ``query_len`` tokens. ``num_prompts`` requests arrive as a Poisson
+    process at ``request_rate`` req/s with at most ``max_concurrency`` in flight,
+    ``with_load`` sets both. ``path`` overrides the endpoint of the task.
+
+    The record has the request, item (``item_throughput``) and token
+    (``input_throughput``) throughputs and the mean, p50, p90 and p99 latencies
+    (``p99_e2e_latency_ms``...), there is no TTFT nor TPOT.
+    """
+
+    task: str = "embed"
+    max_concurrency: Optional[int] = None
+    request_rate: float = float("inf")
+    num_prompts: Optional[int] = None
+    batch_size: Union[int, Distribution] = 1
+    input_len: Union[int, Distribution] = 256
+    query_len: Union[int, Distribution] = 32
+    path: Optional[str] = None
+    model: Optional[str] = None
+    seed: int = 0
+
+    def __post_init__(self):
+        assert (
+            self.task in EMBEDDING_TASKS
+        ), f"{self.task=} should be one of {list(EMBEDDING_TASKS)}"
+
+    def with_load(self, load) -> "EmbeddingWorkload":
+        return replace(self, max_concurrency=load, request_rate=load)
+
+    def _payload(
+        self, model: str, lengths: List[int], query_len: int, rng: np.random.Generator
+    ) -> Dict:
+        texts = [make_prompt(length, rng) for length in lengths]
+        if self.task == "embed":
+            return {"model": model, "input": texts}
+        return {
+            "model": model,
+            "query": make_prompt(query_len, rng),
+            "documents": texts,
+        }
+
+    def _prompt_len(self, lengths: List[int], query_len: int) -> int:
+        # every document is scored together with the query
+        if self.task == "embed":
+            return sum(lengths)
+        return sum(lengths) + len(lengths) * query_len
+
+    async def warmup_request(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str,
+        model: str,
+        input_len: int,
+        output_len: int,
+        rng: np.random.Generator,
+    ) -> RequestOutput:
+        """Used by converge_warmup instead of a chat request, output_len is ignored"""
+        batch_size = max(1, round(as_distribution(self.batch_size).mean()))
+        query_len = max(1, round(as_distribution(self.query_len).mean()))
+        lengths = [input_len] * batch_size
+        return await request_embedding(
+            session,
+            base_url,
+            self.path or EMBEDDING_TASKS[self.task],
+            self._payload(model, lengths, query_len, rng),
+            prompt_len=self._prompt_len(lengths, query_len),
+            num_items=batch_size,
+        )
+
+    async def arun(self, base_url: str) -> Dict:
+        model = self.model or get_model_name(base_url)
+        num_prompts = self.num_prompts or 10 * (self.max_concurrency or 100)
+        rng = np.random.default_rng(self.seed)
+        batch_size = as_distribution(self.batch_size)
+        input_len = as_distribution(self.input_len)
+        query_len = as_distribution(self.query_len)
+        requests = []
+        for _ in range(num_prompts):
+            lengths = [
+                input_len.sample_int(rng) for _ in range(batch_size.sample_int(rng))
+            ]
+            query = query_len.sample_int(rng)
+            requests.append(
+                (
+                    self._payload(model, lengths, query, rng),
+                    self._prompt_len(lengths, query),
+                    len(lengths),
+                )
+            )
+        path = self.path or EMBEDDING_TASKS[self.task]
+
+        async def send(session: aiohttp.ClientSession, idx: int) -> RequestOutput:
+            payload, prompt_len, num_items = requests[idx]
+            return await request_embedding(
+                session,
+                base_url,
+                path,
+                payload,
+                prompt_len=prompt_len,
+                num_items=num_items,
+            )
+
+        outputs, duration = await dispatch(
+            num_prompts, send, self.max_concurrency, self.request_rate, rng
+        )
+
+        result = {
+            "backend": "native",
+            "dataset_name": self.task,
+            "request_rate": self.request_rate,
+            "max_concurrency": self.max_concurrency,
+            "num_prompts": num_prompts,
+            "mean_batch_size": float(np.mean([request[2] for request in requests])),
+        }
+        result.update(summarize_items(outputs, duration))
+        return result
@@ -0,0 +1,124 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ai_infra_bench.workload.base import summarize_group
+from ai_infra_bench.workload.random_dataset import RandomWorkload
+
+POPULARITIES = ["uniform", "zipf"]
+# where the adapter of a request is named: SGLang takes it in lora_path, vLLM as the model
+ADAPTER_FIELDS = ["lora_path", "model"]
+
+
+def adapter_popularity(
+    num_adapters: int, popularity: str = "uniform", zipf_alpha: float = 1.0
+) -> np.ndarray:
+    """The share of the requests of every adapter, the most popular first"""
+    if popularity == "zipf":
+        weights = 1 / np.arange(1, num_adapters + 1) ** zipf_alpha
+    else:
+        weights = np.ones(num_adapters)
+    return weights / weights.sum()
+
+
+@dataclass
+class LoraWorkload(RandomWorkload):
+    """
+    RandomWorkload spread over the LoRA adapters served on top of one base model.
+
+    The server serves ``num_adapters`` adapters, named ``adapter_names`` or
+    lora0, lora1... like ``--lora-paths lora0=... lora1=...``, and the requests
+    go to the first ``active_adapters`` of them (all by default), with a
+    ``popularity`` of "uniform" or "zipf" (of exponent ``zipf_alpha``, lora0
+    being the most popular). The adapter is sent in ``adapter_field``, "lora_path"
+    for SGLang or "model" for vLLM. The adapters only depend on ``seed``, and the
+    lengths are those of a RandomWorkload of the same seed whatever the adapters.
+
+    The ``hot_fraction`` most popular active adapters (at least one) are the hot
+    ones. Besides the usual metrics, the record holds the ``summarize_group`` of
+    the hot and of the cold adapters (``hot_p99_ttft_ms``, ``cold_p99_ttft_ms``...),
+    and of every adapter in ``adapters``, None for a group with no completed
+    request, e.g. the cold adapters when there is a single one. ``num_adapters``
+    and ``active_adapters`` are in the record too, so that they can be input
+    features.
+    """
+
+    num_adapters: int = 8
+    active_adapters: Optional[int] = None
+    popularity: str = "uniform"
+    zipf_alpha: float = 1.0
+    adapter_names: Optional[List[str]] = None
+    adapter_field: str = "lora_path"
+    hot_fraction: float = 0.2
+
+    dataset_name = "lora"
+
+    def __post_init__(self):
+        assert (
+            self.popularity in POPULARITIES
+        ), f"{self.popularity=} should be one of {POPULARITIES}"
+        assert (
+            self.adapter_field in ADAPTER_FIELDS
+        ), f"{self.adapter_field=} should be one of {ADAPTER_FIELDS}"
+        if self.adapter_names is not None:
+            assert (
+                len(self.adapter_names) == self.num_adapters
+            ), f"{len(self.adapter_names)=} should be {self.num_adapters=}"
+        assert (
+            1 <= (self.active_adapters or self.num_adapters) <= self.num_adapters
+        ), f"{self.active_adapters=} should be between 1 and {self.num_adapters=}"
+
+    @property
+    def adapters(self) -> List[str]:
+        """The active adapters, the most popular first"""
+        names = self.adapter_names or [f"lora{i}" for i in range(self.num_adapters)]
+        return names[: self.active_adapters or self.num_adapters]
+
+    @property
+    def hot_adapters(self) -> List[str]:
+        adapters = self.adapters
+        return adapters[: max(1, round(self.hot_fraction * len(adapters)))]
+
+    def prepare(self, base_url: str) -> Dict:
+        run = super().prepare(base_url)
+        adapters = self.adapters
+        run["adapters"] = np.random.default_rng([self.seed, 3, 0]).choice(
+            adapters,
+            size=run["num_prompts"],
+            p=adapter_popularity(len(adapters), self.popularity, self.zipf_alpha),
+        )
+        return run
+
+    def request_payload(self, run, idx, prompt_len, max_tokens):
+        payload, kwargs = super().request_payload(run, idx, prompt_len, max_tokens)
+        adapter = str(run["adapters"][idx])
+        payload[self.adapter_field] = adapter
+        kwargs["tags"] = {"adapter": adapter}
+        return payload, kwargs
+
+    def extend_record(self, run, result, outputs, duration):
+        adapters = self.adapters
+        hot = set(self.hot_adapters)
+        result.update(
+            num_adapters=self.num_adapters,
+            active_adapters=len(adapters),
+            num_hot_adapters=len(hot),
+            popularity=self.popularity,
+        )
+        for name, in_group in (("hot", True), ("cold", False)):
+            group = summarize_group(
+                [o for o in outputs if (o.tags["adapter"] in hot) == in_group],
+                duration,
+            )
+            result.update({f"{name}_{key}": value for key, value in group.items()})
+        result["adapters"] = [
+            {
+                "adapter": adapter,
+                "hot": adapter in hot,
+                **summarize_group(
+                    [o for o in outputs if o.tags["adapter"] == adapter], duration
+                ),
+            }
+            for adapter in adapters
+        ]
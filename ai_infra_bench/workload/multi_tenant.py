@@ -0,0 +1,202 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+import aiohttp
+import numpy as np
+
+from ai_infra_bench.workload.base import (
+    AIOHTTP_TIMEOUT,
+    RequestOutput,
+    Workload,
+    get_model_name,
+    make_prompt,
+    request_chat_completion,
+    summarize,
+)
+from ai_infra_bench.workload.distributions import (
+    Distribution,
+    as_distribution,
+    sample_lengths,
+)
+
+# the per-request latencies an SLO can bound
+SLO_LATENCIES = {
+    "ttft_ms": lambda output: output.ttft * 1000,
+    "tpot_ms": lambda output: output.tpot * 1000,
+    "e2e_latency_ms": lambda output: output.latency * 1000,
+}
+
+
+@dataclass
+class TrafficClass:
+    """
+    One stream of requests sharing the server with the others.
+
+    Requests arrive as a Poisson process at ``request_rate`` req/s, or are sent
+    back to back by ``max_concurrency`` users, exactly one of them is set.
+    ``priority`` is sent as the ``priority`` field of the requests (it needs
+    ``--enable-priority-scheduling`` on SGLang), ``headers`` and ``extra_body``
+    are added to them as is.
+
+    ``slo`` bounds the latencies of every request, e.g. {"ttft_ms": 300,
+    "tpot_ms": 50}, the class meets it when at least ``slo_target`` of its
+    requests do.
+    """
+
+    name: str
+    request_rate: Optional[float] = None
+    max_concurrency: Optional[int] = None
+    input_len: Union[int, Distribution] = 1024
+    output_len: Union[int, Distribution] = 256
+    priority: Optional[int] = None
+    headers: Optional[Dict[str, str]] = None
+    extra_body: Dict = field(default_factory=dict)
+    slo: Dict[str, float] = field(default_factory=dict)
+    slo_target: float = 0.99
+
+    def __post_init__(self):
+        assert (self.request_rate is None) != (
+            self.max_concurrency is None
+        ), f"{self.name}: exactly one of request_rate and max_concurrency should be set"
+        for key in self.slo:
+            assert (
+                key in SLO_LATENCIES
+            ), f"{self.name}: {key=} of the slo should be one of {list(SLO_LATENCIES)}"
+
+    def meets_slo(self, output: RequestOutput) -> bool:
+        return output.success and all(
+            SLO_LATENCIES[key](output) <= bound for key, bound in self.slo.items()
+        )
+
+
+@dataclass
+class MultiTenantWorkload(Workload):
+    """
+    Several traffic classes sent at the same time to one server for
+    ``duration_s`` seconds, e.g. latency-critical chat next to bulk offline jobs.
+
+    The load of the ``background`` class (the last one by default), its request
+    rate or its concurrency, is what a bench sweeps through ``background_load``.
+    The metrics of every class are reported as ``{class}_{metric}``, with
+    ``{class}_slo_attainment`` (the fraction of its requests meeting its SLO) and
+    ``{class}_slo_met``.
+    """
+
+    classes: List[TrafficClass] = field(default_factory=list)
+    background: Optional[str] = None
+    background_load: Optional[float] = None
+    duration_s: float = 60
+    model: Optional[str] = None
+    seed: int = 0
+
+    load_key = "background_load"
+
+    def __post_init__(self):
+        names = [traffic_class.name for traffic_class in self.classes]
+        assert names, "classes should not be empty"
+        assert len(set(names)) == len(names), f"the class names {names} should differ"
+        self.background = self.background or names[-1]
+        assert self.background in names, f"{self.background=} should be one of {names}"
+
+    def _load(self, traffic_class: TrafficClass):
+        """The request rate or concurrency of the class, background_load for the background"""
+        load = traffic_class.request_rate or traffic_class.max_concurrency
+        if traffic_class.name == self.background and self.background_load is not None:
+            load = self.background_load
+        return load
+
+    async def arun(self, base_url: str) -> Dict:
+        model = self.model or get_model_name(base_url)
+        outputs: Dict[str, List[RequestOutput]] = {
+            traffic_class.name: [] for traffic_class in self.classes
+        }
+
+        async def send(
+            session: aiohttp.ClientSession,
+            traffic_class: TrafficClass,
+            rng: np.random.Generator,
+        ):
+            prompt_len, max_tokens = sample_lengths(
+                as_distribution(traffic_class.input_len),
+                as_distribution(traffic_class.output_len),
+                rng,
+            )
+            payload = {
+                "model": model,
+                "messages": [{"role": "user", "content": make_prompt(prompt_len, rng)}],
+                "max_tokens": max_tokens,
+                "ignore_eos": True,
+                **traffic_class.extra_body,
+            }
+            if traffic_class.priority is not None:
+                payload["priority"] = traffic_class.priority
+            output = await request_chat_completion(
+                session,
+                base_url,
+                payload,
+                headers=traffic_class.headers,
+                prompt_len=prompt_len,
+            )
+            outputs[traffic_class.name].append(output)
+
+        async def run_class(
+            session: aiohttp.ClientSession, idx: int, traffic_class: TrafficClass
+        ):
+            load = self._load(traffic_class)
+            if not load:
+                return
+            if traffic_class.max_concurrency is not None:
+
+                async def user(user_id: int):
+                    rng = np.random.default_rng([self.seed, idx, user_id])
+                    while time.perf_counter() < end_time:
+                        await send(session, traffic_class, rng)
+
+                await asyncio.gather(*[user(user_id) for user_id in range(int(load))])
+                return
+
+            rng = np.random.default_rng([self.seed, idx])
+            tasks = []
+            while time.perf_counter() < end_time:
+                tasks.append(asyncio.create_task(send(session, traffic_class, rng)))
+                await asyncio.sleep(rng.exponential(1 / load))
+            await asyncio.gather(*tasks)
+
+        start_time = time.perf_counter()
+        end_time = start_time + self.duration_s
+        async with aiohttp.ClientSession(timeout=AIOHTTP_TIMEOUT) as session:
+            await asyncio.gather(
+                *[
+                    run_class(session, idx, traffic_class)
+                    for idx, traffic_class in enumerate(self.classes)
+                ]
+            )
+        duration = time.perf_counter() - start_time
+
+        result = {
+            "backend": "native",
+            "dataset_name": "multi_tenant",
+            "background": self.background,
+            "background_load": self._load(
+                next(c for c in self.classes if c.name == self.background)
+            ),
+            "duration_s": self.duration_s,
+            "classes": [traffic_class.name for traffic_class in self.classes],
+        }
+        for traffic_class in self.classes:
+            class_outputs = outputs[traffic_class.name]
+            for key, value in summarize(class_outputs, duration).items():
+                result[f"{traffic_class.name}_{key}"] = value
+            attainment = (
+                sum(traffic_class.meets_slo(output) for output in class_outputs)
+                / len(class_outputs)
+                if class_outputs
+                else 0.0
+            )
+            result[f"{traffic_class.name}_slo_attainment"] = attainment
+            result[f"{traffic_class.name}_slo_met"] = (
+                attainment >= traffic_class.slo_target
+            )
+        return result
@@ -0,0 +1,155 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+import aiohttp
+import numpy as np
+
+from ai_infra_bench.workload.base import (
+    AIOHTTP_TIMEOUT,
+    RequestOutput,
+    Workload,
+    get_model_name,
+    make_prompt,
+    request_chat_completion,
+    summarize,
+)
+from ai_infra_bench.workload.distributions import Distribution, as_distribution
+
+RAMP_MODES = ["concurrency", "rate"]
+
+
+@dataclass
+class RampWorkload(Workload):
+    """
+    Stepped load ramp driven from a single client session.
+
+    The load goes through ``steps`` (concurrency levels, or request rates in req/s
+    with ``mode="rate"``) and is held ``step_s`` seconds at each of them. The
+    requests still running when the load changes are not interrupted, so the
+    server is never drained between two steps. The first ``transient_s`` seconds of
+    every step are discarded, the steady state is measured on the requests which
+    finish during the rest of the step.
+    """
+
+    steps: List[float] = field(default_factory=lambda: [1, 2, 4, 8, 16, 32, 64, 128])
+    mode: str = "concurrency"
+    step_s: float = 60
+    transient_s: float = 15
+    input_len: Union[int, Distribution] = 1024
+    output_len: Union[int, Distribution] = 256
+    model: Optional[str] = None
+    seed: int = 0
+
+    def __post_init__(self):
+        assert self.mode in RAMP_MODES, f"{self.mode=} should be one of {RAMP_MODES}"
+        assert (
+            0 <= self.transient_s < self.step_s
+        ), f"{self.transient_s=} should be in [0, {self.step_s=})"
+
+    @property
+    def load_key(self):
+        # the load of every step in the record, not a field of the ramp
+        return "max_concurrency" if self.mode == "concurrency" else "request_rate"
+
+    def with_load(self, load) -> "RampWorkload":
+        raise ValueError(
+            f"A RampWorkload goes through all its steps {self.steps}, it has no "
+            f"single load to set to {load}: set its steps, or run it with ramp_bench"
+        )
+
+    async def arun(self, base_url: str) -> Dict:
+        model = self.model or get_model_name(base_url)
+        input_len = as_distribution(self.input_len)
+        output_len = as_distribution(self.output_len)
+        rng = np.random.default_rng(self.seed)
+
+        # (finish time, output) of every request
+        finished: List[Tuple[float, RequestOutput]] = []
+        level = 0
+        done = False
+        condition = asyncio.Condition()
+
+        async def send(session: aiohttp.ClientSession, rng: np.random.Generator):
+            prompt_len = input_len.sample_int(rng)
+            output = await request_chat_completion(
+                session,
+                base_url,
+                {
+                    "model": model,
+                    "messages": [
+                        {"role": "user", "content": make_prompt(prompt_len, rng)}
+                    ],
+                    "max_tokens": output_len.sample_int(rng),
+                    "ignore_eos": True,
+                },
+                prompt_len=prompt_len,
+            )
+            finished.append((time.perf_counter(), output))
+
+        async def worker(session: aiohttp.ClientSession, worker_id: int):
+            worker_rng = np.random.default_rng([self.seed, worker_id])
+            while True:
+                async with condition:
+                    await condition.wait_for(lambda: done or worker_id < level)
+                if done:
+                    return
+                await send(session, worker_rng)
+
+        async def set_level(new_level: int):
+            nonlocal level
+            async with condition:
+                level = new_level
+                condition.notify_all()
+
+        step_windows = []
+        async with aiohttp.ClientSession(timeout=AIOHTTP_TIMEOUT) as session:
+            if self.mode == "concurrency":
+                workers = [
+                    asyncio.create_task(worker(session, i))
+                    for i in range(int(max(self.steps)))
+                ]
+                for step in self.steps:
+                    step_start = time.perf_counter()
+                    await set_level(int(step))
+                    await asyncio.sleep(self.step_s)
+                    step_windows.append((step_start, time.perf_counter()))
+                done = True
+                await set_level(0)
+                await asyncio.gather(*workers)
+            else:
+                tasks = []
+                for step in self.steps:
+                    step_start = time.perf_counter()
+                    step_end = step_start + self.step_s
+                    # poisson arrivals
+                    while (now := time.perf_counter()) < step_end:
+                        tasks.append(asyncio.create_task(send(session, rng)))
+                        await asyncio.sleep(
+                            min(rng.exponential(1 / step), step_end - now)
+                        )
+                    step_windows.append((step_start, time.perf_counter()))
+                await asyncio.gather(*tasks)
+
+        results = []
+        for step, (step_start, step_end) in zip(self.steps, step_windows):
+            measure_start = step_start + self.transient_s
+            outputs = [
+                output
+                for finish, output in finished
+                if measure_start <= finish < step_end
+            ]
+            result = {
+                "backend": "native",
+                "dataset_name": "ramp",
+                self.load_key: step,
+                "step_s": self.step_s,
+                "transient_s": self.transient_s,
+                # time.perf_counter() bounds of the measured part of the step
+                "start_time": measure_start,
+                "end_time": step_end,
+            }
+            result.update(summarize(outputs, step_end - measure_start))
+            results.append(result)
+        return {"load_key": self.load_key, "steps": results}
@@ -0,0 +1,145 @@
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple, Union
+
+import aiohttp
+import numpy as np
+
+from ai_infra_bench.workload.base import (
+    RequestOutput,
+    Workload,
+    dispatch,
+    get_model_name,
+    make_prompt,
+    request_chat_completion,
+    summarize,
+)
+from ai_infra_bench.workload.buckets import (
+    DEFAULT_INPUT_BUCKETS,
+    DEFAULT_OUTPUT_BUCKETS,
+    summarize_buckets,
+)
+from ai_infra_bench.workload.distributions import (
+    Distribution,
+    as_distribution,
+    sample_lengths,
+)
+
+
+@dataclass
+class RandomWorkload(Workload):
+    """
+    Independent single-turn requests, the native counterpart of the random
+    dataset of ``bench_serving`` with heterogeneous lengths: ``input_len`` and
+    ``output_len`` can be any Distribution, e.g. a LogNormal for a heavy tail or
+    a Mixture of short chat and long RAG requests.
+
+    ``num_prompts`` requests (10 * max_concurrency by default) arrive as a Poisson
+    process at ``request_rate`` req/s, all at once with inf, with at most
+    ``max_concurrency`` of them in flight. Their lengths only depend on ``seed``,
+    so every load replays the same requests.
+
+    Besides the usual metrics, ``buckets`` breaks the latencies down per
+    (input, output) length bucket, split at ``input_buckets`` and ``output_buckets``.
+    """
+
+    max_concurrency: Optional[int] = None
+    request_rate: float = float("inf")
+    num_prompts: Optional[int] = None
+    input_len: Union[int, Distribution] = 1024
+    output_len: Union[int, Distribution] = 1024
+    input_buckets: List[int] = field(
+        default_factory=lambda: list(DEFAULT_INPUT_BUCKETS)
+    )
+    output_buckets: List[int] = field(
+        default_factory=lambda: list(DEFAULT_OUTPUT_BUCKETS)
+    )
+    model: Optional[str] = None
+    seed: int = 0
+
+    # the dataset_name of the record
+    dataset_name = "random"
+
+    def with_load(self, load) -> "RandomWorkload":
+        # like add_request_rate for bench_serving
+        return replace(self, max_concurrency=load, request_rate=load)
+
+    def prepare(self, base_url: str) -> Dict:
+        """
+        The state of one run, passed to the hooks below. The subclasses draw what
+        they add per request from their own generator, so that the lengths and
+        arrivals stay those of a RandomWorkload of the same seed.
+        """
+        num_prompts = self.num_prompts or 10 * (self.max_concurrency or 100)
+        input_len = as_distribution(self.input_len)
+        output_len = as_distribution(self.output_len)
+        rng = np.random.default_rng(self.seed)
+        return {
+            "base_url": base_url,
+            "model": self.model or get_model_name(base_url),
+            "num_prompts": num_prompts,
+            "lengths": [
+                sample_lengths(input_len, output_len, rng) for _ in range(num_prompts)
+            ],
+            "rng": rng,
+        }
+
+    def request_payload(
+        self, run: Dict, idx: int, prompt_len: int, max_tokens: int
+    ) -> Tuple[Dict, Dict]:
+        """The body of a request and the keyword arguments of request_chat_completion"""
+        prompt = make_prompt(prompt_len, np.random.default_rng([self.seed, idx]))
+        payload = {
+            "model": run["model"],
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "ignore_eos": True,
+        }
+        return payload, {"prompt_len": prompt_len}
+
+    async def send_request(
+        self, run: Dict, session: aiohttp.ClientSession, payload: Dict, **kwargs
+    ) -> RequestOutput:
+        return await request_chat_completion(
+            session, run["base_url"], payload, **kwargs
+        )
+
+    async def send_requests(self, run: Dict) -> Tuple[List[RequestOutput], float]:
+        """Send all the requests of the run, returns their outputs and the duration"""
+
+        async def send(session: aiohttp.ClientSession, idx: int) -> RequestOutput:
+            prompt_len, max_tokens = run["lengths"][idx]
+            payload, kwargs = self.request_payload(run, idx, prompt_len, max_tokens)
+            return await self.send_request(run, session, payload, **kwargs)
+
+        return await dispatch(
+            run["num_prompts"],
+            send,
+            self.max_concurrency,
+            self.request_rate,
+            run["rng"],
+        )
+
+    def extend_record(
+        self, run: Dict, result: Dict, outputs: List[RequestOutput], duration: float
+    ):
+        """Add the fields and metrics of a subclass to the record"""
+
+    async def arun(self, base_url: str) -> Dict:
+        run = self.prepare(base_url)
+        outputs, duration = await self.send_requests(run)
+        lengths = run["lengths"]
+        result = {
+            "backend": "native",
+            "dataset_name": self.dataset_name,
+            "request_rate": self.request_rate,
+            "max_concurrency": self.max_concurrency,
+            "num_prompts": run["num_prompts"],
+            "mean_input_len": float(np.mean([length[0] for length in lengths])),
+            "mean_output_len": float(np.mean([length[1] for length in lengths])),
+        }
+        result.update(summarize(outputs, duration))
+        result["buckets"] = summarize_buckets(
+            outputs, self.input_buckets, self.output_buckets
+        )
+        self.extend_record(run, result, outputs, duration)
+        return result
@@ -0,0 +1,175 @@
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+from ai_infra_bench.workload.base import make_prompt, request_chat_completion, summarize
+from ai_infra_bench.workload.random_dataset import RandomWorkload
+
+
+class RoutingPolicy:
+    """Picks the replica of every request, ``outstanding`` are the requests in flight per replica"""
+
+    def __init__(self, num_replicas: int, rng: np.random.Generator):
+        self.num_replicas = num_replicas
+        self.rng = rng
+
+    def pick(self, prompt: str, outstanding: List[int]) -> int:
+        raise NotImplementedError
+
+
+class RoundRobin(RoutingPolicy):
+    def __init__(self, num_replicas, rng):
+        super().__init__(num_replicas, rng)
+        self.next = 0
+
+    def pick(self, prompt, outstanding):
+        replica = self.next
+        self.next = (self.next + 1) % self.num_replicas
+        return replica
+
+
+class LeastOutstanding(RoutingPolicy):
+    def pick(self, prompt, outstanding):
+        least = min(outstanding)
+        # ties are broken at random, not always towards the first replica
+        return int(
+            self.rng.choice([i for i, n in enumerate(outstanding) if n == least])
+        )
+
+
+class PowerOfTwo(RoutingPolicy):
+    """The least loaded of two replicas drawn at random"""
+
+    def pick(self, prompt, outstanding):
+        if self.num_replicas == 1:
+            return 0
+        a, b = self.rng.choice(self.num_replicas, size=2, replace=False)
+        return int(a if outstanding[a] <= outstanding[b] else b)
+
+
+class PrefixHash(RoutingPolicy):
+    """The prompts sharing their first ``prefix_words`` words go to the same replica"""
+
+    def __init__(self, num_replicas, rng, prefix_words: int = 256):
+        super().__init__(num_replicas, rng)
+        self.prefix_words = prefix_words
+
+    def pick(self, prompt, outstanding):
+        prefix = " ".join(prompt.split()[: self.prefix_words])
+        return zlib.crc32(prefix.encode()) % self.num_replicas
+
+
+ROUTING_POLICIES = {
+    "round_robin": RoundRobin,
+    "least_outstanding": LeastOutstanding,
+    "power_of_two": PowerOfTwo,
+    "prefix_hash": PrefixHash,
+}
+
+
+def imbalance(values: List[float]) -> float:
+    """max / mean over the replicas, 1 when the load is perfectly spread"""
+    mean = float(np.mean(values)) if values else 0.0
+    return float(np.max(values)) / mean if mean > 0 else 0.0
+
+
+@dataclass
+class RoutedWorkload(RandomWorkload):
+    """
+    RandomWorkload fanned out by the client over the data-parallel replicas of
+    ``endpoints`` with the routing ``policy``, one of ROUTING_POLICIES.
+
+    Every prompt starts with one of ``num_prefixes`` shared prefixes (system
+    prompts, documents) of ``prefix_len`` tokens, so that a policy keeping the
+    requests of a prefix on the same replica can reuse its prefix cache. Besides
+    the usual metrics, the record holds the requests, tokens and p99 TTFT of every
+    replica, their imbalance (max / mean) and ``prefix_reuse_rate``, the fraction
+    of the requests sent to a replica which already served their prefix during
+    the point.
+    """
+
+    endpoints: List[str] = field(default_factory=list)
+    policy: str = "round_robin"
+    num_prefixes: int = 16
+    prefix_len: int = 512
+
+    dataset_name = "routed"
+
+    def __post_init__(self):
+        assert (
+            self.policy in ROUTING_POLICIES
+        ), f"{self.policy=} should be one of {list(ROUTING_POLICIES)}"
+
+    def _router(self, num_replicas: int, rng: np.random.Generator) -> RoutingPolicy:
+        if self.policy == "prefix_hash":
+            return PrefixHash(num_replicas, rng, prefix_words=self.prefix_len)
+        return ROUTING_POLICIES[self.policy](num_replicas, rng)
+
+    def prepare(self, base_url: str) -> Dict:
+        endpoints = self.endpoints or [base_url]
+        run = super().prepare(endpoints[0])
+        run["endpoints"] = endpoints
+        run["prefixes"] = [
+            make_prompt(self.prefix_len, np.random.default_rng([self.seed, 1, i]))
+            for i in range(self.num_prefixes)
+        ]
+        run["prefix_ids"] = np.random.default_rng([self.seed, 3, 0]).integers(
+            self.num_prefixes, size=run["num_prompts"]
+        )
+        run["router"] = self._router(
+            len(endpoints), np.random.default_rng([self.seed, 2, 0])
+        )
+        run["outstanding"] = [0] * len(endpoints)
+        run["served_prefixes"] = [set() for _ in endpoints]
+        run["replica_outputs"] = [[] for _ in endpoints]
+        run["prefix_reused"] = 0
+        return run
+
+    def request_payload(self, run, idx, prompt_len, max_tokens):
+        payload, kwargs = super().request_payload(run, idx, prompt_len, max_tokens)
+        prefix_idx = int(run["prefix_ids"][idx])
+        message = payload["messages"][0]
+        message["content"] = f"{run['prefixes'][prefix_idx]} {message['content']}"
+        kwargs["prompt_len"] = self.prefix_len + prompt_len
+        kwargs["tags"] = {"prefix": prefix_idx}
+        return payload, kwargs
+
+    async def send_request(self, run, session, payload, **kwargs):
+        # routed when it is actually sent, with the load of that time
+        outstanding = run["outstanding"]
+        prefix_idx = kwargs["tags"]["prefix"]
+        replica = run["router"].pick(payload["messages"][0]["content"], outstanding)
+        run["prefix_reused"] += prefix_idx in run["served_prefixes"][replica]
+        run["served_prefixes"][replica].add(prefix_idx)
+        outstanding[replica] += 1
+        try:
+            output = await request_chat_completion(
+                session, run["endpoints"][replica], payload, **kwargs
+            )
+        finally:
+            outstanding[replica] -= 1
+        run["replica_outputs"][replica].append(output)
+        return output
+
+    def extend_record(self, run, result, outputs, duration):
+        replica_outputs = run["replica_outputs"]
+        replica_requests = [len(o) for o in replica_outputs]
+        replica_tokens = [
+            sum(output.prompt_len + output.output_len for output in o if output.success)
+            for o in replica_outputs
+        ]
+        result.update(
+            policy=self.policy,
+            num_replicas=len(run["endpoints"]),
+            replica_requests=replica_requests,
+            replica_tokens=replica_tokens,
+            replica_p99_ttft_ms=[
+                summarize(o, duration)["p99_ttft_ms"] if o else 0.0
+                for o in replica_outputs
+            ],
+            request_imbalance=imbalance(replica_requests),
+            token_imbalance=imbalance(replica_tokens),
+            prefix_reuse_rate=run["prefix_reused"] / run["num_prompts"],
+        )
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+import aiohttp
+import numpy as np
+
+from ai_infra_bench.workload.base import (
+    AIOHTTP_TIMEOUT,
+    RequestOutput,
+    Workload,
+    get_model_name,
+    make_prompt,
+    request_chat_completion,
+    summarize,
+)
+from ai_infra_bench.workload.distributions import (
+    Distribution,
+    Exponential,
+    as_distribution,
+)
+
+
+@dataclass
+class SessionWorkload(Workload):
+    """
+    Multi-turn chat sessions.
+
+    Every session runs ``num_turns`` turns. Each turn appends a new user message to
+    the conversation, re-sends the whole history and appends the generated answer,
+    so the context grows turn by turn. Between two turns the simulated user thinks
+    for a duration sampled from ``think_time`` while still holding its session slot.
+
+    At most ``max_sessions`` sessions are active at the same time, a new session
+    starts as soon as another one finishes, until ``num_sessions`` sessions
+    (3 * max_sessions by default) are done.
+    """
+
+    max_sessions: int = 8
+    num_turns: int = 4
+    num_sessions: Optional[int] = None
+    turn_input_len: Union[int, Distribution] = 128
+    turn_output_len: Union[int, Distribution] = 128
+    think_time: Union[float, Distribution] = field(
+        default_factory=lambda: Exponential(2.0)
+    )
+    system_prompt_len: int = 0
+    model: Optional[str] = None
+    seed: int = 0
+
+    load_key = "max_sessions"
+
+    async def arun(self, base_url: str) -> Dict:
+        model = self.model or get_model_name(base_url)
+        num_sessions = self.num_sessions or 3 * self.max_sessions
+        input_len = as_distribution(self.turn_input_len)
+        output_len = as_distribution(self.turn_output_len)
+        think_time = as_distribution(self.think_time)
+
+        system_prompt = None
+        if self.system_prompt_len > 0:
+            system_prompt = make_prompt(
+                self.system_prompt_len, np.random.default_rng(self.seed)
+            )
+
+        semaphore = asyncio.Semaphore(self.max_sessions)
+        outputs: List[RequestOutput] = []
+
+        async def run_session(session: aiohttp.ClientSession, session_id: int):
+            # one generator per session keeps the workload reproducible
+            # whatever the order in which the sessions get scheduled
+            rng = np.random.default_rng([self.seed, session_id])
+            messages = []
+            if system_prompt is not None:
+                messages.append({"role": "system", "content": system_prompt})
+
+            async with semaphore:
+                for turn in range(self.num_turns):
+                    if turn > 0:
+                        await asyncio.sleep(think_time.sample(rng))
+
+                    prompt_len = input_len.sample_int(rng)
+                    messages.append(
+                        {"role": "user", "content": make_prompt(prompt_len, rng)}
+                    )
+                    output = await request_chat_completion(
+                        session,
+                        base_url,
+                        {
+                            "model": model,
+                            "messages": messages,
+                            "max_tokens": output_len.sample_int(rng),
+                            "ignore_eos": True,
+                        },
+                        prompt_len=prompt_len,
+                        tags={"session": session_id, "turn": turn},
+                    )
+                    outputs.append(output)
+                    if not output.success:
+                        # the rest of the conversation is meaningless without this turn
+                        break
+                    messages.append(
+                        {"role": "assistant", "content": output.generated_text}
+                    )
+
+        start_time = time.perf_counter()
+        async with aiohttp.ClientSession(timeout=AIOHTTP_TIMEOUT) as session:
+            await asyncio.gather(
+                *[run_session(session, i) for i in range(num_sessions)]
+            )
+        duration = time.perf_counter() - start_time
+
+        result = {
+            "backend": "native",
+            "dataset_name": "session",
+            "max_concurrency": self.max_sessions,
+            "max_sessions": self.max_sessions,
+            "num_sessions": num_sessions,
+            "num_turns": self.num_turns,
+            "mean_think_time_s": think_time.mean(),
+        }
+        result.update(summarize_sessions(outputs, duration, self.num_turns))
+        return result
+
+
+def summarize_sessions(
+    outputs: List[RequestOutput], duration: float, num_turns: int
+) -> Dict:
+    result = summarize(outputs, duration)
+    per_turn_mean_ttft, per_turn_p99_ttft, per_turn_input_len = [], [], []
+    for turn in range(num_turns):
+        turn_outputs = [
+            output
+            for output in outputs
+            if output.success and output.tags["turn"] == turn
+        ]
+        ttfts_ms = [output.ttft * 1000 for output in turn_outputs]
+        per_turn_mean_ttft.append(float(np.mean(ttfts_ms)) if ttfts_ms else 0.0)
+        per_turn_p99_ttft.append(
+            float(np.percentile(ttfts_ms, 99)) if ttfts_ms else 0.0
+        )
+        per_turn_input_len.append(
+            float(np.mean([output.prompt_len for output in turn_outputs]))
+            if turn_outputs
+            else 0.0
+        )
+    result["per_turn_mean_ttft_ms"] = per_turn_mean_ttft
+    result["per_turn_p99_ttft_ms"] = per_turn_p99_ttft
+    result["per_turn_mean_input_len"] = per_turn_input_len
+    return result
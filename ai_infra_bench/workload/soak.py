@@ -0,0 +1,253 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+import aiohttp
+import numpy as np
+import psutil
+
+from ai_infra_bench.analysis.drift import detect_drift
+from ai_infra_bench.workload.base import (
+    AIOHTTP_TIMEOUT,
+    Workload,
+    get_model_name,
+    make_prompt,
+    request_chat_completion,
+)
+from ai_infra_bench.workload.distributions import Distribution, as_distribution
+
+
+class RingBuffer:
+    """Fixed-capacity (timestamp, value) buffer, the oldest samples are overwritten"""
+
+    def __init__(self, capacity: int):
+        assert capacity > 0, f"{capacity=} should be positive"
+        self.times = np.zeros(capacity)
+        self.values = np.zeros(capacity)
+        self.capacity = capacity
+        self.size = 0
+        self.head = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, timestamp: float, value: float):
+        self.times[self.head] = timestamp
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def window(self, since: float, until: float = np.inf) -> np.ndarray:
+        """The values whose timestamp is in [since, until)"""
+        times, values = self.times[: self.size], self.values[: self.size]
+        return values[(times >= since) & (times < until)]
+
+    def window_times(self, since: float, until: float = np.inf) -> np.ndarray:
+        times = self.times[: self.size]
+        return times[(times >= since) & (times < until)]
+
+
+def process_tree_rss_mb(pid: int) -> float:
+    """Resident memory of the process and all its children, in MB"""
+    try:
+        process = psutil.Process(pid)
+        processes = [process] + process.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return 0.0
+    rss = 0
+    for p in processes:
+        try:
+            rss += p.memory_info().rss
+        except psutil.NoSuchProcess:
+            continue
+    return rss / 2**20
+
+
+def _percentile(values: np.ndarray, p: float) -> float:
+    return float(np.percentile(values, p)) if values.size else 0.0
+
+
+@dataclass
+class SoakWorkload(Workload):
+    """
+    Constant closed-loop load held for ``duration_s`` seconds of wall-clock time.
+
+    Every ``interval_s`` seconds the TTFT / TPOT percentiles, the throughput and the
+    RSS of the server (``server_pid``, set by soak_bench) over the last ``window_s``
+    seconds are appended to a time-series. The samples are kept in ring buffers of
+    ``buffer_size`` entries, so the memory does not grow with the duration,
+    ``buffer_size`` must exceed the number of requests finished within a window.
+    At the end the first and the last windows are compared to detect drifts.
+    """
+
+    max_concurrency: int = 8
+    input_len: Union[int, Distribution] = 1024
+    output_len: Union[int, Distribution] = 256
+    duration_s: float = 3600
+    window_s: float = 60
+    interval_s: Optional[float] = None
+    buffer_size: int = 100_000
+    server_pid: Optional[int] = None
+    alpha: float = 0.01
+    min_change: float = 0.05
+    model: Optional[str] = None
+    seed: int = 0
+
+    def __post_init__(self):
+        assert (
+            self.window_s <= self.duration_s / 2
+        ), f"{self.window_s=} should be at most half of {self.duration_s=}, otherwise the first and last windows overlap"
+
+    async def arun(self, base_url: str) -> Dict:
+        model = self.model or get_model_name(base_url)
+        input_len = as_distribution(self.input_len)
+        output_len = as_distribution(self.output_len)
+        interval_s = self.interval_s or self.window_s
+
+        buffers = {
+            name: RingBuffer(self.buffer_size)
+            for name in ("ttft_ms", "tpot_ms", "output_tokens", "errors", "rss_mb")
+        }
+        totals = dict(completed=0, errored=0, input_tokens=0, output_tokens=0)
+        sums = dict(ttft_ms=0.0, tpot_ms=0.0, num_tpot=0)
+        timeseries: List[Dict] = []
+        first_window: Dict[str, np.ndarray] = {}
+
+        start_time = time.perf_counter()
+        deadline = start_time + self.duration_s
+
+        def window_samples(since: float, until: float) -> Dict[str, np.ndarray]:
+            samples = {
+                name: buffers[name].window(since, until)
+                for name in ("ttft_ms", "tpot_ms", "rss_mb")
+            }
+            # the throughput is sampled as the output tokens finished every second
+            bins = np.arange(since, until + 1e-9, 1.0)
+            if len(bins) < 2:
+                bins = np.array([since, until])
+            tokens, _ = np.histogram(
+                buffers["output_tokens"].window_times(since, until),
+                bins=bins,
+                weights=buffers["output_tokens"].window(since, until),
+            )
+            samples["output_throughput"] = tokens / np.diff(bins)
+            return samples
+
+        def snapshot(now: float):
+            since = max(start_time, now - self.window_s)
+            samples = window_samples(since, now)
+            completed = samples["ttft_ms"].size
+            span = max(now - since, 1e-9)
+            timeseries.append(
+                {
+                    "elapsed_s": now - start_time,
+                    "window_s": span,
+                    "completed": completed,
+                    "errored": int(buffers["errors"].window(since, now).sum()),
+                    "request_throughput": completed / span,
+                    "output_throughput": float(
+                        buffers["output_tokens"].window(since, now).sum() / span
+                    ),
+                    "median_ttft_ms": _percentile(samples["ttft_ms"], 50),
+                    "p99_ttft_ms": _percentile(samples["ttft_ms"], 99),
+                    "median_tpot_ms": _percentile(samples["tpot_ms"], 50),
+                    "p99_tpot_ms": _percentile(samples["tpot_ms"], 99),
+                    "rss_mb": _percentile(samples["rss_mb"], 50),
+                }
+            )
+
+        def keep_first_window():
+            # the samples of [start, start + window_s), taken as soon as it ends,
+            # whatever interval_s, before the ring buffers overwrite them
+            first_window.update(window_samples(start_time, start_time + self.window_s))
+
+        async def sampler():
+            next_snapshot = start_time + interval_s
+            while True:
+                now = time.perf_counter()
+                if self.server_pid is not None:
+                    buffers["rss_mb"].append(now, process_tree_rss_mb(self.server_pid))
+                if not first_window and now - start_time >= self.window_s:
+                    keep_first_window()
+                if now >= next_snapshot:
+                    snapshot(now)
+                    next_snapshot += interval_s
+                await asyncio.sleep(1.0)
+
+        async def worker(session: aiohttp.ClientSession, worker_id: int):
+            rng = np.random.default_rng([self.seed, worker_id])
+            while time.perf_counter() < deadline:
+                prompt_len = input_len.sample_int(rng)
+                output = await request_chat_completion(
+                    session,
+                    base_url,
+                    {
+                        "model": model,
+                        "messages": [
+                            {"role": "user", "content": make_prompt(prompt_len, rng)}
+                        ],
+                        "max_tokens": output_len.sample_int(rng),
+                        "ignore_eos": True,
+                    },
+                    prompt_len=prompt_len,
+                )
+                now = time.perf_counter()
+                buffers["errors"].append(now, 0.0 if output.success else 1.0)
+                if not output.success:
+                    totals["errored"] += 1
+                    continue
+                totals["completed"] += 1
+                totals["input_tokens"] += output.prompt_len
+                totals["output_tokens"] += output.output_len
+                buffers["ttft_ms"].append(now, output.ttft * 1000)
+                buffers["output_tokens"].append(now, output.output_len)
+                sums["ttft_ms"] += output.ttft * 1000
+                if output.output_len > 1:
+                    buffers["tpot_ms"].append(now, output.tpot * 1000)
+                    sums["tpot_ms"] += output.tpot * 1000
+                    sums["num_tpot"] += 1
+
+        async with aiohttp.ClientSession(timeout=AIOHTTP_TIMEOUT) as session:
+            sampler_task = asyncio.create_task(sampler())
+            await asyncio.gather(
+                *[worker(session, i) for i in range(self.max_concurrency)]
+            )
+            sampler_task.cancel()
+        end_time = time.perf_counter()
+        duration = end_time - start_time
+        if not first_window:
+            keep_first_window()
+        if not timeseries or duration - timeseries[-1]["elapsed_s"] >= 1.0:
+            snapshot(end_time)
+
+        last_window = window_samples(end_time - self.window_s, end_time)
+        drift = {
+            metric: detect_drift(
+                first_window.get(metric, []),
+                last_window[metric],
+                alpha=self.alpha,
+                min_change=self.min_change,
+            )
+            for metric in last_window
+            if metric != "rss_mb" or self.server_pid is not None
+        }
+
+        return {
+            "backend": "native",
+            "dataset_name": "soak",
+            "max_concurrency": self.max_concurrency,
+            "duration": duration,
+            "completed": totals["completed"],
+            "errored": totals["errored"],
+            "total_input_tokens": totals["input_tokens"],
+            "total_output_tokens": totals["output_tokens"],
+            "request_throughput": totals["completed"] / duration,
+            "input_throughput": totals["input_tokens"] / duration,
+            "output_throughput": totals["output_tokens"] / duration,
+            "mean_ttft_ms": sums["ttft_ms"] / max(totals["completed"], 1),
+            "mean_tpot_ms": sums["tpot_ms"] / max(sums["num_tpot"], 1),
+            "timeseries": timeseries,
+            "drift": drift,
+            "drifted": [metric for metric, item in drift.items() if item["drifted"]],
+        }
@@ -0,0 +1,246 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ai_infra_bench.workload.base import WORDS, summarize_group
+from ai_infra_bench.workload.random_dataset import RandomWorkload
+
+CONSTRAINTS = ["json_schema", "regex"]
+# where the regex is sent: SGLang takes it in regex, vLLM in guided_regex
+REGEX_FIELDS = ["regex", "guided_regex"]
+FIELD_TYPES = ["string", "integer", "enum", "array", "boolean"]
+NUM_CHOICES = 8
+
+
+def make_json_schema(num_fields: int, depth: int = 1, seed: int = 0) -> Dict:
+    """
+    An object of num_fields required fields cycling through FIELD_TYPES, every
+    num_fields-th one being a nested object of the same shape while depth > 1.
+    The field names and choices only depend on seed.
+    """
+    rng = np.random.default_rng([seed, 5])
+    properties = {}
+    for idx in range(num_fields):
+        name = f"{rng.choice(WORDS)}_{idx}"
+        if depth > 1 and idx == num_fields - 1:
+            properties[name] = make_json_schema(num_fields, depth - 1, seed + 1)
+            continue
+        kind = FIELD_TYPES[idx % len(FIELD_TYPES)]
+        if kind == "string":
+            properties[name] = {"type": "string", "maxLength": 32}
+        elif kind == "integer":
+            properties[name] = {"type": "integer", "minimum": 0, "maximum": 10000}
+        elif kind == "enum":
+            properties[name] = {
+                "type": "string",
+                "enum": [
+                    str(word) for word in rng.choice(WORDS, NUM_CHOICES, replace=False)
+                ],
+            }
+        elif kind == "array":
+            properties[name] = {
+                "type": "array",
+                "items": {"type": "string", "maxLength": 16},
+                "maxItems": 4,
+            }
+        else:
+            properties[name] = {"type": "boolean"}
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+def make_regex(num_fields: int, seed: int = 0) -> str:
+    """num_fields "key: choice" pairs separated by ", ", each of NUM_CHOICES words"""
+    rng = np.random.default_rng([seed, 6])
+    fields = []
+    for idx in range(num_fields):
+        choices = "|".join(
+            str(word) for word in rng.choice(WORDS, NUM_CHOICES, replace=False)
+        )
+        fields.append(f"{rng.choice(WORDS)}_{idx}: ({choices})")
+    return ", ".join(fields)
+
+
+def matches_schema(value, schema: Dict) -> bool:
+    """Whether value is an instance of schema, for the keywords of make_json_schema"""
+    if "enum" in schema:
+        return value in schema["enum"]
+    kind = schema.get("type")
+    if kind == "object":
+        properties = schema.get("properties", {})
+        return (
+            isinstance(value, dict)
+            and all(key in value for key in schema.get("required", []))
+            and (
+                schema.get("additionalProperties", True)
+                or all(key in properties for key in value)
+            )
+            and all(
+                matches_schema(value[key], properties[key])
+                for key in value
+                if key in properties
+            )
+        )
+    if kind == "array":
+        return (
+            isinstance(value, list)
+            and len(value) <= schema.get("maxItems", len(value))
+            and all(matches_schema(item, schema.get("items", {})) for item in value)
+        )
+    if kind == "string":
+        return isinstance(value, str) and len(value) <= schema.get(
+            "maxLength", len(value)
+        )
+    if kind == "integer":
+        return (
+            isinstance(value, int)
+            and not isinstance(value, bool)
+            and schema.get("minimum", value) <= value <= schema.get("maximum", value)
+        )
+    if kind == "boolean":
+        return isinstance(value, bool)
+    return True
+
+
+def is_valid(text: str, constraint: str, spec) -> bool:
+    """Whether the generated text follows the schema or the regex spec"""
+    if constraint == "regex":
+        return re.fullmatch(spec, text) is not None
+    try:
+        return matches_schema(json.loads(text), spec)
+    except json.JSONDecodeError:
+        return False
+
+
+@dataclass
+class StructuredWorkload(RandomWorkload):
+    """
+    RandomWorkload with a ``constrained_ratio`` of its requests under a grammar:
+    a JSON schema sent as ``response_format`` (``constraint="json_schema"``) or a
+    regex (``constraint="regex"``) sent in ``regex_field``, "regex" for SGLang or
+    "guided_regex" for vLLM.
+
+    The grammars have ``complexity`` fields (``make_json_schema``, nested down to
+    ``depth``, and ``make_regex``), or are given as ``schema`` / ``regex``.
+    ``num_schemas`` distinct grammars of the same shape are cycled through, to
+    exercise the grammar cache of the server. The constrained requests stop when
+    their grammar is complete, ``output_len`` only bounds them and should leave
+    room for it, the others ignore the EOS as in RandomWorkload. Which requests
+    are constrained only depends on ``seed``.
+
+    Besides the usual metrics, the record holds the ``summarize_group`` of the
+    constrained and unconstrained requests (``constrained_mean_tpot_ms``, ``unconstrained_mean_tpot_ms``...),
+    ``constrained_valid_rate``, the share of the completed constrained requests
+    whose output follows its grammar, and ``constrained_tpot_overhead``, the
+    relative increase of the mean TPOT under a grammar. Both are None when no
+    request of a group completed, e.g. at a ratio of 0 or 1.
+    """
+
+    constraint: str = "json_schema"
+    constrained_ratio: float = 0.5
+    complexity: int = 4
+    depth: int = 1
+    num_schemas: int = 1
+    schema: Optional[Dict] = None
+    regex: Optional[str] = None
+    regex_field: str = "regex"
+
+    dataset_name = "structured"
+
+    def __post_init__(self):
+        assert (
+            self.constraint in CONSTRAINTS
+        ), f"{self.constraint=} should be one of {CONSTRAINTS}"
+        assert (
+            self.regex_field in REGEX_FIELDS
+        ), f"{self.regex_field=} should be one of {REGEX_FIELDS}"
+        assert (
+            0 <= self.constrained_ratio <= 1
+        ), f"{self.constrained_ratio=} should be between 0 and 1"
+        assert self.num_schemas >= 1, f"{self.num_schemas=} should be at least 1"
+
+    def grammars(self) -> List:
+        """The schemas or regexes the constrained requests cycle through"""
+        if self.constraint == "json_schema":
+            if self.schema is not None:
+                return [self.schema]
+            return [
+                make_json_schema(self.complexity, self.depth, seed=self.seed + i)
+                for i in range(self.num_schemas)
+            ]
+        if self.regex is not None:
+            return [self.regex]
+        return [
+            make_regex(self.complexity, seed=self.seed + i)
+            for i in range(self.num_schemas)
+        ]
+
+    def constraint_body(self, grammar, idx: int) -> Dict:
+        if self.constraint == "json_schema":
+            return {
+                "response_format": {
+                    "type": "json_schema",
+                    "json_schema": {"name": f"schema_{idx}", "schema": grammar},
+                }
+            }
+        return {self.regex_field: grammar}
+
+    def prepare(self, base_url: str) -> Dict:
+        run = super().prepare(base_url)
+        run["constrained"] = (
+            np.random.default_rng([self.seed, 4, 0]).random(run["num_prompts"])
+            < self.constrained_ratio
+        )
+        run["grammars"] = self.grammars()
+        return run
+
+    def request_payload(self, run, idx, prompt_len, max_tokens):
+        payload, kwargs = super().request_payload(run, idx, prompt_len, max_tokens)
+        is_constrained = bool(run["constrained"][idx])
+        grammar_idx = idx % len(run["grammars"])
+        if is_constrained:
+            del payload["ignore_eos"]
+            payload.update(
+                self.constraint_body(run["grammars"][grammar_idx], grammar_idx)
+            )
+        kwargs["tags"] = {"constrained": is_constrained, "grammar": grammar_idx}
+        return payload, kwargs
+
+    def extend_record(self, run, result, outputs, duration):
+        grammars = run["grammars"]
+        result.update(
+            constraint=self.constraint,
+            constrained_ratio=self.constrained_ratio,
+            complexity=self.complexity,
+            num_schemas=len(grammars),
+        )
+        for name, in_group in (("constrained", True), ("unconstrained", False)):
+            group = summarize_group(
+                [o for o in outputs if o.tags["constrained"] == in_group], duration
+            )
+            result.update({f"{name}_{key}": value for key, value in group.items()})
+        completed = [o for o in outputs if o.tags["constrained"] and o.success]
+        result["constrained_valid_rate"] = (
+            sum(
+                is_valid(o.generated_text, self.constraint, grammars[o.tags["grammar"]])
+                for o in completed
+            )
+            / len(completed)
+            if completed
+            else None
+        )
+        # None as well when either group is empty, e.g. at a ratio of 0 or 1
+        result["constrained_tpot_overhead"] = (
+            result["constrained_mean_tpot_ms"] / result["unconstrained_mean_tpot_ms"]
+            - 1
+            if result["constrained_mean_tpot_ms"]
+            and result["unconstrained_mean_tpot_ms"]
+            else None
+        )
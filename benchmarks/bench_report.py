@@ -0,0 +1,395 @@
+"""
+Time and memory-profile the exporters and aggregation paths of the reports on
+synthetic sweeps, and compare them with the tracked baselines.
+
+    python benchmarks/bench_report.py
+    python benchmarks/bench_report.py --sizes 10 1000 --cases cmp build_report
+    python benchmarks/bench_report.py --update-baseline
+
+A case is a regression when it is slower than its baseline by more than
+--time-tolerance (and --min-time-delta seconds), when its peak memory grows by
+more than --memory-tolerance (and --min-memory-delta MiB), or when it raises.
+The exit code is 1 if any case regressed, and 2 if no case could be compared
+with the baseline, unless --allow-no-baseline. The baseline timings are scaled
+by the speed of the machine, measured by a reference case run in the same
+process as the baseline. With a baseline recorded by another python major.minor
+version, only the peak memory is compared.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from synthetic import INPUT_FEATURES, METRICS, Sweep, make_sweep, write_sweep
+
+from ai_infra_bench.client import export_csv, export_table, plot
+from ai_infra_bench.report import build_report, export_full_csv, save_report_config
+from ai_infra_bench.sgl.cmp_bench import cmp_export_table, cmp_plot
+from ai_infra_bench.sgl.general_bench import general_export_table, general_plot
+from ai_infra_bench.utils import avg_std_strf, load_label_results, sort_data_by_key
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+
+def _report_dir(sweep: Sweep, output_dir: str, mode: str) -> str:
+    """The result files of the sweep for a report of mode, written once"""
+    report_dir = os.path.join(output_dir, f"{mode}_results")
+    if not os.path.exists(report_dir):
+        os.makedirs(report_dir)
+        write_sweep(sweep, report_dir)
+        save_report_config(
+            report_dir,
+            mode=mode,
+            labels=sweep.labels,
+            input_features=INPUT_FEATURES,
+            metrics=METRICS,
+        )
+    return report_dir
+
+
+def _build_report(mode: str) -> Callable[[Sweep, str], None]:
+    def case(sweep: Sweep, output_dir: str):
+        build_report(_report_dir(sweep, output_dir, mode), force=True)
+
+    return case
+
+
+# every case runs on a sweep and writes to a scratch directory
+CASES: Dict[str, Callable[[Sweep, str], None]] = {
+    "sort_data_by_key": lambda sweep, output_dir: sort_data_by_key(
+        "max_concurrency", sweep.repeated
+    ),
+    "avg_std_strf": lambda sweep, output_dir: [
+        avg_std_strf(metric, item_list, precision=2)
+        for item_list in sweep.repeated
+        for metric in METRICS
+    ],
+    "client.export_table": lambda sweep, output_dir: export_table(
+        sweep.repeated, INPUT_FEATURES, METRICS, sweep.labels[0], output_dir
+    ),
+    "client.export_csv": lambda sweep, output_dir: export_csv(
+        sweep.repeated, output_dir
+    ),
+    "client.plot": lambda sweep, output_dir: plot(
+        sweep.repeated, INPUT_FEATURES, METRICS, sweep.labels[0], output_dir
+    ),
+    "general_export_table": lambda sweep, output_dir: general_export_table(
+        sweep.per_label, INPUT_FEATURES, METRICS, sweep.labels, output_dir
+    ),
+    "general_plot": lambda sweep, output_dir: general_plot(
+        sweep.per_label, INPUT_FEATURES, METRICS, sweep.labels, output_dir
+    ),
+    "cmp_export_table": lambda sweep, output_dir: cmp_export_table(
+        sweep.per_label, INPUT_FEATURES, METRICS, sweep.labels, output_dir
+    ),
+    "cmp_plot": lambda sweep, output_dir: cmp_plot(
+        sweep.per_label, INPUT_FEATURES, METRICS, sweep.labels, output_dir
+    ),
+    "export_full_csv": lambda sweep, output_dir: export_full_csv(
+        sweep.per_label, sweep.labels, output_dir
+    ),
+    "load_label_results": lambda sweep, output_dir: [
+        load_label_results(_report_dir(sweep, output_dir, "general"), label)
+        for label in sweep.labels
+    ],
+    "build_report.general": _build_report("general"),
+    "build_report.cmp": _build_report("cmp"),
+}
+
+
+def measure(
+    case: Callable[[Sweep, str], None], sweep: Sweep, output_dir: str, rounds: int
+) -> Dict:
+    """The best time of rounds runs, then the peak memory of one more run"""
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        case(sweep, output_dir)
+        times.append(time.perf_counter() - start)
+    # apart, tracemalloc slows the run down
+    tracemalloc.start()
+    try:
+        case(sweep, output_dir)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"time_s": min(times), "peak_mib": peak / 2**20}
+
+
+def run_cases(
+    cases: List[str], sizes: List[int], repeats: int, num_labels: int, rounds: int
+) -> Dict[str, Dict]:
+    results = {}
+    for size in sizes:
+        sweep = make_sweep(size, repeats=repeats, num_labels=num_labels)
+        with tempfile.TemporaryDirectory() as output_dir:
+            # the result files read by the report cases are not measured
+            for mode in ("general", "cmp"):
+                _report_dir(sweep, output_dir, mode)
+            for name in cases:
+                key = f"{name}/{size}"
+                print(f"Running {key}", end="", flush=True)
+                try:
+                    # the exporters print their progress and numpy warns on
+                    # single repeats, neither is measured
+                    with (
+                        contextlib.redirect_stdout(io.StringIO()),
+                        warnings.catch_warnings(),
+                    ):
+                        warnings.simplefilter("ignore")
+                        results[key] = measure(CASES[name], sweep, output_dir, rounds)
+                    print(
+                        f" {results[key]['time_s']:.4f}s "
+                        f"{results[key]['peak_mib']:.2f}MiB"
+                    )
+                except Exception as e:
+                    results[key] = {"error": f"{type(e).__name__}: {e}"}
+                    print(f" \033[91m{results[key]['error']}\033[0m")
+    return results
+
+
+def machine_desc() -> str:
+    """The architecture and CPU model, which the timings depend on"""
+    cpu = platform.processor()
+    with contextlib.suppress(OSError):
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu = line.split(":", 1)[1]
+                    break
+    return f"{platform.machine()} {' '.join(cpu.split())}".strip()
+
+
+def reference_case():
+    """Python and numpy work of the size of a report, the speed of the machine"""
+    rng = np.random.default_rng(0)
+    rows = [
+        {f"key_{i}": float(value) for i, value in enumerate(rng.random(8))}
+        for _ in range(20000)
+    ]
+    json.dumps(sorted(rows, key=lambda row: row["key_0"]))
+    np.percentile(rng.random(1_000_000), [50, 90, 99])
+
+
+def python_version(baseline_file: Optional[Dict] = None) -> str:
+    """The major.minor python version of a baseline, or of this interpreter"""
+    version = (
+        platform.python_version()
+        if baseline_file is None
+        else baseline_file.get("python", "")
+    )
+    return ".".join(version.split(".")[:2])
+
+
+def reference_time(rounds: int = 5) -> float:
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        reference_case()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def compare(
+    results: Dict[str, Dict],
+    baseline: Dict[str, Dict],
+    *,
+    time_scale: Optional[float] = 1.0,
+    time_tolerance: float,
+    memory_tolerance: float,
+    min_time_delta: float,
+    min_memory_delta: float,
+) -> Dict[str, str]:
+    """
+    {case: why it regressed}, the baseline timings multiplied by time_scale, or
+    not compared with None
+    """
+    regressions = {}
+    for key, result in results.items():
+        if "error" in result:
+            regressions[key] = result["error"]
+            continue
+        base = baseline.get(key)
+        if base is None or "error" in base:
+            continue
+        reasons = []
+        base_time = base["time_s"] * (time_scale or 1.0)
+        if (
+            time_scale is not None
+            and result["time_s"] > base_time * time_tolerance
+            and result["time_s"] - base_time > min_time_delta
+        ):
+            reasons.append(f"time {result['time_s'] / base_time:.2f}x")
+        if (
+            result["peak_mib"] > base["peak_mib"] * memory_tolerance
+            and result["peak_mib"] - base["peak_mib"] > min_memory_delta
+        ):
+            reasons.append(f"memory {result['peak_mib'] / base['peak_mib']:.2f}x")
+        if reasons:
+            regressions[key] = ", ".join(reasons)
+    return regressions
+
+
+def results_table_md(
+    results: Dict[str, Dict], baseline: Dict[str, Dict], regressions: Dict[str, str]
+) -> str:
+    md_str = (
+        "| case | points | time (s) | baseline time (s) | peak (MiB) "
+        "| baseline peak (MiB) | status |\n"
+    )
+    md_str += "| --- " * 7 + "|\n"
+    for key, result in results.items():
+        name, size = key.rsplit("/", 1)
+        base = baseline.get(key, {})
+        if "error" in result:
+            md_str += f"| {name} | {size} | - | - | - | - | **{result['error']}** |\n"
+            continue
+        base_time = f"{base['time_s']:.4f}" if "time_s" in base else "-"
+        base_peak = f"{base['peak_mib']:.2f}" if "peak_mib" in base else "-"
+        status = f"**{regressions[key]}**" if key in regressions else "ok"
+        md_str += (
+            f"| {name} | {size} | {result['time_s']:.4f} | {base_time} "
+            f"| {result['peak_mib']:.2f} | {base_peak} | {status} |\n"
+        )
+    return md_str
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="the records of every point"
+    )
+    parser.add_argument("--labels", type=int, default=2, help="the servers compared")
+    parser.add_argument("--rounds", type=int, default=3, help="the best one is kept")
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        default=None,
+        help="the cases starting with one of them, all by default",
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="record the results as the baseline of their cases",
+    )
+    parser.add_argument(
+        "--allow-no-baseline",
+        action="store_true",
+        help="exit 0 when no case could be compared with the baseline",
+    )
+    parser.add_argument("--output", default=None, help="write the results as json")
+    parser.add_argument("--time-tolerance", type=float, default=1.5)
+    parser.add_argument("--memory-tolerance", type=float, default=1.25)
+    parser.add_argument("--min-time-delta", type=float, default=0.05)
+    parser.add_argument("--min-memory-delta", type=float, default=1.0)
+    args = parser.parse_args()
+
+    cases = [
+        name
+        for name in CASES
+        if args.cases is None or any(name.startswith(c) for c in args.cases)
+    ]
+    assert cases, f"No case matches {args.cases}, known: {list(CASES)}"
+    config = {"repeats": args.repeats, "labels": args.labels}
+
+    results = run_cases(cases, args.sizes, args.repeats, args.labels, args.rounds)
+
+    baseline_file = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline_file = json.load(f)
+    baseline = baseline_file.get("results", {})
+    if baseline_file and baseline_file.get("config") != config:
+        print(
+            f"\033[93m The baseline was recorded with {baseline_file.get('config')}, "
+            f"not {config}, it is not compared \033[0m"
+        )
+        baseline = {}
+    # the peak memory does not depend on the machine, the timings do
+    reference_s = reference_time()
+    time_scale = 1.0
+    if baseline and python_version(baseline_file) != python_version():
+        print(
+            f"\033[93m The baseline was recorded with python "
+            f"{baseline_file.get('python')}, not {platform.python_version()}, "
+            f"only the peak memory is compared \033[0m"
+        )
+        time_scale = None
+    elif baseline and "reference_s" in baseline_file:
+        time_scale = reference_s / baseline_file["reference_s"]
+        print(
+            f"The reference case takes {reference_s:.4f}s, "
+            f"{time_scale:.2f}x the baseline on {baseline_file.get('machine')}, "
+            "the baseline timings are scaled by it"
+        )
+    elif baseline and baseline_file.get("machine") != machine_desc():
+        print(
+            f"\033[93m The baseline was recorded on {baseline_file.get('machine')}, "
+            f"not {machine_desc()}, only the peak memory is compared \033[0m"
+        )
+        time_scale = None
+
+    regressions = compare(
+        results,
+        baseline,
+        time_scale=time_scale,
+        time_tolerance=args.time_tolerance,
+        memory_tolerance=args.memory_tolerance,
+        min_time_delta=args.min_time_delta,
+        min_memory_delta=args.min_memory_delta,
+    )
+    print(results_table_md(results, baseline, regressions))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+
+    if args.update_baseline:
+        print(f"Writing baseline to {args.baseline}")
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "config": config,
+                    "machine": machine_desc(),
+                    "python": platform.python_version(),
+                    "reference_s": reference_s,
+                    # the cases not run keep their baseline
+                    "results": {**baseline, **results},
+                },
+                f,
+                indent=2,
+            )
+        print("Writing baseline DONE")
+        return
+
+    if regressions:
+        print(f"\033[91m {len(regressions)} case(s) regressed \033[0m")
+        sys.exit(1)
+    compared = [
+        key for key in results if key in baseline and "error" not in baseline[key]
+    ]
+    if not compared and not args.allow_no_baseline:
+        print(
+            f"\033[91m No case has a baseline in {args.baseline} to compare with, "
+            "record one with --update-baseline \033[0m"
+        )
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Synthetic bench_serving results, to feed the exporters sweeps of any size
+without a server.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+from ai_infra_bench.utils import dummy_get_filename
+
+INPUT_FEATURES = ["request_rate", "max_concurrency"]
+METRICS = [
+    "p99_ttft_ms",
+    "p99_tpot_ms",
+    "p99_itl_ms",
+    "output_throughput",
+    "request_throughput",
+]
+LATENCIES = ["ttft", "tpot", "itl", "e2e_latency"]
+
+
+def make_record(load: float, rng: np.random.Generator, scale: float = 1.0) -> Dict:
+    """One point of a bench_serving sweep at load, the latencies growing with it"""
+    completed = int(load * 10)
+    record = {
+        "backend": "sglang",
+        "dataset_name": "random",
+        "request_rate": float(load),
+        "max_concurrency": int(load),
+        "num_prompts": completed,
+        "duration": completed / load * rng.uniform(0.9, 1.1),
+        "completed": completed,
+        "total_input_tokens": completed * 1024,
+        "total_output_tokens": completed * 512,
+        "request_throughput": load * rng.uniform(0.9, 1.0),
+        "input_throughput": 1024 * load * rng.uniform(0.9, 1.0),
+        "output_throughput": 512 * load * scale * rng.uniform(0.9, 1.0),
+    }
+    for name, base in zip(LATENCIES, (50.0, 20.0, 20.0, 10000.0)):
+        for stat, factor in (("mean", 1.0), ("median", 0.9), ("std", 0.2)):
+            value = base * factor * (1 + load / 64) * rng.uniform(0.9, 1.1) / scale
+            record[f"{stat}_{name}_ms"] = value
+        record[f"p99_{name}_ms"] = record[f"mean_{name}_ms"] * rng.uniform(1.5, 3)
+    record["concurrency"] = load * rng.uniform(0.8, 1.0)
+    return record
+
+
+@dataclass
+class Sweep:
+    """
+    The same points in the two shapes of the exporters:
+
+    - ``repeated``: one list of ``repeats`` records per point, for the
+      ai_infra_bench.client exporters.
+    - ``per_label``: one list of points per label, for the ai_infra_bench.sgl
+      exporters and the report.
+    """
+
+    labels: List[str]
+    repeated: List[List[Dict]]
+    per_label: List[List[Dict]]
+
+
+def make_sweep(
+    num_points: int, repeats: int = 3, num_labels: int = 2, seed: int = 0
+) -> Sweep:
+    """num_points loads, measured repeats times and for num_labels servers"""
+    rng = np.random.default_rng(seed)
+    loads = np.linspace(1, max(2, num_points), num_points)
+    # the points are not sorted, as after a binary search of slo_bench
+    rng.shuffle(loads)
+    labels = [f"server{i}" for i in range(num_labels)]
+    return Sweep(
+        labels=labels,
+        repeated=[[make_record(load, rng) for _ in range(repeats)] for load in loads],
+        per_label=[
+            [make_record(load, rng, scale=1 + 0.1 * i) for load in loads]
+            for i in range(num_labels)
+        ],
+    )
+
+
+def write_sweep(sweep: Sweep, output_dir: str):
+    """The result files of a bench run, as the benches write them"""
+    for label, points in zip(sweep.labels, sweep.per_label):
+        for client_idx, record in enumerate(points):
+            filepath = os.path.join(output_dir, dummy_get_filename(client_idx, label))
+            with open(filepath, "w", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
@@ -0,0 +1,62 @@
+import os
+from dataclasses import replace
+from typing import List
+
+from ai_infra_bench.sgl import cmp_bench
+from ai_infra_bench.workload import CancellationWorkload, LogNormal
+
+host = "127.0.0.1"
+port = "8888"
+tp_size = 1
+qwen3_8b_model_path = os.environ["QWEN38B"]
+
+
+####################################
+# Constructing server_cmds & labels
+####################################
+# the same model on both engines, or on two versions of one, to compare how
+# they abort the requests whose client went away
+server_cmds: List[str] = [
+    f"python -m sglang.launch_server --model-path {qwen3_8b_model_path} --tp-size {tp_size} --host {host} --port {port}",
+    f"vllm serve {qwen3_8b_model_path} --tensor-parallel-size {tp_size} --host {host} --port {port}",
+]
+labels = ["Qwen3-8B-TP1-SGLang", "Qwen3-8B-TP1-vLLM"]
+
+##########################
+# Constructing client_cmds
+##########################
+# chat traffic near saturation, the cancelled requests go away anywhere from
+# the queue to the end of their output
+workload = CancellationWorkload(
+    input_len=LogNormal(median=1000, sigma=0.7, high=8000),
+    output_len=LogNormal(median=500, sigma=0.7, high=4000),
+    cancel_range=(0.0, 1.0),
+    max_concurrency=128,
+    request_rate=24,
+    num_prompts=2000,
+)
+# the share of cancelled requests is the swept input feature, 0 is the baseline
+client_cmds = [replace(workload, cancel_ratio=ratio) for ratio in (0, 0.2, 0.5, 0.8)]
+
+input_features = ["cancel_ratio"]
+metrics = [
+    "p99_ttft_ms",
+    "p99_tpot_ms",
+    "mean_abort_reclaim_ms",
+    "max_orphaned_reqs",
+    "wasted_after_cancel_tokens",
+    "drain_s",
+]
+
+
+if __name__ == "__main__":
+    cmp_bench(
+        server_cmds=server_cmds,
+        client_cmds=client_cmds,
+        input_features=input_features,
+        metrics=metrics,
+        labels=labels,
+        host=host,
+        port=port,
+        output_dir="cancellation_bench_output",
+    )
@@ -0,0 +1,27 @@
+from ai_infra_bench.analysis import capacity_report
+
+# results of a previous general_bench / slo_bench run, no GPU is needed here
+output_dir = "general_bench_output"
+labels = ["Qwen3-0.6B-TP1", "Qwen3-8B-TP1"]
+
+load_key = "request_rate"
+metrics = [
+    "p99_ttft_ms",
+    "p99_tpot_ms",
+    "output_throughput",
+]
+
+# what-if: the maximum request rate meeting a 2s p99 TTFT instead of 3s
+slo = {"p99_ttft_ms": 2000, "p99_tpot_ms": 100}
+
+if __name__ == "__main__":
+    models = capacity_report(
+        output_dir, labels, load_key=load_key, metrics=metrics, slo=slo
+    )
+    for model in models:
+        prediction = model.predict("p99_ttft_ms", 10)
+        print(
+            f"{model.label}: p99_ttft_ms at {load_key}=10 is {prediction.mean:.2f} "
+            f"[{prediction.low:.2f}, {prediction.high:.2f}]"
+            + ("" if prediction.reliable else f" (unreliable: {prediction.reason})")
+        )
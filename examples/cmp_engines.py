@@ -0,0 +1,75 @@
+import os
+from typing import List
+
+from ai_infra_bench.backends import get_backend
+from ai_infra_bench.sgl import cmp_bench
+
+# Compare two serving engines on the same workload and hardware
+input_len = 1200
+output_len = 800
+host = "127.0.0.1"
+port = "8888"
+model_path = os.environ["QWEN38B"]
+dataset_path = os.environ["SHAREGPT_DATASET"]
+
+####################################
+# Constructing server_cmds & labels
+####################################
+server_cmds: List[str] = [
+    get_backend("sglang").launch_cmd(model_path, host, port, "--tp-size 1"),
+    get_backend("vllm").launch_cmd(model_path, host, port, "--tensor-parallel-size 1"),
+]
+labels = ["Qwen3-8B-SGLang", "Qwen3-8B-vLLM"]
+
+##########################
+# Constructing client_cmds
+##########################
+# The same client drives both engines through their OpenAI-compatible API
+client_template = """
+python -m sglang.bench_serving --host {host} --port {port}
+		--backend sglang-oai
+		--dataset-path {dataset_path}
+		--dataset-name random
+		--random-range-ratio 1
+		--random-input-len {input_len}
+		--random-output-len {output_len}
+		--request-rate {request_rate}
+		--num-prompt {num_prompt}
+		--max-concurrency {request_rate}
+"""
+
+client_cmds: List[str] = [
+    client_template.format(
+        host=host,
+        port=port,
+        input_len=input_len,
+        output_len=output_len,
+        dataset_path=dataset_path,
+        request_rate=rate,
+        num_prompt=rate * 10,
+    )
+    for rate in range(4, 17, 4)
+]
+
+#####################
+input_features = [
+    "request_rate",
+]
+metrics = [
+    "p99_ttft_ms",
+    "p99_tpot_ms",
+    "p99_itl_ms",
+    "output_throughput",
+]
+
+if __name__ == "__main__":
+    cmp_bench(
+        server_cmds=server_cmds,
+        client_cmds=client_cmds,
+        input_features=input_features,
+        metrics=metrics,
+        labels=labels,
+        host=host,
+        port=port,
+        output_dir="cmp_engines_output",
+    )
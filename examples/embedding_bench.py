@@ -0,0 +1,83 @@
+import os
+from typing import Dict, List, Tuple
+
+from ai_infra_bench.sgl import general_bench, slo_bench
+from ai_infra_bench.workload import EmbeddingWorkload, LogNormal
+
+host = "127.0.0.1"
+port = "8888"
+tp_size = 1
+qwen3_embedding_model_path = os.environ["QWEN3_EMBEDDING_8B"]
+
+
+####################################
+# Constructing server_cmds & labels
+####################################
+server_template = """
+python -m sglang.launch_server --model-path {model_path} --tp-size {tp_size}
+--host {host} --port {port} --is-embedding
+"""
+
+server_cmds: List[str] = [
+    server_template.format(
+        model_path=qwen3_embedding_model_path, tp_size=tp_size, host=host, port=port
+    ),
+]
+labels = ["Qwen3-Embedding-8B-TP1"]
+
+##########################
+# Constructing client_cmds
+##########################
+# chunks of a document store, indexed 32 at a time
+workload = EmbeddingWorkload(
+    batch_size=32,
+    input_len=LogNormal(median=400, sigma=0.5, high=2048),
+    num_prompts=500,
+)
+client_cmds = [[workload.with_load(load) for load in (1, 2, 4, 8, 16)]]
+
+input_features = ["request_rate"]
+metrics = [
+    "p50_e2e_latency_ms",
+    "p99_e2e_latency_ms",
+    "item_throughput",
+    "input_throughput",
+]
+
+#####################
+# the online queries of a search service, embedded one by one
+request_rates: List[Tuple[int, int]] = [
+    (50, 800),
+]
+query_workload = EmbeddingWorkload(
+    input_len=LogNormal(median=24, sigma=0.6, high=256), num_prompts=5000
+)
+
+
+def check_slo(item: Dict) -> bool:
+    return item["p99_e2e_latency_ms"] < 50
+
+
+if __name__ == "__main__":
+    general_bench(
+        server_cmds=server_cmds,
+        client_cmds=client_cmds,
+        input_features=input_features,
+        metrics=metrics,
+        labels=labels,
+        host=host,
+        port=port,
+        output_dir="embedding_bench_output",
+    )
+    slo_bench(
+        server_cmds=server_cmds,
+        client_cmds=[query_workload],
+        request_rates=request_rates,
+        input_features=input_features,
+        metrics=metrics,
+        labels=labels,
+        host=host,
+        port=port,
+        output_dir="embedding_slo_bench_output",
+        check_slo=check_slo,
+    )
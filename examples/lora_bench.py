@@ -0,0 +1,84 @@
+import os
+from dataclasses import replace
+from typing import List
+
+from ai_infra_bench.sgl import general_bench
+from ai_infra_bench.workload import LogNormal, LoraWorkload
+
+host = "127.0.0.1"
+port = "8888"
+tp_size = 1
+qwen3_8b_model_path = os.environ["QWEN38B"]
+# a directory holding the adapters lora0, lora1, ... trained on Qwen3-8B
+lora_dir = os.environ["QWEN38B_LORAS"]
+max_adapters = 64
+
+
+####################################
+# Constructing server_cmds & labels
+####################################
+server_template = """
+python -m sglang.launch_server --model-path {model_path} --tp-size {tp_size}
+--host {host} --port {port} --max-loras-per-batch {max_loras_per_batch}
+--lora-paths {lora_paths}
+"""
+
+# the adapters kept in GPU memory, every other adapter is swapped in when requested
+max_loras_per_batch_list = [8, 16]
+server_cmds: List[str] = [
+    server_template.format(
+        model_path=qwen3_8b_model_path,
+        tp_size=tp_size,
+        host=host,
+        port=port,
+        max_loras_per_batch=max_loras_per_batch,
+        lora_paths=" ".join(
+            f"lora{i}={os.path.join(lora_dir, f'lora{i}')}" for i in range(max_adapters)
+        ),
+    )
+    for max_loras_per_batch in max_loras_per_batch_list
+]
+labels = [f"Qwen3-8B-TP1-loras{size}" for size in max_loras_per_batch_list]
+
+##########################
+# Constructing client_cmds
+##########################
+# a few popular adapters and a long tail, at a fixed load
+workload = LoraWorkload(
+    input_len=LogNormal(median=500, sigma=0.7, high=4000),
+    output_len=LogNormal(median=200, sigma=0.6, high=1000),
+    popularity="zipf",
+    max_concurrency=32,
+    request_rate=8,
+    num_prompts=1000,
+)
+# the number of adapters served is the swept input feature
+client_cmds = [
+    [
+        replace(workload, num_adapters=num_adapters)
+        for num_adapters in (1, 4, 8, 16, 32, 64)
+    ]
+    for _ in server_cmds
+]
+
+input_features = ["num_adapters"]
+metrics = [
+    "p99_ttft_ms",
+    "hot_p99_ttft_ms",
+    "cold_p99_ttft_ms",
+    "p99_tpot_ms",
+    "output_throughput",
+]
+
+
+if __name__ == "__main__":
+    general_bench(
+        server_cmds=server_cmds,
+        client_cmds=client_cmds,
+        input_features=input_features,
+        metrics=metrics,
+        labels=labels,
+        host=host,
+        port=port,
+        output_dir="lora_bench_output",
+    )
@@ -0,0 +1,78 @@
+import os
+from typing import List
+
+from ai_infra_bench.dashboard import DashboardConfig
+from ai_infra_bench.sgl import general_bench
+from ai_infra_bench.workload import LogNormal, Mixture, RandomWorkload
+
+host = "127.0.0.1"
+port = "8888"
+tp_size = 1
+qwen3_8b_model_path = os.environ["QWEN38B"]
+
+
+####################################
+# Constructing server_cmds & labels
+####################################
+server_template = """
+python -m sglang.launch_server --model-path {model_path} --tp-size {tp_size}
+--host {host} --port {port} --chunked-prefill-size {chunked_prefill_size}
+"""
+
+# how much the long prefills hurt the short requests depends on the chunk size
+chunked_prefill_sizes = [8192, 2048]
+server_cmds: List[str] = [
+    server_template.format(
+        model_path=qwen3_8b_model_path,
+        tp_size=tp_size,
+        host=host,
+        port=port,
+        chunked_prefill_size=chunked_prefill_size,
+    )
+    for chunked_prefill_size in chunked_prefill_sizes
+]
+labels = [f"Qwen3-8B-TP1-chunk{size}" for size in chunked_prefill_sizes]
+
+##########################
+# Constructing client_cmds
+##########################
+# 80% short chat requests and 20% long RAG requests with short answers, a
+# request draws its input and output lengths from the same component
+workload = RandomWorkload(
+    input_len=Mixture(
+        [LogNormal(median=300, sigma=0.8, high=4000), LogNormal(6000, 0.3, high=16000)],
+        weights=[0.8, 0.2],
+    ),
+    output_len=Mixture(
+        [LogNormal(median=250, sigma=0.7, high=2000), LogNormal(150, 0.4, high=600)],
+        weights=[0.8, 0.2],
+    ),
+    input_buckets=[1024, 4096],
+    output_buckets=[256],
+    num_prompts=1000,
+)
+client_cmds = [
+    [workload.with_load(load) for load in (4, 8, 16, 32, 64)] for _ in server_cmds
+]
+
+input_features = ["request_rate"]
+metrics = [
+    "p99_ttft_ms",
+    "p99_tpot_ms",
+    "output_throughput",
+]
+
+
+if __name__ == "__main__":
+    general_bench(
+        server_cmds=server_cmds,
+        client_cmds=client_cmds,
+        input_features=input_features,
+        metrics=metrics,
+        labels=labels,
+        host=host,
+        port=port,
+        output_dir="mixed_lengths_bench_output",
+        # rolling percentiles, throughput and SLO status of the running point
+        dashboard_config=DashboardConfig(slo={"ttft_ms": 1000, "tpot_ms": 50}),
+    )
@@ -0,0 +1,59 @@
+import os
+from typing import List
+
+from ai_infra_bench.sgl import ramp_bench
+from ai_infra_bench.workload import RampWorkload
+
+host = "127.0.0.1"
+port = "8888"
+tp_size = 1
+qwen3_8b_model_path = os.environ["QWEN38B"]
+
+
+####################################
+# Constructing server_cmds & labels
+####################################
+server_template = """
+python -m sglang.launch_server --model-path {model_path} --tp-size {tp_size}
+--host {host} --port {port}
+"""
+
+server_cmds: List[str] = [
+    server_template.format(
+        model_path=qwen3_8b_model_path, tp_size=tp_size, host=host, port=port
+    ),
+]
+labels = ["Qwen3-8B-TP1-Ramp"]
+
+############################
+# Constructing the workloads
+############################
+workloads: List[RampWorkload] = [
+    RampWorkload(
+        steps=[1, 2, 4, 8, 12, 16, 24, 32, 48, 64, 96, 128, 192, 256],
+        mode="concurrency",  # or "rate" to step the request rate (req/s)
+        step_s=60,
+        transient_s=15,  # discarded at the beginning of every step
+        input_len=1024,
+        output_len=256,
+    )
+]
+
+metrics = [
+    "output_throughput",
+    "mean_e2e_latency_ms",
+    "p99_ttft_ms",
+    "p99_tpot_ms",
+]
+
+
+if __name__ == "__main__":
+    ramp_bench(
+        server_cmds=server_cmds,
+        workloads=workloads,
+        metrics=metrics,
+        labels=labels,
+        host=host,
+        port=port,
+        output_dir="ramp_bench_output",
+    )
@@ -0,0 +1,34 @@
+from ai_infra_bench.sgl import routing_bench
+from ai_infra_bench.workload import LogNormal, RoutedWorkload
+
+host = "127.0.0.1"
+ports = [8888, 8889, 8890]
+
+# one data-parallel replica per port, the local stand-in server runs anywhere,
+# replace it with `python -m sglang.launch_server --model-path ... --base-gpu-id N`
+server_cmds = [
+    f"python -m ai_infra_bench.mock_server --model-path mock --host {host} --port {port}"
+    for port in ports
+]
+
+# every prompt starts with one of 16 shared 1024-token prefixes
+workload = RoutedWorkload(
+    num_prefixes=16,
+    prefix_len=1024,
+    input_len=LogNormal(256, 0.8),
+    output_len=LogNormal(128, 0.5),
+    num_prompts=600,
+)
+
+policies = ["round_robin", "least_outstanding", "power_of_two", "prefix_hash"]
+
+if __name__ == "__main__":
+    routing_bench(
+        workload,
+        policies=policies,
+        loads=[8, 32, 64],
+        host=host,
+        ports=ports,
+        server_cmds=server_cmds,
+        output_dir="routing_bench_output",
+    )
@@ -0,0 +1,74 @@
+import os
+from typing import Dict, List, Tuple
+
+from ai_infra_bench.sgl import slo_bench
+from ai_infra_bench.workload import Exponential, LogNormal, SessionWorkload
+
+host = "127.0.0.1"
+port = "8888"
+tp_size = 1
+qwen3_8b_model_path = os.environ["QWEN38B"]
+
+
+####################################
+# Constructing server_cmds & labels
+####################################
+server_template = """
+python -m sglang.launch_server --model-path {model_path} --tp-size {tp_size}
+--host {host} --port {port}
+"""
+
+server_cmds: List[str] = [
+    server_template.format(
+        model_path=qwen3_8b_model_path, tp_size=tp_size, host=host, port=port
+    ),
+]
+labels = ["Qwen3-8B-TP1-Chat-Sessions"]
+
+############################
+# Constructing the workloads
+############################
+client_cmds: List[SessionWorkload] = [
+    SessionWorkload(
+        num_turns=6,
+        turn_input_len=LogNormal(median=150, sigma=0.8, low=16, high=2048),
+        turn_output_len=LogNormal(median=250, sigma=0.6, low=16, high=1024),
+        think_time=Exponential(5.0),
+        system_prompt_len=512,
+    )  # NOTE: max_sessions is set by slo_bench
+]
+
+#####################
+# the searched range of concurrent sessions (users)
+request_rates: List[Tuple[int, int]] = [
+    (8, 256),
+]
+
+input_features = [
+    "max_sessions",
+]
+metrics = [
+    "p99_ttft_ms",
+    "p99_tpot_ms",
+    "p99_itl_ms",
+    "output_throughput",
+]
+
+
+def check_slo(item: Dict) -> bool:
+    return item["p99_ttft_ms"] < 2000 and item["p99_tpot_ms"] < 50
+
+
+if __name__ == "__main__":
+    slo_bench(
+        server_cmds=server_cmds,
+        client_cmds=client_cmds,
+        request_rates=request_rates,
+        input_features=input_features,
+        metrics=metrics,
+        labels=labels,
+        host=host,
+        port=port,
+        output_dir="session_slo_bench_output",
+        check_slo=check_slo,
+    )
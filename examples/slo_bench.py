@@ -1,7 +1,9 @@
 import os
 from typing import Dict, List, Tuple
 
+from ai_infra_bench.efficiency import Roofline
 from ai_infra_bench.sgl import slo_bench
+from ai_infra_bench.supervisor import SupervisorConfig
 
 input_len = 1200
 output_len = 800
@@ -63,8 +65,15 @@ metrics = [
     "p99_tpot_ms",
     "p99_itl_ms",
     "output_throughput",
+    "output_throughput_per_gpu",
+    "roofline_fraction",
 ]  # used to plot, make table
 
+# the decode roofline of Qwen3-30B-A3B (3.3B active parameters) on H100
+supervisor_config = SupervisorConfig(
+    roofline=Roofline("H100-SXM", params_b=30.5, active_params_b=3.3)
+)
+
 
 def check_slo(item: Dict) -> bool:
     return (
@@ -86,4 +95,5 @@ if __name__ == "__main__":
         port=port,
         output_dir="slo_bench_output",
         check_slo=check_slo,
+        supervisor_config=supervisor_config,
     )
@@ -0,0 +1,50 @@
+import sys
+
+from ai_infra_bench.sgl import cmp_bench
+from ai_infra_bench.slots import ResourceSlot, make_slots
+from ai_infra_bench.workload import RandomWorkload
+
+host = "127.0.0.1"
+
+# an 8-GPU node: four TP1 slots on GPUs 0-3 and two TP2 slots on GPUs 4-7, every
+# slot on its own port. The --port of the commands is replaced by the slot's.
+slots = make_slots(4, 1, base_port=30000) + [
+    ResourceSlot(devices="4,5", port=30004),
+    ResourceSlot(devices="6,7", port=30005),
+]
+
+# the local stand-in server runs anywhere,
+# replace it with `python -m sglang.launch_server --model-path ...`
+server_template = "python -m ai_infra_bench.mock_server --model-path mock --host {host} --port 30000 --tp-size {tp_size} --schedule-policy {policy}"
+configs = [(tp_size, policy) for tp_size in (1, 2) for policy in ("fcfs", "lpm")]
+server_cmds = [
+    server_template.format(host=host, tp_size=tp_size, policy=policy)
+    for tp_size, policy in configs
+]
+labels = [f"TP{tp_size}-{policy}" for tp_size, policy in configs]
+
+client_cmds = [
+    RandomWorkload(
+        input_len=1024,
+        output_len=256,
+        num_prompts=rate * 10,
+        request_rate=rate,
+        max_concurrency=rate,
+    )
+    for rate in (4, 8, 16)
+]
+
+if __name__ == "__main__":
+    cmp_bench(
+        server_cmds=server_cmds,
+        client_cmds=client_cmds,
+        input_features=["request_rate"],
+        metrics=["p99_ttft_ms", "p99_tpot_ms", "output_throughput_per_gpu"],
+        labels=labels,
+        host=host,
+        port=30000,
+        output_dir="slots_bench_output",
+        slots=slots,
+        # one server at a time, when the servers must not disturb each other
+        serialize="--serialize" in sys.argv,
+    )
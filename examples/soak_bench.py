@@ -0,0 +1,59 @@
+import os
+from typing import List
+
+from ai_infra_bench.sgl import soak_bench
+from ai_infra_bench.workload import LogNormal, SoakWorkload
+
+host = "127.0.0.1"
+port = "8888"
+tp_size = 1
+qwen3_8b_model_path = os.environ["QWEN38B"]
+
+
+####################################
+# Constructing server_cmds & labels
+####################################
+server_template = """
+python -m sglang.launch_server --model-path {model_path} --tp-size {tp_size}
+--host {host} --port {port}
+"""
+
+server_cmds: List[str] = [
+    server_template.format(
+        model_path=qwen3_8b_model_path, tp_size=tp_size, host=host, port=port
+    ),
+]
+labels = ["Qwen3-8B-TP1-Soak"]
+
+############################
+# Constructing the workloads
+############################
+workloads: List[SoakWorkload] = [
+    SoakWorkload(
+        max_concurrency=64,
+        input_len=LogNormal(median=1024, sigma=0.6, low=64, high=8192),
+        output_len=LogNormal(median=256, sigma=0.5, low=16, high=2048),
+        duration_s=4 * 60 * 60,  # 4 hours
+        window_s=5 * 60,  # percentiles over the last 5 minutes
+        interval_s=60,  # one point of the time-series every minute
+    )  # NOTE: server_pid is set by soak_bench
+]
+
+metrics = [
+    "output_throughput",
+    "p99_ttft_ms",
+    "p99_tpot_ms",
+    "rss_mb",
+]
+
+
+if __name__ == "__main__":
+    soak_bench(
+        server_cmds=server_cmds,
+        workloads=workloads,
+        labels=labels,
+        host=host,
+        port=port,
+        metrics=metrics,
+        output_dir="soak_bench_output",
+    )
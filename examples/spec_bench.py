@@ -0,0 +1,58 @@
+import os
+from typing import Dict, List
+
+from ai_infra_bench.sgl import spec_bench
+
+host = "127.0.0.1"
+port = "8888"
+model_path = os.environ["LLAMA_3_1_8B_INSTRUCT"]
+draft_model_path = os.environ["EAGLE3_LLAMA_3_1_8B_INSTRUCT"]
+dataset_path = os.environ["SHAREGPT_DATASET"]
+
+server_template = """
+python -m sglang.launch_server --model-path {model_path}
+--host {host} --port {port}
+"""
+baseline_cmd = server_template.format(model_path=model_path, host=host, port=port)
+
+# the baseline first, then the speculative decoding variants
+spec_template = """
+--speculative-algorithm EAGLE3 --speculative-draft-model-path {draft_model_path}
+--speculative-num-steps {num_steps} --speculative-eagle-topk 1
+--speculative-num-draft-tokens {num_draft_tokens}
+"""
+server_cmds: List[str] = [baseline_cmd] + [
+    baseline_cmd
+    + spec_template.format(
+        draft_model_path=draft_model_path,
+        num_steps=num_steps,
+        num_draft_tokens=num_steps + 1,
+    )
+    for num_steps in (3, 5)
+]
+labels = ["baseline", "eagle3-3steps", "eagle3-5steps"]
+
+# the acceptance depends on the data, every dataset gets its own crossover
+client_template = """
+python -m sglang.bench_serving --host {host} --port {port}
+        --backend sglang-oai
+        --dataset-path {dataset_path}
+        --num-prompts 256
+"""
+datasets: Dict[str, str] = {
+    "sharegpt": client_template.format(host=host, port=port, dataset_path=dataset_path)
+    + " --dataset-name sharegpt",
+    "random": client_template.format(host=host, port=port, dataset_path=dataset_path)
+    + " --dataset-name random --random-input-len 1024 --random-output-len 512",
+}
+
+if __name__ == "__main__":
+    spec_bench(
+        server_cmds,
+        datasets,
+        concurrencies=[1, 2, 4, 8, 16, 32, 64],
+        labels=labels,
+        host=host,
+        port=port,
+        output_dir="spec_bench_output",
+    )
@@ -0,0 +1,48 @@
+import os
+from typing import List
+
+from ai_infra_bench.sgl import startup_bench
+
+host = "127.0.0.1"
+port = "8888"
+tp_size = 1
+qwen3_8b_model_path = os.environ["QWEN38B"]
+
+
+####################################
+# Constructing server_cmds & labels
+####################################
+server_template = """
+python -m sglang.launch_server --model-path {model_path} --tp-size {tp_size}
+--host {host} --port {port} {extra_args}
+"""
+
+server_cmds: List[str] = [
+    server_template.format(
+        model_path=qwen3_8b_model_path,
+        tp_size=tp_size,
+        host=host,
+        port=port,
+        extra_args="",
+    ),
+    server_template.format(
+        model_path=qwen3_8b_model_path,
+        tp_size=tp_size,
+        host=host,
+        port=port,
+        extra_args="--disable-cuda-graph",
+    ),
+]
+labels = ["Qwen3-8B-TP1", "Qwen3-8B-TP1-Without-CUDAGRAPH"]
+
+
+if __name__ == "__main__":
+    startup_bench(
+        server_cmds=server_cmds,
+        labels=labels,
+        host=host,
+        port=port,
+        num_runs=3,
+        cold=True,  # drop the page cache before each launch, needs root
+        output_dir="startup_bench_output",
+    )
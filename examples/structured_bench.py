@@ -0,0 +1,77 @@
+import os
+from dataclasses import replace
+from typing import List
+
+from ai_infra_bench.sgl import cmp_bench
+from ai_infra_bench.workload import LogNormal, StructuredWorkload
+
+host = "127.0.0.1"
+port = "8888"
+tp_size = 1
+qwen3_8b_model_path = os.environ["QWEN38B"]
+
+
+####################################
+# Constructing server_cmds & labels
+####################################
+server_template = """
+python -m sglang.launch_server --model-path {model_path} --tp-size {tp_size}
+--host {host} --port {port} --grammar-backend {grammar_backend}
+"""
+
+grammar_backends = ["xgrammar", "llguidance", "outlines"]
+server_cmds: List[str] = [
+    server_template.format(
+        model_path=qwen3_8b_model_path,
+        tp_size=tp_size,
+        host=host,
+        port=port,
+        grammar_backend=grammar_backend,
+    )
+    for grammar_backend in grammar_backends
+]
+labels = [f"Qwen3-8B-TP1-{backend}" for backend in grammar_backends]
+
+##########################
+# Constructing client_cmds
+##########################
+# chat traffic with a share of tool calls answering a JSON schema of 12 fields,
+# 16 distinct schemas so that the grammar cache does not hide the compilations
+workload = StructuredWorkload(
+    constraint="json_schema",
+    complexity=12,
+    depth=2,
+    num_schemas=16,
+    input_len=LogNormal(median=500, sigma=0.7, high=4000),
+    output_len=512,
+    max_concurrency=32,
+    request_rate=8,
+    num_prompts=1000,
+)
+# the share of constrained requests is the swept input feature, 0 is the baseline
+client_cmds = [
+    replace(workload, constrained_ratio=ratio) for ratio in (0, 0.25, 0.5, 0.75, 1)
+]
+
+input_features = ["constrained_ratio"]
+metrics = [
+    "mean_tpot_ms",
+    "constrained_mean_tpot_ms",
+    "unconstrained_mean_tpot_ms",
+    "constrained_p99_ttft_ms",
+    "output_throughput",
+    "constrained_valid_rate",
+]
+
+
+if __name__ == "__main__":
+    cmp_bench(
+        server_cmds=server_cmds,
+        client_cmds=client_cmds,
+        input_features=input_features,
+        metrics=metrics,
+        labels=labels,
+        host=host,
+        port=port,
+        output_dir="structured_bench_output",
+    )
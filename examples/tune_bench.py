@@ -0,0 +1,51 @@
+from typing import Dict, List
+
+from ai_infra_bench.sgl import tune_bench
+from ai_infra_bench.workload import SessionWorkload
+
+host = "127.0.0.1"
+port = "8888"
+
+# the local stand-in server runs anywhere, replace it with
+# `python -m sglang.launch_server --model-path ...` to tune a real deployment
+server_cmd = f"python -m ai_infra_bench.mock_server --model-path mock --host {host} --port {port}"
+
+# the flags to tune and their candidate values
+search_space: Dict[str, List] = {
+    "--max-running-requests": [16, 48, 128],
+    "--chunked-prefill-size": [512, 4096],
+    "--mem-fraction-static": [0.5, 0.85, 0.95],
+}
+
+# single-turn chats, the searched load is the number of concurrent users
+client_cmd = SessionWorkload(
+    num_turns=1, turn_input_len=512, turn_output_len=64, think_time=0.0
+)
+
+input_features = ["max_sessions"]
+metrics = [
+    "p99_ttft_ms",
+    "p99_tpot_ms",
+    "output_throughput",
+]
+
+
+def check_slo(item: Dict) -> bool:
+    return item["p99_ttft_ms"] < 500 and item["p99_tpot_ms"] < 20
+
+
+if __name__ == "__main__":
+    best = tune_bench(
+        server_cmd,
+        client_cmd,
+        search_space=search_space,
+        request_rates=(8, 128),
+        input_features=input_features,
+        metrics=metrics,
+        host=host,
+        port=port,
+        check_slo=check_slo,
+        num_trials=12,
+        output_dir="tune_bench_output",
+    )
+    print(best.get("server_cmd"))